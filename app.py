@@ -1,24 +1,37 @@
+from startup import startup  # 가장 먼저 (import 시간 측정 시작)
 import os
 import json
 import re
-import pandas as pd
-import gspread
-import pytz
-from flask import Flask, request, jsonify
-from oauth2client.service_account import ServiceAccountCredentials
+import atexit
+import hashlib
+import heapq
+import sqlite3
+import tempfile
+import threading
+import time
+from flask import Flask, Response, g, request, jsonify
 from dotenv import load_dotenv
-from gspread.utils import rowcol_to_a1
+from storage import MIRRORED_SHEETS, SHEET_KEYS, SheetsBackend, SQLiteBackend, StorageSync
+from metrics import metrics, record_request, record_sheets_response, server_timing, timed
+from scheduler import SheetsScheduler
+from tokenizer import KoreanTokenizer
+from delta_sync import DeltaSync
+from member_search import MemberSearchIndex
+from genealogy import GenealogyIndex
+from shared_snapshot import SharedSnapshot
+from response_cache import ResponseCache
+from excel_upload import UploadJob, UploadJobStore, start_upload
+from order_rollups import ORDER_SHEET, OrderRollups, parse_amount
 from datetime import datetime
 from collections import Counter
 
 
 
 
-# ✅ 환경 변수 로드
+# ✅ 환경 변수 로드 (설정 확인은 create_app에서)
+# pandas / gspread / oauth2client / pytz / 엑셀 모듈은 처음 쓰는 곳에서 불러옴 (import 시간은 startup에 기록)
 load_dotenv()
 app = Flask(__name__)
-if not os.getenv("GOOGLE_SHEET_KEY"):
-    raise EnvironmentError("환경변수 GOOGLE_SHEET_KEY가 설정되지 않았습니다.")
 
 
 
@@ -40,21 +53,28 @@ ORDER_HEADERS = [
 
 
 
+# ✅ parse_request용 패턴 (모듈 로드 시 한 번만 컴파일)
+REQUEST_NAME_PATTERNS = (
+    re.compile(r"^([가-힣]{2,3})"),
+    re.compile(r"([가-힣]{2,3})\s*회원[의은는이가]?"),
+)
+필드패턴 = r"(회원명|휴대폰번호|회원번호|비밀번호|가입일자|생년월일|통신사|친밀도|근무처|계보도|소개한분|주소|메모|코드|카드사|카드주인|카드번호|유효기간|비번|카드생년월일|분류|회원단계|연령/성별|직업|가족관계|니즈|애용제품|콘텐츠|습관챌린지|비즈니스시스템|GLC프로젝트|리더님)"
+REQUEST_FIELD_PATTERN = re.compile(rf"{필드패턴}\s*(?:은|는|을|를)?\s*([\w가-힣\d\-\.:/@]+)")
+
+
 def parse_request(text):
+    # 라우트에서는 쓰지 않음 (몇 µs짜리라 @timed 계측 비용이 함수보다 커서 계측하지 않음)
     result = {"회원명": "", "수정목록": []}
 
     # 회원명 추출
-    name_match = re.search(r"^([가-힣]{2,3})", text)
+    name_match = REQUEST_NAME_PATTERNS[0].search(text)
     if not name_match:
-        name_match = re.search(r"([가-힣]{2,3})\s*회원[의은는이가]?", text)
+        name_match = REQUEST_NAME_PATTERNS[1].search(text)
     if name_match:
         result["회원명"] = name_match.group(1)
 
     # 전체 필드
-    필드패턴 = r"(회원명|휴대폰번호|회원번호|비밀번호|가입일자|생년월일|통신사|친밀도|근무처|계보도|소개한분|주소|메모|코드|카드사|카드주인|카드번호|유효기간|비번|카드생년월일|분류|회원단계|연령/성별|직업|가족관계|니즈|애용제품|콘텐츠|습관챌린지|비즈니스시스템|GLC프로젝트|리더님)"
-    수정_패턴 = re.findall(rf"{필드패턴}\s*(?:은|는|을|를)?\s*([\w가-힣\d\-\.:/@]+)", text)
-
-    for 필드, 값 in 수정_패턴:
+    for 필드, 값 in REQUEST_FIELD_PATTERN.findall(text):
         result["수정목록"].append({"필드": 필드, "값": 값})
 
     return result
@@ -101,21 +121,153 @@ def get_image_sheet():
 
 
 
+# ✅ Google Sheets 연결 관리 (프로세스 단위로 인증/스프레드시트/워크시트 핸들 재사용)
+SPREADSHEET_NAME = "members_list_tiger"
+SHEET_SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+TOKEN_REFRESH_MARGIN = int(os.getenv("SHEET_TOKEN_REFRESH_MARGIN", "300"))  # 만료 몇 초 전에 갱신할지
+
+# ✅ Sheets API 할당량/재시도 설정 (모든 호출은 sheets_scheduler를 거침)
+sheets_scheduler = SheetsScheduler(
+    read_per_minute=int(os.getenv("SHEETS_READ_QUOTA_PER_MIN", "60")),
+    write_per_minute=int(os.getenv("SHEETS_WRITE_QUOTA_PER_MIN", "60")),
+    max_retries=int(os.getenv("SHEETS_MAX_RETRIES", "5")),
+    base_delay=float(os.getenv("SHEETS_BACKOFF_BASE", "1")),
+    max_delay=float(os.getenv("SHEETS_BACKOFF_MAX", "32")),
+)
+
+
+class SheetConnection:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self.stats = Counter()
+
+    def _authorize(self):
+        keyfile_dict = json.loads(os.getenv("GOOGLE_SHEET_KEY"))
+        keyfile_dict["private_key"] = keyfile_dict["private_key"].replace("\\n", "\n")
+        service_account = startup.lazy_import("oauth2client.service_account")
+        gspread = startup.lazy_import("gspread")
+        creds = service_account.ServiceAccountCredentials.from_json_keyfile_dict(keyfile_dict, SHEET_SCOPE)
+        self._client = gspread.authorize(creds)
+        self._client.session.hooks["response"].append(record_sheets_response)
+        self._client.request = sheets_scheduler.wrap(self._client.request)
+        self.stats["auth_calls"] += 1
+
+    def _refresh_if_needed(self):
+        # gthread 워커의 여러 스레드가 동시에 갱신하지 않도록 락 안에서만 호출
+        auth = self._client.auth
+        expiry = getattr(auth, "expiry", None)
+        remaining = (expiry - datetime.utcnow()).total_seconds() if expiry else 0
+        if auth.token is None or remaining < TOKEN_REFRESH_MARGIN:
+            self._client.login()
+            self.stats["token_refreshes"] += 1
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._authorize()
+            else:
+                self.stats["auth_saved"] += 1
+            self._refresh_if_needed()
+            return self._client
+
+    def spreadsheet(self):
+        with self._lock:
+            client = self.client()
+            if self._spreadsheet is None:
+                self._spreadsheet = client.open(SPREADSHEET_NAME)
+                self.stats["open_calls"] += 1
+            else:
+                self.stats["open_saved"] += 1
+            return self._spreadsheet
+
+    def worksheet(self, sheet_name):
+        with self._lock:
+            spreadsheet = self.spreadsheet()
+            ws = self._worksheets.get(sheet_name)
+            if ws is None:
+                ws = spreadsheet.worksheet(sheet_name)
+                self._worksheets[sheet_name] = ws
+                self.stats["worksheet_calls"] += 1
+            else:
+                self.stats["worksheet_saved"] += 1
+            return ws
+
+    def worksheets(self):
+        with self._lock:
+            spreadsheet = self.spreadsheet()
+            sheets = spreadsheet.worksheets()
+            for ws in sheets:
+                self._worksheets.setdefault(ws.title, ws)
+            return sheets
+
+    def row_counts(self, sheet_names):
+        # 시트별 실제 데이터 행 수 (헤더 포함, A열의 마지막 값까지), 여러 시트를 한 번의 호출로
+        # grid 행 수는 미리 만들어 둔 빈 행까지 세므로 빈 행에 직접 입력한 내용을 놓침
+        ranges = ["'" + name.replace("'", "''") + "'!A:A" for name in sheet_names]
+        response = self.spreadsheet().values_batch_get(ranges, params={"majorDimension": "COLUMNS"})
+        self.stats["row_count_calls"] += 1
+        return {
+            name: len(value_range["values"][0]) if value_range.get("values") else 0
+            for name, value_range in zip(sheet_names, response.get("valueRanges", []))
+        }
+
+    def revision(self):
+        # Drive 파일 version (스프레드시트 어디든 수정되면 바뀜, 내용은 내려받지 않음)
+        spreadsheet = self.spreadsheet()
+        response = self.client().request(
+            "get", f"{DRIVE_FILES_URL}/{spreadsheet.id}",
+            params={"fields": "version", "supportsAllDrives": True},
+        )
+        self.stats["revision_calls"] += 1
+        return response.json().get("version")
+
+    def batch_get(self, ranges):
+        # 여러 A1 범위를 한 번의 호출로
+        response = self.spreadsheet().values_batch_get(ranges)
+        self.stats["batch_get_calls"] += 1
+        return [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+
+    def reset(self):
+        # 인증 오류나 시트 구조 변경 시 다음 호출에서 새로 연결
+        with self._lock:
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets.clear()
+            self.stats["resets"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "cached_worksheets": sorted(self._worksheets),
+                "token_expiry": (
+                    self._client.auth.expiry.isoformat()
+                    if self._client is not None and getattr(self._client.auth, "expiry", None) else None
+                ),
+            }
+
+
+sheet_connection = SheetConnection()
+
+
 # ✅ Google Sheets 연동 함수
 def get_worksheet(sheet_name):
+    gspread = startup.lazy_import("gspread")
     try:
-        keyfile_dict = json.loads(os.getenv("GOOGLE_SHEET_KEY"))
-        keyfile_dict["private_key"] = keyfile_dict["private_key"].replace("\\n", "\n")
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(keyfile_dict, scope)
-        client = gspread.authorize(creds)
-        sheet = client.open("members_list_tiger")
-        return sheet.worksheet(sheet_name)
+        return sheet_connection.worksheet(sheet_name)
+    except gspread.exceptions.WorksheetNotFound as e:
+        print(f"[시트 접근 오류] 워크시트 없음: {e}")
+        return None
     except Exception as e:
         print(f"[시트 접근 오류] {e}")
+        sheet_connection.reset()
         return None
 
 
@@ -123,22 +275,433 @@ def get_worksheet(sheet_name):
 
 
 
-# ✅ 필드 키워드 → 시트의 실제 컬럼명 매핑
+
+
+
+
+
+
+
+
+
+
+# ✅ 다중 키워드 매칭 (Aho-Corasick, 문장을 한 번만 훑어 포함된 회원명/필드 키워드를 모두 찾음)
+class KeywordMatcher:
+    def __init__(self, names):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._order = {}  # 회원명 → 시트에서 처음 나오는 순서
+        for order, name in enumerate(names):
+            if not name or name in self._order:
+                continue
+            self._order[name] = order
+            node = 0
+            for ch in name:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(name)
+
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def iter_matches(self, text):
+        # (시작 위치, 키워드)를 끝 위치 순서대로, 겹치는 것까지 모두
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for keyword in self._out[node]:
+                yield i - len(keyword) + 1, keyword
+
+    def find_all(self, text):
+        return {keyword for _, keyword in self.iter_matches(text)}
+
+    def match(self, text):
+        # 가장 긴 회원명 우선, 길이가 같으면 시트에서 먼저 나오는 회원명 (기존 길이순 정렬과 동일)
+        found = sorted(self.find_all(text), key=lambda n: (-len(n), self._order[n]))
+        return (found[0] if found else None), found
+
+
+
+
+# ✅ 저장소 선택 (기본: Google Sheets 직접, sqlite: 로컬 미러에서 읽고 주기적으로 양방향 동기화)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheets").lower()
+SQLITE_MIRROR_PATH = os.getenv("SQLITE_MIRROR_PATH", "members_mirror.db")
+STORAGE_SYNC_INTERVAL = float(os.getenv("STORAGE_SYNC_INTERVAL", "60"))  # 초, 0이면 동기화 안 함 (오프라인)
+
+sheets_storage = SheetsBackend(get_worksheet, lambda sheet_names: sheet_connection.row_counts(sheet_names))
+storage_sync = None
+if STORAGE_BACKEND == "sqlite":
+    storage = SQLiteBackend(SQLITE_MIRROR_PATH)
+    storage_sync = StorageSync(
+        storage, sheets_storage, MIRRORED_SHEETS, STORAGE_SYNC_INTERVAL,
+        on_pulled=lambda sheet_name: on_storage_pulled(sheet_name),
+    )
+else:
+    storage = sheets_storage
+
+# ✅ 시트 증분 동기화 (직접 수정한 내용도 몇 초 안에 반영, 바뀐 행만 내려받음)
+DELTA_SYNC_INTERVAL = float(os.getenv("DELTA_SYNC_INTERVAL", "10"))  # 초, 0이면 끔 (캐시 TTL이 지나면 시트 전체 다시 읽기)
+DELTA_VERIFY_ROWS = int(os.getenv("DELTA_VERIFY_ROWS", "500"))  # 폴링 한 번에 셀 수정 여부를 확인할 시트별 행 수
+DELTA_VERIFY_INTERVAL = float(os.getenv("DELTA_VERIFY_INTERVAL", "60"))  # 초, 앱이 쓴 직후의 version 변경은 이 주기로만 검증
+DELTA_SYNC_SHEETS = [s.strip() for s in os.getenv("DELTA_SYNC_SHEETS", ",".join(MIRRORED_SHEETS)).split(",") if s.strip()]
+
+sheet_delta = None
+if DELTA_SYNC_INTERVAL > 0:
+    sheet_delta = DeltaSync(
+        DELTA_SYNC_SHEETS, SHEET_KEYS,
+        revision=lambda: sheet_connection.revision(),
+        batch_get=lambda ranges: sheet_connection.batch_get(ranges),
+        load=lambda sheet_name: sheets_storage.read_remote(sheet_name),
+        interval=DELTA_SYNC_INTERVAL,
+        verify_rows=DELTA_VERIFY_ROWS,
+        verify_interval=DELTA_VERIFY_INTERVAL,
+        on_change=lambda sheet_name, changes: on_storage_pulled(sheet_name),
+    )
+    sheets_storage.mirror = sheet_delta
+
+# ✅ gunicorn 워커 간 공유 스냅샷 (발행 워커 하나만 시트를 읽고 증분 동기화, 나머지는 mmap 파일을 읽음)
+SHARED_SNAPSHOT_PATH = os.getenv("SHARED_SNAPSHOT_PATH", "sheet_snapshot.bin")  # 빈 값이면 끔 (워커마다 직접 읽기)
+SHARED_SNAPSHOT_SHEETS = [s.strip() for s in os.getenv("SHARED_SNAPSHOT_SHEETS", "DB,개인메모").split(",") if s.strip()]
+SHARED_SNAPSHOT_INTERVAL = float(os.getenv("SHARED_SNAPSHOT_INTERVAL", "5"))  # 초, 바뀐 시트가 있을 때만 새 세대 발행
+SHARED_SNAPSHOT_INDEXES = {"DB": ["회원명", "회원번호"]}
+# 초, 증분 동기화가 꺼져 있으면 시트 직접 수정을 반영하도록 이 주기마다 시트 전체를 다시 읽어 발행 (회원 캐시 TTL과 같게)
+SHARED_SNAPSHOT_REFRESH = float(os.getenv("SHARED_SNAPSHOT_REFRESH", os.getenv("MEMBER_CACHE_TTL", "60")))
+
+
+def snapshot_data_time():
+    # 증분 동기화 사본에서 발행하면 마지막 폴링 시작 시각까지의 내용, 아니면 지금 읽는 내용
+    if sheet_delta is not None and sheet_delta.last_poll:
+        return sheet_delta.last_poll
+    return time.time()
+
+
+def load_snapshot_sheet(sheet_name, reload):
+    # 다른 워커가 쓴 시트는 발행 워커의 증분 동기화 사본이 아직 모르므로 먼저 다시 받음
+    if reload and sheet_delta is not None:
+        sheet_delta.reload(sheet_name)
+    return storage.read_all(sheet_name)
+
+
+def on_snapshot_leader():
+    if sheet_delta is not None:
+        sheet_delta.start()
+
+
+shared_snapshot = None
+if SHARED_SNAPSHOT_PATH and storage is sheets_storage:
+    shared_snapshot = SharedSnapshot(
+        SHARED_SNAPSHOT_PATH, SHARED_SNAPSHOT_SHEETS, SHARED_SNAPSHOT_INDEXES,
+        load=load_snapshot_sheet,
+        as_of=snapshot_data_time,
+        interval=SHARED_SNAPSHOT_INTERVAL,
+        on_lead=on_snapshot_leader,
+        refresh_interval=SHARED_SNAPSHOT_REFRESH if sheet_delta is None else None,
+    )
+    sheets_storage.on_write = shared_snapshot.mark_written
+
+
+@app.before_request
+def start_storage_sync():
+    if storage_sync is not None:
+        storage_sync.start()
+    if shared_snapshot is not None:
+        shared_snapshot.start()  # 발행 워커가 되면 그 워커에서만 증분 동기화 시작
+    elif sheet_delta is not None:
+        sheet_delta.start()
+
+
+# ✅ 라우트별 처리 시간/Sheets 호출 계측 (METRICS_SERVER_TIMING=1 이면 Server-Timing 헤더도 추가)
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is not None:
+        elapsed = record_request(response, started)
+        if METRICS_SERVER_TIMING:
+            response.headers["Server-Timing"] = server_timing(elapsed)
+    return response
+
+
+
+
+# ✅ 필드 키워드(동의어 포함) → 시트의 실제 컬럼명 매핑
 field_map = {
-    "휴대폰번호": "휴대폰번호",
-    "핸드폰": "휴대폰번호",
-    "주소": "주소",
-    "이메일": "이메일",
-    "이름": "회원명",
-    "생일": "생년월일",
-    "생년월일": "생년월일",
-    "비밀번호": "비밀번호",
-    "직업": "근무처",
-    "직장": "근무처",
-    # 필요한 항목 계속 추가 가능
+    "회원명": "회원명", "이름": "회원명", "성함": "회원명",
+    "회원번호": "회원번호", "번호": "회원번호", "아이디": "회원번호",
+    "생년월일": "생년월일", "생일": "생년월일", "출생일": "생년월일",
+    "성별": "연령/성별", "연령": "연령/성별", "나이": "연령/성별",
+    "휴대폰번호": "휴대폰번호", "전화번호": "휴대폰번호", "연락처": "휴대폰번호", "폰": "휴대폰번호",
+    "주소": "주소", "거주지": "주소", "사는곳": "주소",
+    "직업": "직업", "일": "직업", "하는일": "직업",
+    "가입일자": "가입일자", "입회일": "가입일자", "등록일": "가입일자",
+    "가족관계": "가족관계", "가족": "가족관계",
+    "추천인": "소개한분", "소개자": "소개한분",
+    "계보도": "계보도",
+    "후원인": "카드주인", "카드주인": "카드주인", "스폰서": "카드주인",
+    "카드사": "카드사", "카드번호": "카드번호", "카드생년월일": "카드생년월일",
+    "리더": "리더님", "리더님": "리더님", "멘토": "리더님",
+    "비밀번호": "비번", "비번": "비번", "비밀번호힌트": "비밀번호힌트", "힌트": "비밀번호힌트",
+    "시스템코드": "코드", "코드": "코드", "시스템": "비즈니스시스템",
+    "콘텐츠": "콘텐츠", "통신사": "통신사", "유효기간": "유효기간", "수신동의": "수신동의",
+    "메모": "메모", "비고": "메모", "노트": "메모",
+    "GLC": "GLC프로젝트", "프로젝트": "GLC프로젝트", "단계": "회원단계",
+    "분류": "분류", "니즈": "니즈", "관심": "니즈",
+    "애용제품": "애용제품", "제품": "애용제품", "주력제품": "애용제품",
+    "친밀도": "친밀도", "관계": "친밀도",
+    "근무처": "근무처", "회사": "근무처", "직장": "근무처"
 }
 
 
+# ✅ 필드 추출 엔진: 모든 동의어 위치를 한 번에 찾고, 미리 컴파일한 값 패턴을 그 자리에서만 적용
+# keyword_order 순서로, 같은 키워드 안에서는 앞에서부터 겹치지 않게 (키워드별 re.finditer와 같은 결과)
+class FieldExtractor:
+    def __init__(self, field_map, keyword_order, value_pattern, cleanup_pattern):
+        self.field_map = field_map
+        self.keyword_order = list(keyword_order)
+        self._matcher = KeywordMatcher(self.keyword_order)
+        self._value = re.compile(value_pattern)
+        self._cleanup = re.compile(cleanup_pattern)
+
+    def extract(self, text):
+        starts = {}
+        for start, keyword in self._matcher.iter_matches(text):
+            starts.setdefault(keyword, []).append(start)
+
+        for keyword in self.keyword_order:
+            pos = 0
+            for start in starts.get(keyword, ()):
+                if start < pos:
+                    continue
+                m = self._value.match(text, start + len(keyword))
+                if not m:
+                    continue
+                pos = m.end()
+                yield self.field_map[keyword], self._cleanup.sub("", m.group(1))
+
+
+# 단일 필드 수정용: 긴 키워드 우선, 조사/명령어 제거
+update_field_extractor = FieldExtractor(
+    field_map,
+    sorted(field_map, key=lambda k: -len(k)),
+    r"(?:를|은|는|이|:|：)?\s*(?P<value>[\d\-@.\w()]+)",
+    r"(으로|로|에)?(수정|변경|바꿔줘|바꿔|바꿈)?$",
+)
+
+# 다중 필드 수정용: 정의 순서대로, 뒤에 나온 값이 덮어씀
+multi_field_extractor = FieldExtractor(
+    field_map,
+    list(field_map),
+    r"\s*[:：]?\s*([^\s]+)",
+    r"(으로|로|에|를|은|는)$",
+)
+
+
+
+
+# ✅ GET 조회 응답 캐시 + ETag (같은 조건을 시트 revision이 그대로일 때 다시 물으면 계산/Sheets 호출 없이 응답)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))  # 항목 수, 0이면 저장 안 함 (ETag는 그대로)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))  # 초, 변경 감지가 꺼져 있을 때의 최대 지연
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+
+def sheet_revisions(sheet_names):
+    # 이 워커의 쓰기/변경 감지 횟수 + 공유 스냅샷 세대 (다른 워커가 쓴 내용은 새 세대로 들어옴)
+    revisions = response_cache.revisions(sheet_names)
+    if shared_snapshot is not None:
+        revisions += tuple(shared[0] if shared else None for shared in map(shared_snapshot.sheet, sheet_names))
+    return revisions
+
+
+def cached_json(sheet_names, query, compute):
+    # compute() → (응답 dict, 상태코드), 500은 저장하지 않음
+    key = (request.path, json.dumps(query, ensure_ascii=False, sort_keys=True), sheet_revisions(sheet_names))
+    entry = response_cache.get(key)
+    if entry is None:
+        payload, status = compute()
+        body = app.json.dumps(payload).encode("utf-8")
+        if status >= 500:
+            return Response(body, status, mimetype="application/json")
+        entry = response_cache.put(key, body, status)
+
+    etag, body, status, _ = entry
+    if etag in request.if_none_match:
+        response_cache.stats["not_modified"] += 1
+        response = Response(status=304)
+    else:
+        response = Response(body, status, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"  # 저장은 하되 매번 ETag로 확인
+    return response
+
+
+# ✅ DB 시트 읽기 캐시 (회원명/회원번호 해시 인덱스, TTL 만료 + 쓰기 시 무효화)
+MEMBER_CACHE_TTL = float(os.getenv("MEMBER_CACHE_TTL", "60"))  # 초, 0이면 매번 새로 읽음
+
+
+class MemberCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None  # (headers, rows, by_name, by_number)
+        self._loaded_at = 0.0
+        self._shared_generation = None  # 공유 스냅샷에서 읽었으면 그 세대
+        self._matcher = (None, None)  # (만든 기준 snapshot, KeywordMatcher)
+        self._frame = (None, None)  # (만든 기준 snapshot, MemberFrame)
+        self._search_lock = threading.Lock()
+        self._search = (None, MemberSearchIndex())  # (마지막으로 반영한 snapshot, 검색 색인)
+        self._genealogy_lock = threading.Lock()
+        self._genealogy = (None, GenealogyIndex())  # (마지막으로 반영한 snapshot, 계보 색인)
+        self.stats = Counter()
+
+    def _load(self):
+        shared = shared_snapshot.sheet("DB") if shared_snapshot is not None else None
+        if shared:
+            # 공유 스냅샷의 행/색인을 그대로 사용 (행은 꺼낼 때만 디코딩)
+            generation, view = shared
+            self._snapshot = (view.headers, view, view.index("회원명") or {}, view.index("회원번호") or {})
+            self._shared_generation = generation
+            self._loaded_at = time.monotonic()
+            self.stats["shared_loads"] += 1
+            return self._snapshot
+
+        self._shared_generation = None
+        db = storage.read_all("DB")
+        headers, rows = (db[0], db[1:]) if db else ([], [])
+        by_name, by_number = {}, {}
+        name_col = headers.index("회원명") if "회원명" in headers else None
+        number_col = headers.index("회원번호") if "회원번호" in headers else None
+        for i, row in enumerate(rows):
+            if name_col is not None and name_col < len(row):
+                by_name.setdefault(row[name_col], []).append(i)
+            if number_col is not None and number_col < len(row):
+                by_number.setdefault(row[number_col], []).append(i)
+        self._snapshot = (headers, rows, by_name, by_number)
+        self._loaded_at = time.monotonic()
+        self.stats["loads"] += 1
+        return self._snapshot
+
+    def _fresh(self, snapshot):
+        if snapshot is None:
+            return False
+        if shared_snapshot is not None:
+            shared = shared_snapshot.sheet("DB")
+            generation = shared[0] if shared else None
+            if generation != self._shared_generation:
+                return False
+            if generation is not None:
+                return True  # 공유 스냅샷은 발행 워커가 최신으로 유지 (증분 동기화가 없으면 TTL마다 다시 발행)
+        return time.monotonic() - self._loaded_at < self.ttl
+
+    def snapshot(self):
+        # 잠금 없이 보는 경로: invalidate가 끼어들어도 한 번 꺼낸 값으로 확인하고 그대로 반환
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            self.stats["hits"] += 1
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if self._fresh(snapshot):  # 다른 스레드가 먼저 읽어온 경우
+                self.stats["hits"] += 1
+                return snapshot
+            self.stats["misses"] += 1
+            return self._load()
+
+    def find(self, name="", number="", snapshot=None):
+        headers, rows, by_name, by_number = snapshot or self.snapshot()
+        # 기존 선형 탐색과 동일하게 시트 순서상 먼저 나오는 행을 반환
+        candidates = []
+        if name and by_name.get(name):
+            candidates.append(by_name[name][0])
+        if number and by_number.get(number):
+            candidates.append(by_number[number][0])
+        if not candidates:
+            return None
+        return dict(zip(headers, rows[min(candidates)]))
+
+    def name_matcher(self):
+        snapshot = self.snapshot()
+        built_for, matcher = self._matcher
+        if built_for is not snapshot:
+            headers, rows = snapshot[0], snapshot[1]
+            col = headers.index("회원명") if "회원명" in headers else None
+            names = [str(row[col]).strip() for row in rows if col is not None and col < len(row)]
+            matcher = KeywordMatcher(names)
+            self._matcher = (snapshot, matcher)
+            self.stats["matcher_builds"] += 1
+        return matcher
+
+    def frame(self):
+        snapshot = self.snapshot()
+        built_for, frame = self._frame
+        if built_for is not snapshot:
+            frame = startup.lazy_import("member_query").MemberFrame(snapshot[0], snapshot[1])  # pandas는 여기서 처음 로드
+            self._frame = (snapshot, frame)
+            self.stats["frame_builds"] += 1
+        return frame
+
+    def search_index(self):
+        # 색인은 계속 유지하고 snapshot이 바뀔 때마다 달라진 행만 반영
+        with self._search_lock:
+            snapshot = self.snapshot()
+            synced_for, index = self._search
+            if synced_for is not snapshot:
+                index.sync(snapshot[0], snapshot[1])
+                self._search = (snapshot, index)
+            return index
+
+    def genealogy(self):
+        # 저장/수정/삭제 후 snapshot이 바뀌면 계보 필드가 달라진 회원만 반영
+        with self._genealogy_lock:
+            snapshot = self.snapshot()
+            synced_for, index = self._genealogy
+            if synced_for is not snapshot:
+                index.sync(snapshot[0], snapshot[1])
+                self._genealogy = (snapshot, index)
+            return index
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self.stats["invalidations"] += 1
+        response_cache.bump("DB")
+
+    def info(self):
+        snapshot = self._snapshot
+        return {
+            **self.stats,
+            "ttl": self.ttl,
+            "rows": len(snapshot[1]) if snapshot else None,
+            "search_index": self._search[1].info(),
+            "genealogy": self._genealogy[1].info(),
+        }
+
+
+member_cache = MemberCache(MEMBER_CACHE_TTL)
+
 
 
 
@@ -148,6 +711,17 @@ field_map = {
 
 
 # ✅ 회원 조회
+def find_member_result(name, number):
+    if not name and not number:
+        return {"error": "회원명 또는 회원번호를 입력해야 합니다."}, 400
+
+    row_dict = member_cache.find(name, number)
+    if row_dict is not None:
+        return row_dict, 200
+
+    return {"error": "해당 회원 정보를 찾을 수 없습니다."}, 404
+
+
 @app.route("/find_member", methods=["POST"])
 def find_member():
     try:
@@ -155,21 +729,20 @@ def find_member():
         name = data.get("회원명", "").strip()
         number = data.get("회원번호", "").strip()
 
-        if not name and not number:
-            return jsonify({"error": "회원명 또는 회원번호를 입력해야 합니다."}), 400
+        result, status = find_member_result(name, number)
+        return jsonify(result), status
 
-        sheet = get_member_sheet()
-        db = sheet.get_all_values()
-        headers, rows = db[0], db[1:]
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        for row in rows:
-            row_dict = dict(zip(headers, row))
-            if name and row_dict.get("회원명") == name:
-                return jsonify(row_dict), 200
-            if number and row_dict.get("회원번호") == number:
-                return jsonify(row_dict), 200
 
-        return jsonify({"error": "해당 회원 정보를 찾을 수 없습니다."}), 404
+# /find_member?회원명=홍길동 또는 ?회원번호=... (응답 캐시 + ETag)
+@app.route("/find_member", methods=["GET"])
+def find_member_get():
+    try:
+        name = request.args.get("회원명", "").strip()
+        number = request.args.get("회원번호", "").strip()
+        return cached_json(["DB"], {"회원명": name, "회원번호": number}, lambda: find_member_result(name, number))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -196,42 +769,19 @@ def find_member():
 
 # ✅ 회원 수정
 # ✅ 자연어 요청문에서 필드와 값 추출, 회원 dict 수정
-# 필드 맵 (추가 가능)
-field_map = {
-    "휴대폰번호": "휴대폰번호",
-    "핸드폰": "휴대폰번호",
-    "주소": "주소",
-    "이메일": "이메일",
-    "이름": "회원명",
-    "생일": "생년월일",
-    "생년월일": "생년월일",
-    "비밀번호": "비밀번호",
-    "직업": "근무처",
-    "직장": "근무처",
-}
 
 
 
 
+@timed("parse_request_and_update")
 def parse_request_and_update(data: str, member: dict) -> tuple:
     수정된필드 = {}
 
-    for keyword in sorted(field_map.keys(), key=lambda k: -len(k)):  # 긴 키워드 우선
-        pattern = rf"{keyword}(?:를|은|는|이|:|：)?\s*(?P<value>[\d\-@.\w()]+)"
-        matches = re.finditer(pattern, data)
-
-        for match in matches:
-            value_raw = match.group("value").strip()
-
-            # 후처리: 조사/명령어 제거
-            value = re.sub(r"(으로|로|에)?(수정|변경|바꿔줘|바꿔|바꿈)?$", "", value_raw)
-
-            field = field_map[keyword]
-
-            if field not in 수정된필드 and value not in 수정된필드.values():  # ✅ 중복 저장 방지
-                수정된필드[field] = value
-                member[field] = value
-                member[f"{field}_기록"] = f"(기록됨: {value})"
+    for field, value in update_field_extractor.extract(data):
+        if field not in 수정된필드 and value not in 수정된필드.values():  # ✅ 중복 저장 방지
+            수정된필드[field] = value
+            member[field] = value
+            member[f"{field}_기록"] = f"(기록됨: {value})"
 
     return member, 수정된필드
 
@@ -261,41 +811,31 @@ def update_member():
         if not 요청문:
             return jsonify({"error": "요청문이 비어 있습니다."}), 400
 
-        # ✅ 시트 가져오기 및 회원명 리스트 확보
-        sheet = get_member_sheet()
-        db = sheet.get_all_records()
-        raw_headers = sheet.row_values(1)
-        headers = [h.strip().lower() for h in raw_headers]
-
-        # ✅ 안전하게 문자열로 변환 후 strip()
-        member_names = [str(row.get("회원명", "")).strip() for row in db if row.get("회원명") is not None]
-
-
-        # ✅ 요청문 내 포함된 실제 회원명 찾기 (길이순 정렬)
-        name = None
-        for candidate in sorted(member_names, key=lambda x: -len(x)):
-            if candidate and candidate in 요청문:
-                name = candidate
-                break
+        # ✅ 요청문 내 포함된 실제 회원명 찾기 (캐시된 회원명 매처, 가장 긴 이름 우선)
+        name, 후보 = member_cache.name_matcher().match(요청문)
 
         if not name:
             return jsonify({"error": "요청문에서 유효한 회원명을 찾을 수 없습니다."}), 400
 
         # ✅ 해당 회원 찾기
-        matching_rows = [i for i, row in enumerate(db) if row.get("회원명") == name]
+        matching_rows = storage.find("DB", "회원명", name)
+        raw_headers = storage.headers("DB")
+        headers = [h.strip().lower() for h in raw_headers]
+
         if len(matching_rows) == 0:
             return jsonify({"error": f"'{name}' 회원을 찾을 수 없습니다."}), 404
         if len(matching_rows) > 1:
-            return jsonify({"error": f"'{name}' 회원이 중복됩니다. 고유한 이름만 지원합니다."}), 400
+            return jsonify({"error": f"'{name}' 회원이 중복됩니다. 고유한 이름만 지원합니다.", "후보": 후보}), 400
 
-        row_index = matching_rows[0] + 2  # 헤더 포함으로 +2
-        member = db[matching_rows[0]]
+        row_id, member = matching_rows[0]
+        original = dict(member)
 
         # ✅ 자연어 해석 및 필드 수정
         updated_member, 수정된필드 = parse_request_and_update(요청문, member)
 
         수정결과 = []
         무시된필드 = []
+        changes = {}
 
         for key, value in updated_member.items():
             key_strip = key.strip()
@@ -306,12 +846,16 @@ def update_member():
                 continue
 
             if key_lower in headers:
-                col_index = headers.index(key_lower) + 1
-                sheet.update_cell(row_index, col_index, value)
+                if key not in original or original[key] != value:
+                    changes[raw_headers[headers.index(key_lower)]] = value
                 수정결과.append({"필드": key_strip, "값": value})
             else:
                 무시된필드.append(key_strip)
 
+        # ✅ 실제로 바뀐 셀만 한 번에 기록
+        if storage.update_row("DB", row_id, changes):
+            member_cache.invalidate()
+
         return jsonify({
             "status": "success",
             "회원명": name,
@@ -339,25 +883,24 @@ def save_member():
         if not name:
             return jsonify({"error": "회원명은 필수입니다"}), 400
 
-        sheet = get_member_sheet()  # ✅ 수정된 부분
-        data = sheet.get_all_records()
-        headers = sheet.row_values(1)
+        matches = storage.find("DB", "회원명", name)
+        headers = storage.headers("DB")
 
         # 기존 회원이 있으면 덮어쓰기
-        for i, row in enumerate(data):
-            if row.get('회원명') == name:
-                for key, value in req.items():
-                    if key in headers:
-                        sheet.update_cell(i + 2, headers.index(key) + 1, value)
-                return jsonify({"message": f"기존 회원 '{name}' 정보 수정 완료"})
+        if matches:
+            row_id, row = matches[0]
+            changes = {
+                key: value
+                for key, value in req.items()
+                if key in headers and str(row.get(key, "")) != str(value)
+            }
+            if storage.update_row("DB", row_id, changes):
+                member_cache.invalidate()
+            return jsonify({"message": f"기존 회원 '{name}' 정보 수정 완료"})
 
         # 신규 회원이면 추가
-        new_row = [''] * len(headers)
-        for key, value in req.items():
-            if key in headers:
-                new_row[headers.index(key)] = value
-   
-        sheet.insert_row(new_row, 2)
+        storage.insert_row("DB", {key: value for key, value in req.items() if key in headers})
+        member_cache.invalidate()
         return jsonify({"message": f"신규 회원 '{name}' 저장 완료"})
 
     except Exception as e:
@@ -379,13 +922,11 @@ def delete_member():
         if not name:
             return jsonify({"error": "회원명을 입력해야 합니다."}), 400
 
-        sheet = get_member_sheet()
-        data = sheet.get_all_records()
-
-        for i, row in enumerate(data):
-            if row.get('회원명') == name:
-                sheet.delete_rows(i + 2)  # 헤더 포함으로 인덱스 +2
-                return jsonify({"message": f"'{name}' 회원 삭제 완료"}), 200
+        matches = storage.find("DB", "회원명", name)
+        if matches:
+            storage.delete_row("DB", matches[0][0])
+            member_cache.invalidate()
+            return jsonify({"message": f"'{name}' 회원 삭제 완료"}), 200
 
         return jsonify({"error": f"'{name}' 회원을 찾을 수 없습니다."}), 404
 
@@ -406,6 +947,173 @@ def delete_member():
 
 
 
+# ✅ 여러 회원 한 번에 조회 (같은 스냅샷 하나로 모두 해석)
+# {"회원목록": [{"회원명": ...} 또는 {"회원번호": ...} 또는 "회원명"], "회원명": [...], "회원번호": [...]}
+@app.route("/find_members", methods=["POST"])
+def find_members():
+    try:
+        data = request.get_json() or {}
+        queries = []
+        for item in data.get("회원목록", []):
+            if isinstance(item, dict):
+                queries.append((str(item.get("회원명", "")).strip(), str(item.get("회원번호", "")).strip()))
+            else:
+                queries.append((str(item).strip(), ""))
+        queries += [(str(n).strip(), "") for n in data.get("회원명", [])]
+        queries += [("", str(n).strip()) for n in data.get("회원번호", [])]
+
+        if not queries:
+            return jsonify({"error": "회원명 또는 회원번호 목록을 입력해야 합니다."}), 400
+
+        snapshot = member_cache.snapshot()
+        results = []
+        for name, number in queries:
+            row_dict = member_cache.find(name, number, snapshot=snapshot) if (name or number) else None
+            result = {"회원명": name, "회원번호": number, "회원": row_dict}
+            if row_dict is None:
+                result["error"] = "해당 회원 정보를 찾을 수 없습니다."
+            results.append(result)
+
+        found = sum(1 for r in results if r["회원"] is not None)
+        return jsonify({"결과": results, "찾음": found, "못찾음": len(results) - found}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ✅ 여러 회원 한 번에 저장 (읽기 1번 + 일괄 쓰기, 회원별 결과 반환)
+@app.route("/save_members", methods=["POST"])
+def save_members():
+    try:
+        members = (request.get_json() or {}).get("회원목록", [])
+        if not isinstance(members, list) or not members:
+            return jsonify({"error": "회원목록이 비어 있습니다."}), 400
+
+        results = storage.upsert_many("DB", "회원명", members)
+        if any(r["결과"] in ("추가", "수정") for r in results):
+            member_cache.invalidate()
+
+        return jsonify({"결과": Counter(r["결과"] for r in results), "회원별": results}), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+
+
+
+
+
+
+
+# ✅ 회원 검색 (templates/index.html): 이름 부분 일치/오타, 전화번호 앞/뒤/중간 자리
+@app.route("/search", methods=["POST"])
+def search():
+    try:
+        data = request.get_json() or {}
+        name = str(data.get("name", "")).strip()
+        phone = str(data.get("phone", "")).strip()
+        limit = int(data.get("limit", 50))
+
+        try:
+            results = member_cache.search_index().search(name, phone, limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(results), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ✅ 하위 회원 조회 (계보 색인)
+# {"회원명": "김리더" 또는 "회원번호": "...", "max_depth": 2, "limit": 500}
+@app.route("/downline", methods=["POST"])
+def downline():
+    try:
+        data = request.get_json() or {}
+        index = member_cache.genealogy()
+        name = index.resolve(str(data.get("회원명", "")).strip(), str(data.get("회원번호", "")).strip())
+        if not name:
+            return jsonify({"error": "해당 회원을 계보에서 찾을 수 없습니다."}), 404
+
+        max_depth = data.get("max_depth")
+        limit = data.get("limit")
+        total, members = index.downline(
+            name,
+            max_depth=int(max_depth) if max_depth is not None else None,
+            limit=int(limit) if limit is not None else None,
+        )
+        return jsonify({"회원명": name, "depth": index.depth(name), "하위회원수": total, "하위회원": members}), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ✅ 상위 계보 조회 (최상위 → 본인 경로, "상위회원명"을 주면 그 회원 하위인지도 함께)
+@app.route("/upline", methods=["POST"])
+def upline():
+    try:
+        data = request.get_json() or {}
+        index = member_cache.genealogy()
+        name = index.resolve(str(data.get("회원명", "")).strip(), str(data.get("회원번호", "")).strip())
+        if not name:
+            return jsonify({"error": "해당 회원을 계보에서 찾을 수 없습니다."}), 404
+
+        result = {"회원명": name, "depth": index.depth(name), "상위계보": index.upline(name)}
+        ancestor = str(data.get("상위회원명", "")).strip()
+        if ancestor:
+            result["하위여부"] = index.is_under(name, ancestor)
+        return jsonify(result), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ✅ 회원 조건 검색 (조건/필드 선택/정렬/페이지)
+# {"filters": [{"field": "가입일자", "op": "between", "value": ["2024-01-01", "2024-06-30"]},
+#              {"field": "회원단계", "op": "in", "value": ["골드", "실버"]}, {"field": "리더님", "value": "김리더"}],
+#  "fields": ["회원명", "회원번호"], "sort": ["-가입일자"], "page": 1, "page_size": 50}
+# op: eq, ne, in, not_in, between, gt, gte, lt, lte, contains, startswith, empty, not_empty
+@app.route("/query_members", methods=["POST"])
+def query_members():
+    try:
+        data = request.get_json() or {}
+        filters = data.get("filters", [])
+        if not isinstance(filters, list):
+            return jsonify({"error": "filters는 목록이어야 합니다."}), 400
+
+        page = data.get("page", 1)
+        page_size = data.get("page_size", 50)
+        try:
+            total, members = member_cache.frame().query(
+                filters, fields=data.get("fields"), sort=data.get("sort", []), page=page, page_size=page_size,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({"총건수": total, "page": int(page), "page_size": int(page_size), "회원목록": members}), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+
+
+
+
+
+
+
 # 예시 데이터베이스 (실제 환경에서는 DB 연동)
 mock_db = {
     "홍길동": {
@@ -416,32 +1124,6 @@ mock_db = {
     }
 }
 
-# 동의어 포함 field_map
-field_map = {
-    "회원명": "회원명", "이름": "회원명", "성함": "회원명",
-    "회원번호": "회원번호", "번호": "회원번호", "아이디": "회원번호",
-    "생년월일": "생년월일", "생일": "생년월일", "출생일": "생년월일",
-    "성별": "연령/성별", "연령": "연령/성별", "나이": "연령/성별",
-    "휴대폰번호": "휴대폰번호", "전화번호": "휴대폰번호", "연락처": "휴대폰번호", "폰": "휴대폰번호",
-    "주소": "주소", "거주지": "주소", "사는곳": "주소",
-    "직업": "직업", "일": "직업", "하는일": "직업",
-    "가입일자": "가입일자", "입회일": "가입일자", "등록일": "가입일자",
-    "가족관계": "가족관계", "가족": "가족관계",
-    "추천인": "소개한분", "소개자": "소개한분",
-    "계보도": "계보도",
-    "후원인": "카드주인", "카드주인": "카드주인", "스폰서": "카드주인",
-    "카드사": "카드사", "카드번호": "카드번호", "카드생년월일": "카드생년월일",
-    "리더": "리더님", "리더님": "리더님", "멘토": "리더님",
-    "비밀번호": "비번", "비번": "비번", "비밀번호힌트": "비밀번호힌트", "힌트": "비밀번호힌트",
-    "시스템코드": "코드", "코드": "코드", "시스템": "비즈니스시스템",
-    "콘텐츠": "콘텐츠", "통신사": "통신사", "유효기간": "유효기간", "수신동의": "수신동의",
-    "메모": "메모", "비고": "메모", "노트": "메모",
-    "GLC": "GLC프로젝트", "프로젝트": "GLC프로젝트", "단계": "회원단계",
-    "분류": "분류", "니즈": "니즈", "관심": "니즈",
-    "애용제품": "애용제품", "제품": "애용제품", "주력제품": "애용제품",
-    "친밀도": "친밀도", "관계": "친밀도",
-    "근무처": "근무처", "회사": "근무처", "직장": "근무처"
-}
 
 
 
@@ -452,22 +1134,39 @@ field_map = {
 
 
 # 다중 필드 업데이트 함수
+@timed("parse_request_and_update_multi")
 def parse_request_and_update_multi(data: str, member: dict) -> dict:
-    for keyword in field_map:
-        # 유연한 한글 + 숫자 + 기호 값 처리
-        pattern = rf"{keyword}\s*[:：]?\s*([^\s]+)"
-        for match in re.finditer(pattern, data):
-            value_raw = match.group(1)
-            value = re.sub(r"(으로|로|에|를|은|는)$", "", value_raw)
-            field = field_map[keyword]
-            member[field] = value
-            member[f"{field}_기록"] = f"(기록됨: {value})"
+    for field, value in multi_field_extractor.extract(data):
+        member[field] = value
+        member[f"{field}_기록"] = f"(기록됨: {value})"
     return member
 
 
 
+# ✅ 명사 추출 (MeCab-ko가 있으면 형태소 분석, 없으면 정규식 / 내용 해시별로 한 번만 분석)
+TOKENIZER_CACHE_SIZE = int(os.getenv("TOKENIZER_CACHE_SIZE", "20000"))  # 메모리 LRU 항목 수
+TOKENIZER_CACHE_PATH = os.getenv("TOKENIZER_CACHE_PATH", "noun_cache.db")
+MECAB_DIC_PATH = os.getenv("MECAB_DIC_PATH", "")  # 예: C:\mecab\mecab-ko-dic
+
+noun_tokenizer = KoreanTokenizer(TOKENIZER_CACHE_SIZE, TOKENIZER_CACHE_PATH, MECAB_DIC_PATH)
+
+
+@timed("extract_nouns")
 def extract_nouns(text):
-    return re.findall(r'[가-힣]{2,}', text)
+    return noun_tokenizer.nouns(text)
+
+
+@timed("extract_nouns")
+def extract_nouns_many(texts):
+    return noun_tokenizer.nouns_many(texts)
+
+
+def normalize_tags(tags):
+    # 검색 태그도 메모와 같은 기준으로 ("상담을" → "상담"), 명사가 하나로 안 떨어지면 입력 그대로
+    normalized = []
+    for tag, nouns in zip(tags, extract_nouns_many([str(t) for t in tags])):
+        normalized.append(nouns[0] if len(nouns) == 1 else tag)
+    return normalized
 
 def generate_tags(text):
     nouns = extract_nouns(text)
@@ -511,24 +1210,318 @@ def save_note():
 
 
 
+# ✅ 메모 시트 중복 확인용 내용 해시 인덱스 (메모리 + 로컬 SQLite 저장)
+# 시트 전체를 매번 읽는 대신 해시 집합으로 O(1) 확인하고, 시트 행 수가 예상과 다르면
+# (다른 워커 저장이나 브라우저 직접 수정) 다시 만든다.
+NOTE_HASH_INDEX_PATH = os.getenv("NOTE_HASH_INDEX_PATH", "note_hashes.db")
+NOTE_ROWCOUNT_CHECK_INTERVAL = float(os.getenv("NOTE_ROWCOUNT_CHECK_INTERVAL", "30"))  # 초
+
+
+def content_hash(content):
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ContentHashIndex:
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._conn = None
+        self._hashes = {}
+        self._row_counts = {}
+        self._checked_at = {}
+        self.stats = Counter()
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS content_hashes (
+                    sheet_name TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    PRIMARY KEY (sheet_name, hash)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS sheet_state (sheet_name TEXT PRIMARY KEY, row_count INTEGER)")
+            self._conn = conn
+        return self._conn
+
+    def _save_state(self, sheet_name, row_count):
+        self._db().execute(
+            "INSERT INTO sheet_state (sheet_name, row_count) VALUES (?, ?) "
+            "ON CONFLICT(sheet_name) DO UPDATE SET row_count = excluded.row_count",
+            (sheet_name, row_count),
+        )
+
+    def _rebuild(self, sheet_name, row_count):
+        hashes = {content_hash(row[2] if len(row) > 2 else "") for row in storage.read_all(sheet_name)}
+        db = self._db()
+        db.execute("BEGIN")
+        db.execute("DELETE FROM content_hashes WHERE sheet_name = ?", (sheet_name,))
+        db.executemany(
+            "INSERT OR IGNORE INTO content_hashes (sheet_name, hash) VALUES (?, ?)",
+            ((sheet_name, h) for h in hashes),
+        )
+        self._save_state(sheet_name, row_count)
+        db.execute("COMMIT")
+        self._hashes[sheet_name] = hashes
+        self._row_counts[sheet_name] = row_count
+        self.stats["rebuilds"] += 1
+
+    def _ensure(self, sheet_name):
+        now = time.monotonic()
+        if sheet_name in self._hashes and now - self._checked_at.get(sheet_name, 0) < self.check_interval:
+            return
+
+        actual = storage.row_count(sheet_name)
+        self._checked_at[sheet_name] = now
+        if sheet_name in self._hashes and self._row_counts.get(sheet_name) == actual:
+            return
+
+        # 다른 워커가 이미 최신 상태를 저장해 두었으면 시트 대신 로컬 파일에서 읽음
+        db = self._db()
+        persisted = db.execute("SELECT row_count FROM sheet_state WHERE sheet_name = ?", (sheet_name,)).fetchone()
+        if persisted and persisted[0] == actual:
+            self._hashes[sheet_name] = {
+                h for (h,) in db.execute("SELECT hash FROM content_hashes WHERE sheet_name = ?", (sheet_name,))
+            }
+            self._row_counts[sheet_name] = actual
+            self.stats["reloads"] += 1
+        else:
+            self._rebuild(sheet_name, actual)
+
+    def contains(self, sheet_name, content):
+        with self._lock:
+            self._ensure(sheet_name)
+            self.stats["lookups"] += 1
+            return content_hash(content) in self._hashes[sheet_name]
+
+    def add(self, sheet_name, contents, rows_added):
+        with self._lock:
+            if sheet_name not in self._hashes:
+                return
+            hashes = [content_hash(c) for c in contents]
+            self._hashes[sheet_name].update(hashes)
+            self._row_counts[sheet_name] += rows_added
+            db = self._db()
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT OR IGNORE INTO content_hashes (sheet_name, hash) VALUES (?, ?)",
+                ((sheet_name, h) for h in hashes),
+            )
+            self._save_state(sheet_name, self._row_counts[sheet_name])
+            db.execute("COMMIT")
+
+    def info(self):
+        return {**self.stats, "sheets": {name: len(h) for name, h in self._hashes.items()}}
+
+
+note_hash_index = ContentHashIndex(NOTE_HASH_INDEX_PATH, NOTE_ROWCOUNT_CHECK_INTERVAL)
+
+
+
+
+# ✅ 상담일지/개인메모/활동일지 쓰기 지연(write-behind) 큐
+# NOTE_WRITE_BEHIND=1 이면 /add_counseling 요청은 로컬 SQLite 큐에 기록된 즉시 응답하고,
+# 백그라운드 스레드가 개수/시간 기준 또는 종료 시점에 시트별로 모아서 한 번에 삽입한다.
+NOTE_WRITE_BEHIND = os.getenv("NOTE_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+NOTE_QUEUE_PATH = os.getenv("NOTE_QUEUE_PATH", "note_queue.db")
+NOTE_FLUSH_SIZE = int(os.getenv("NOTE_FLUSH_SIZE", "20"))
+NOTE_FLUSH_INTERVAL = float(os.getenv("NOTE_FLUSH_INTERVAL", "5"))
+NOTE_CLAIM_TIMEOUT = 600  # 초, 처리 중 죽은 워커가 잡고 있던 항목을 다시 가져오는 기준
+
+
+class NoteQueue:
+    def __init__(self, path, flush_size, flush_interval):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._conn = None
+        self.stats = Counter()
+
+    def _db(self):
+        # gunicorn fork 이후 워커마다 자기 연결을 갖도록 처음 사용할 때 연다
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pending_notes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sheet_name TEXT NOT NULL,
+                    member_name TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_sheet_content ON pending_notes (sheet_name, content)")
+            self._conn = conn
+        return self._conn
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="note-flusher", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def enqueue(self, sheet_name, member_name, content, created_at):
+        self.start()
+        with self._lock:
+            db = self._db()
+            if db.execute(
+                "SELECT 1 FROM pending_notes WHERE sheet_name = ? AND content = ? LIMIT 1",
+                (sheet_name, content),
+            ).fetchone():
+                self.stats["duplicates"] += 1
+                return False
+            db.execute(
+                "INSERT INTO pending_notes (sheet_name, member_name, content, created_at) VALUES (?, ?, ?, ?)",
+                (sheet_name, member_name, content, created_at),
+            )
+            pending = db.execute("SELECT COUNT(*) FROM pending_notes").fetchone()[0]
+        self.stats["enqueued"] += 1
+        if pending >= self.flush_size:
+            self._wake.set()
+        return True
+
+    def pending(self, sheet_name=None):
+        with self._lock:
+            db = self._db()
+            if sheet_name is None:
+                return db.execute("SELECT COUNT(*) FROM pending_notes").fetchone()[0]
+            return db.execute("SELECT COUNT(*) FROM pending_notes WHERE sheet_name = ?", (sheet_name,)).fetchone()[0]
+
+    def _claim(self):
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE pending_notes SET claimed_by = ?, claimed_at = ? "
+                "WHERE claimed_by IS NULL OR claimed_at < ?",
+                (owner, now, now - NOTE_CLAIM_TIMEOUT),
+            )
+            rows = db.execute(
+                "SELECT id, sheet_name, member_name, content, created_at FROM pending_notes "
+                "WHERE claimed_by = ? ORDER BY id",
+                (owner,),
+            ).fetchall()
+        return rows
+
+    def _release(self, ids, done):
+        if not ids:
+            return
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            if done:
+                self._db().execute(f"DELETE FROM pending_notes WHERE id IN ({marks})", ids)
+            else:
+                self._db().execute(f"UPDATE pending_notes SET claimed_by = NULL WHERE id IN ({marks})", ids)
+
+    def flush(self):
+        with self._flush_lock:
+            by_sheet = {}
+            for note_id, sheet_name, member_name, content, created_at in self._claim():
+                by_sheet.setdefault(sheet_name, []).append((note_id, [created_at, member_name, content]))
+
+            for sheet_name, notes in by_sheet.items():
+                ids = [note_id for note_id, _ in notes]
+                try:
+                    seen = set()
+                    new_rows = []
+                    for _, row in notes:
+                        if row[2] not in seen and not note_hash_index.contains(sheet_name, row[2]):
+                            seen.add(row[2])
+                            new_rows.append(row)
+
+                    if new_rows:
+                        # 최신 항목이 위로 오도록 역순으로 한 번에 삽입
+                        new_rows = new_rows[::-1]
+                        storage.append_notes(sheet_name, new_rows)
+                        on_notes_saved(sheet_name, new_rows)
+                    self._release(ids, done=True)
+                    self.stats["flushed"] += len(new_rows)
+                    self.stats["flush_batches"] += 1
+                    self.stats["dropped_duplicates"] += len(notes) - len(new_rows)
+                    print(f"[지연저장] '{sheet_name}' 시트에 {len(new_rows)}건 저장 완료")
+                except Exception as e:
+                    self._release(ids, done=False)
+                    self.stats["flush_errors"] += 1
+                    print(f"[지연저장 오류: {sheet_name}] {e}")
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self.pending():
+                self.flush()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 30)
+        self.flush()
+
+    def info(self):
+        return {**self.stats, "enabled": NOTE_WRITE_BEHIND, "pending": self.pending() if self._conn else None}
+
+
+note_queue = NoteQueue(NOTE_QUEUE_PATH, NOTE_FLUSH_SIZE, NOTE_FLUSH_INTERVAL)
+
+
+
+
+# ✅ 메모가 시트에 실제로 기록된 뒤 인덱스 갱신 (rows: [날짜, 회원명, 내용], 최신이 앞)
+def on_notes_saved(sheet_name, rows):
+    response_cache.bump(sheet_name)
+    note_hash_index.add(sheet_name, [row[2] for row in rows], len(rows))
+    if sheet_name == "개인메모":
+        memo_tag_index.add_new(rows)
+
+
+# ✅ 로컬 미러가 Sheets에서 새로 받아온 뒤 해당 시트 캐시 무효화
+def on_storage_pulled(sheet_name):
+    response_cache.bump(sheet_name)
+    if shared_snapshot is not None:
+        shared_snapshot.mark_dirty(sheet_name)
+    if sheet_name == "DB":
+        member_cache.invalidate()
+    elif sheet_name == "개인메모":
+        memo_tag_index.invalidate()
+    elif sheet_name == ORDER_SHEET:
+        order_rollups.invalidate()
+
+
 # ✅ 시트 저장 함수 (Google Sheets 연동 및 중복 확인)
 def save_to_sheet(sheet_name, member_name, content):
     try:
-        sheet = get_worksheet(sheet_name)
-        if sheet is None:
-            print(f"[오류] '{sheet_name}' 시트를 찾을 수 없습니다.")
-            return False
-
-        existing = sheet.get_all_values()
-        contents = [row[2] if len(row) > 2 else "" for row in existing]  # 내용은 3열 기준
-        if content in contents:
+        # 내용은 3열 기준, 해시 인덱스로 중복 확인
+        if note_hash_index.contains(sheet_name, content):
             print(f"[중복] 이미 같은 내용이 '{sheet_name}'에 존재합니다.")
             return False
 
-        now = datetime.now(pytz.timezone("Asia/Seoul"))
+        now = datetime.now(startup.lazy_import("pytz").timezone("Asia/Seoul"))
         time_str = now.strftime("%Y-%m-%d %H:%M")
 
-        sheet.insert_row([time_str, member_name, content], index=2)
+        if NOTE_WRITE_BEHIND:
+            if not note_queue.enqueue(sheet_name, member_name, content, time_str):
+                print(f"[중복] 이미 같은 내용이 '{sheet_name}' 저장 대기열에 있습니다.")
+                return False
+            return True
+
+        row = [time_str, member_name, content]
+        storage.append_notes(sheet_name, [row])
+        on_notes_saved(sheet_name, [row])
         print(f"[저장완료] '{sheet_name}' 시트에 저장 완료")
         return True
 
@@ -597,6 +1590,212 @@ def add_counseling():
 
 
 
+
+
+# ✅ 개인메모 태그 역색인 (태그 → 메모 id 집합, 메모별 태그/날짜는 한 번만 계산)
+MEMO_INDEX_TTL = float(os.getenv("MEMO_INDEX_TTL", "300"))  # 초, 시트 직접 수정 반영을 위한 전체 재구성 주기
+MEMO_DATE_FORMAT = "%Y-%m-%d %H:%M"
+MEMO_SCAN_CHUNK_ROWS = int(os.getenv("MEMO_SCAN_CHUNK_ROWS", "500"))  # 색인이 없을 때 최신순 검색이 한 번에 읽는 행 수 (0이면 끔)
+MEMO_SCAN_MAX_CHUNKS = int(os.getenv("MEMO_SCAN_MAX_CHUNKS", "2"))  # 이만큼 읽어도 끝나지 않으면 색인을 만들어 검색
+
+
+def parse_memo_row(row):
+    # 시트 기존 행은 [회원명, 날짜, 내용], save_to_sheet로 저장된 행은 [날짜, 회원명, 내용]
+    if len(row) < 3:
+        return None
+    for member, date_str in ((row[0], row[1]), (row[1], row[0])):
+        try:
+            return member, date_str, row[2], datetime.strptime(date_str, MEMO_DATE_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+class MemoTagIndex:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._memos = {}     # memo id → (회원명, 날짜문자열, 내용, 날짜, 태그집합)
+        self._postings = {}  # 태그 → {memo id}
+        self._loaded_at = None
+        self._next_top_id = -1  # 새 메모는 시트 맨 위(2행)에 들어가므로 기존보다 작은 id
+        self._newest_first = True  # 시트가 위에서부터 날짜 내림차순인지 (아니면 부분 읽기 검색을 쓰지 않음)
+        self._shared_generation = None  # 공유 스냅샷에서 만들었으면 그 세대
+        self._build_thread = None
+        self.stats = Counter()
+
+    def _index(self, memo_id, parsed, nouns):
+        member, date_str, content, parsed_date = parsed
+        tags = set(nouns)
+        self._memos[memo_id] = (member, date_str, content, parsed_date, tags)
+        for tag in tags:
+            self._postings.setdefault(tag, set()).add(memo_id)
+
+    def _shared(self):
+        return shared_snapshot.sheet("개인메모") if shared_snapshot is not None else None
+
+    def _chunks(self, chunk_size):
+        shared = self._shared()
+        if not shared:
+            return storage.iter_chunks("개인메모", chunk_size)
+        view = shared[1]
+        return (view[i:i + chunk_size] for i in range(0, len(view), chunk_size))
+
+    def _build(self):
+        shared = self._shared()
+        if shared:
+            self._shared_generation, values = shared
+        else:
+            self._shared_generation = None
+            values = storage.read_all("개인메모")[1:]  # 헤더 제외
+        self._memos, self._postings = {}, {}
+        parsed_rows = [(i, parsed) for i, parsed in enumerate(map(parse_memo_row, values)) if parsed]
+        nouns = extract_nouns_many([parsed[2] for _, parsed in parsed_rows])
+        for (i, parsed), memo_nouns in zip(parsed_rows, nouns):
+            self._index(i, parsed, memo_nouns)
+        self._next_top_id = -1
+        self._loaded_at = time.monotonic()
+        self.stats["builds"] += 1
+
+    def _ensure(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            self._build()
+        elif shared_snapshot is not None:
+            # 다른 워커의 변경이 담긴 새 세대가 나오면 다시 만듦 (이 워커가 쓴 메모는 add_new로 이미 반영)
+            shared = self._shared()
+            if shared and shared[0] != self._shared_generation:
+                self._build()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def add_new(self, rows):
+        # rows는 최신이 앞, 시트 위쪽부터 같은 순서로 쌓이도록 뒤에서부터 id 부여
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            parsed_rows = [parsed for parsed in map(parse_memo_row, reversed(rows)) if parsed]
+            for parsed, nouns in zip(parsed_rows, extract_nouns_many([parsed[2] for parsed in parsed_rows])):
+                self._index(self._next_top_id, parsed, nouns)
+                self._next_top_id -= 1
+                self.stats["incremental_adds"] += 1
+
+    def _build_in_background(self):
+        # 부분 읽기로 답한 뒤 색인을 만들어 두어 다음 검색부터는 색인 사용
+        if self._build_thread is not None and self._build_thread.is_alive():
+            return
+
+        def run():
+            try:
+                with self._lock:
+                    self._ensure()
+            except Exception as e:
+                print(f"[메모 색인] 백그라운드 생성 실패: {e}")
+
+        self._build_thread = threading.Thread(target=run, name="memo-index-build", daemon=True)
+        self._build_thread.start()
+
+    def _scan_latest(self, input_tags, min_match, limit, chunk_size, max_chunks):
+        # 색인 없이 시트 위(최신)부터 chunk 단위로 읽다가,
+        # limit건이 찼고 지금까지 본 가장 오래된 날짜가 limit번째 결과보다 이전이면 중단
+        # (save_to_sheet는 항상 2행에 넣으므로 아래 행은 더 오래된 메모)
+        # max_chunks 안에 끝나지 않거나 날짜 순서가 섞여 있으면 None → 색인으로 검색
+        wanted = set(input_tags)
+        top = []  # ((날짜, 일치수, -id), 결과) 최소 힙, 크기 limit
+        oldest = None
+        in_order = True
+        memo_id = -1
+        for n, chunk in enumerate(self._chunks(chunk_size), 1):
+            self.stats["scan_chunks"] += 1
+            parsed_rows = list(map(parse_memo_row, chunk))
+            nouns = iter(extract_nouns_many([parsed[2] for parsed in parsed_rows if parsed]))
+            for parsed in parsed_rows:
+                memo_id += 1
+                if not parsed:
+                    continue
+                member, date_str, content, parsed_date = parsed
+                memo_nouns = next(nouns)
+                if oldest is not None and parsed_date > oldest:
+                    in_order = False
+                oldest = parsed_date if oldest is None else min(oldest, parsed_date)
+
+                c = len(wanted & set(memo_nouns))
+                if min_match > 0 and c < min_match:
+                    continue
+                item = ((parsed_date, c, -memo_id), {"회원명": member, "날짜": date_str, "내용": content, "일치_태그수": c})
+                if len(top) < limit:
+                    heapq.heappush(top, item)
+                elif item[0] > top[0][0]:
+                    heapq.heapreplace(top, item)
+
+            if not in_order:
+                self._newest_first = False  # 순서가 섞인 시트는 앞부분만으로 판단할 수 없음
+                return None
+            if len(top) >= limit and oldest < top[0][0][0]:
+                self.stats["scan_early_stops"] += 1
+                break
+            if n >= max_chunks:
+                self.stats["scan_gave_up"] += 1
+                return None
+        return [result for _, result in sorted(top, key=lambda x: x[0], reverse=True)]
+
+    def search(self, input_tags, min_match, sort_by, limit):
+        input_tags = normalize_tags(input_tags)
+        with self._lock:
+            cold = self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+            if cold and sort_by == "date" and limit > 0 and self._newest_first and MEMO_SCAN_CHUNK_ROWS > 0:
+                self.stats["scans"] += 1
+                results = self._scan_latest(input_tags, min_match, limit, MEMO_SCAN_CHUNK_ROWS, MEMO_SCAN_MAX_CHUNKS)
+                if results is not None:
+                    self._build_in_background()
+                    return results
+
+            self._ensure()
+            counts = Counter()
+            for tag in set(input_tags):
+                for memo_id in self._postings.get(tag, ()):
+                    counts[memo_id] += 1
+
+            if min_match <= 0:
+                candidates = ((memo_id, counts.get(memo_id, 0)) for memo_id in self._memos)
+            else:
+                candidates = ((memo_id, c) for memo_id, c in counts.items() if c >= min_match)
+
+            # 동점이면 시트 위쪽(작은 id)이 먼저 오도록 기존 안정 정렬 결과와 맞춤
+            memos = self._memos
+            if sort_by == "tag":
+                key = lambda x: (x[1], memos[x[0]][3], -x[0])
+            else:
+                key = lambda x: (memos[x[0]][3], x[1], -x[0])
+            if limit >= 0:
+                top = heapq.nlargest(limit, candidates, key=key)
+            else:
+                top = sorted(candidates, key=key, reverse=True)[:limit]
+
+            self.stats["queries"] += 1
+            return [
+                {"회원명": memos[memo_id][0], "날짜": memos[memo_id][1], "내용": memos[memo_id][2], "일치_태그수": c}
+                for memo_id, c in top
+            ]
+
+    def info(self):
+        return {**self.stats, "memos": len(self._memos), "tags": len(self._postings)}
+
+
+memo_tag_index = MemoTagIndex(MEMO_INDEX_TTL)
+
+
+
+
+def search_memo_result(input_tags, min_match, sort_by, limit):
+    if not input_tags:
+        return {"error": "태그 리스트가 비어 있습니다."}, 400
+    if sort_by not in ["date", "tag"]:
+        return {"error": "sort_by는 'date' 또는 'tag'만 가능합니다."}, 400
+
+    results = memo_tag_index.search(input_tags, min_match, sort_by, limit)
+    return {"검색결과": results}, 200
 
 
 @app.route("/search_memo_by_tags", methods=["POST"])
@@ -608,47 +1807,92 @@ def search_memo_by_tags():
         sort_by = data.get("sort_by", "date").lower()
         min_match = int(data.get("min_match", 1))
 
-        if not input_tags:
-            return jsonify({"error": "태그 리스트가 비어 있습니다."}), 400
-        if sort_by not in ["date", "tag"]:
-            return jsonify({"error": "sort_by는 'date' 또는 'tag'만 가능합니다."}), 400
+        result, status = search_memo_result(input_tags, min_match, sort_by, limit)
+        return jsonify(result), status
 
-        sheet = get_mymemo_sheet()
-        values = sheet.get_all_values()[1:]  # 헤더 제외
-        results = []
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
-        for row in values:
-            if len(row) < 3:
-                continue
-            member, date_str, content = row[0], row[1], row[2]
 
+# /search_memo_by_tags?tags=상담,제품&limit=10&sort_by=date&min_match=1 (tags는 반복해서 줘도 됨, 응답 캐시 + ETag)
+@app.route("/search_memo_by_tags", methods=["GET"])
+def search_memo_by_tags_get():
+    try:
+        # 태그는 집합으로 비교하므로 순서/중복을 없앤 것이 캐시 키
+        input_tags = sorted({t.strip() for value in request.args.getlist("tags") for t in value.split(",") if t.strip()})
+        limit = int(request.args.get("limit", 10))
+        sort_by = request.args.get("sort_by", "date").lower()
+        min_match = int(request.args.get("min_match", 1))
+
+        query = {"tags": input_tags, "limit": limit, "sort_by": sort_by, "min_match": min_match}
+        return cached_json(["개인메모"], query, lambda: search_memo_result(input_tags, min_match, sort_by, limit))
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+
+
+
+
+
+
+# ✅ 제품주문 추가 / 집계 조회 (집계는 추가된 주문만 더해서 유지)
+ORDER_ROLLUP_PATH = os.getenv("ORDER_ROLLUP_PATH", "order_rollups.db")
+ORDER_ROWCOUNT_CHECK_INTERVAL = float(os.getenv("ORDER_ROWCOUNT_CHECK_INTERVAL", "30"))  # 초
+
+order_rollups = OrderRollups(storage, ORDER_ROLLUP_PATH, ORDER_ROWCOUNT_CHECK_INTERVAL)
+
+
+def normalize_order(order, today):
+    record = {h: str(order.get(h, "") or "").strip() for h in ORDER_HEADERS}
+    if not record["제품명"]:
+        raise ValueError("제품명은 필수입니다.")
+    if not record["회원번호"] and not record["회원명"]:
+        raise ValueError("회원명 또는 회원번호가 필요합니다.")
+    for field in ("제품가격", "PV"):
+        try:
+            parse_amount(record[field])
+        except ValueError:
+            raise ValueError(f"{field}는 숫자여야 합니다: {record[field]}")
+
+    # 회원번호/휴대폰번호가 비어 있으면 회원 캐시에서 채움
+    if record["회원명"] and not (record["회원번호"] and record["휴대폰번호"]):
+        member = member_cache.find(record["회원명"], record["회원번호"])
+        if member:
+            record["회원번호"] = record["회원번호"] or str(member.get("회원번호", ""))
+            record["휴대폰번호"] = record["휴대폰번호"] or str(member.get("휴대폰번호", ""))
+    record["주문일자"] = record["주문일자"] or today
+    return record
+
+
+# {"주문목록": [{"회원명": ..., "제품명": ..., "제품가격": ..., "PV": ...}, ...]} 또는 주문 하나
+@app.route("/add_order", methods=["POST"])
+def add_order():
+    try:
+        data = request.get_json() or {}
+        orders = data.get("주문목록") if "주문목록" in data else [data]
+        if not isinstance(orders, list) or not orders:
+            return jsonify({"error": "주문목록이 비어 있습니다."}), 400
+
+        today = datetime.now(startup.lazy_import("pytz").timezone("Asia/Seoul")).strftime("%Y-%m-%d")
+        records, errors = [], []
+        for i, order in enumerate(orders):
             try:
-                parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M")
-            except ValueError:
-                continue  # 날짜 형식 오류시 건너뜀
-
-            memo_tags = extract_nouns(content)
-            similarity = len(set(input_tags) & set(memo_tags))
-            if similarity >= min_match:
-                results.append({
-                    "회원명": member,
-                    "날짜": date_str,
-                    "내용": content,
-                    "일치_태그수": similarity,
-                    "날짜_obj": parsed_date
-                })
-
-        # 정렬 조건 적용
-        if sort_by == "tag":
-            results.sort(key=lambda x: (x["일치_태그수"], x["날짜_obj"]), reverse=True)
-        else:  # 기본: 날짜순
-            results.sort(key=lambda x: (x["날짜_obj"], x["일치_태그수"]), reverse=True)
-
-        # 날짜 객체 제거
-        for r in results:
-            del r["날짜_obj"]
-
-        return jsonify({"검색결과": results[:limit]}), 200
+                records.append(normalize_order(order, today))
+            except ValueError as e:
+                errors.append({"순번": i, "error": str(e)})
+        if not records:
+            return jsonify({"error": "저장할 수 있는 주문이 없습니다.", "오류": errors}), 400
+
+        headers = storage.headers(ORDER_SHEET)
+        rows = [[record.get(h, "") for h in headers] for record in records]
+        order_rollups.append(headers, rows)  # 주문이 몇 건이든 시트 호출 한 번 + 집계 반영
+        return jsonify({"저장": len(rows), "오류": errors}), 200
 
     except Exception as e:
         import traceback
@@ -656,36 +1900,174 @@ def search_memo_by_tags():
         return jsonify({"error": str(e)}), 500
 
 
+# /order_summary?by=member|month|product|member_month&회원번호=...&월=2024-06&제품명=...
+@app.route("/order_summary")
+def order_summary():
+    try:
+        by = request.args.get("by", "member")
+        filters = {name: request.args.get(name, "").strip() for name in ("회원번호", "월", "제품명")}
+        try:
+            items, overall = order_rollups.query(by, filters)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"기준": by, "전체": overall, "집계": items}), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
 
+# ✅ 후원수당 엑셀 업로드 (templates/upload.html)
+# 파일은 임시 파일로 받고 바로 응답, 읽기/검증/중복 제거/일괄 추가는 백그라운드에서 진행
+UPLOAD_BATCH_ROWS = int(os.getenv("UPLOAD_BATCH_ROWS", "2000"))  # append 한 번에 보내는 행 수
+UPLOAD_MAX_ERRORS = int(os.getenv("UPLOAD_MAX_ERRORS", "500"))  # 응답에 담는 행별 오류 수
+UPLOAD_KEEP_JOBS = 20
+UPLOAD_JOBS_PATH = os.getenv("UPLOAD_JOBS_PATH", "upload_jobs.db")  # 작업 상태 (워커 간 공유)
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("UPLOAD_MAX_MB", "50")) * 1024 * 1024
+
+upload_job_store = UploadJobStore(UPLOAD_JOBS_PATH, UPLOAD_KEEP_JOBS)
+
+
+@app.route("/upload_excel", methods=["POST"])
+def upload_excel():
+    try:
+        file = request.files.get("file")
+        if file is None or not file.filename:
+            return jsonify({"error": "업로드할 파일이 없습니다."}), 400
+        ext = os.path.splitext(file.filename)[1].lower()
+        if ext not in (".xls", ".xlsx"):
+            return jsonify({"error": "xls 또는 xlsx 파일만 업로드할 수 있습니다."}), 400
+
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=ext)
+        with os.fdopen(fd, "wb") as f:
+            file.save(f)  # 요청 본문을 조금씩 디스크로
+
+        job = UploadJob(file.filename, UPLOAD_MAX_ERRORS, upload_job_store)
+        job.save(force=True)
+        upload_job_store.prune()
+        start_upload(job, path, storage, "후원수당", UPLOAD_BATCH_ROWS)
+
+        return jsonify({"job_id": job.id, "상태": job.status, "진행상황": f"/upload_excel/{job.id}"}), 202
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
 
+@app.route("/upload_excel/<job_id>")
+def upload_excel_status(job_id):
+    info = upload_job_store.get(job_id)
+    if info is None:
+        return jsonify({"error": "업로드 작업을 찾을 수 없습니다."}), 404
+    return jsonify(info), 200
 
 
 @app.route("/debug_sheets")
 def debug_sheets():
     try:
-        keyfile_dict = json.loads(os.getenv("GOOGLE_SHEET_KEY"))
-        keyfile_dict["private_key"] = keyfile_dict["private_key"].replace("\\n", "\n")
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(keyfile_dict, scope)
-        client = gspread.authorize(creds)  # ✅ 이 줄 추가
-        sheet = client.open("members_list_tiger")
-        titles = [ws.title for ws in sheet.worksheets()]
+        titles = [ws.title for ws in sheet_connection.worksheets()]
         return jsonify({"시트목록": titles})
     except Exception as e:
+        sheet_connection.reset()
         return jsonify({"error": str(e)}), 500
 
 
+# ✅ Prometheus 수집용
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# ✅ 내부 상태 확인용 (연결 재사용 통계 등)
+@app.route("/debug_stats")
+def debug_stats():
+    return jsonify({
+        "시트연결": sheet_connection.snapshot(),
+        "시트스케줄러": sheets_scheduler.info(),
+        "회원캐시": member_cache.info(),
+        "메모저장대기열": note_queue.info(),
+        "메모중복인덱스": note_hash_index.info(),
+        "메모태그인덱스": memo_tag_index.info(),
+        "형태소분석기": noun_tokenizer.info(),
+        "주문집계": order_rollups.info(),
+        "저장소": storage_sync.info() if storage_sync else {"backend": storage.name},
+        "행위치색인": sheets_storage.locator.info(),
+        "증분동기화": sheet_delta.info() if sheet_delta else None,
+        "공유스냅샷": shared_snapshot.info() if shared_snapshot else None,
+        "시작": startup.info(),
+        "응답캐시": response_cache.info(),
+    })
+
+
+
+
+
 
 
 
 
 
 
+# ✅ 앱 생성 (gunicorn "app:create_app()")
+# 설정을 먼저 확인하고, STARTUP_PREWARM=1이면 워커가 뜬 뒤 백그라운드에서 Sheets 연결/캐시를 미리 준비
+# (gunicorn은 마스터가 포트를 연 뒤 워커에서 앱을 불러오므로 첫 요청을 막지 않음)
+STARTUP_PREWARM = os.getenv("STARTUP_PREWARM", "").lower() in ("1", "true", "yes")
+
+
+def check_config():
+    problems = []
+    key = os.getenv("GOOGLE_SHEET_KEY")
+    if not key:
+        problems.append("환경변수 GOOGLE_SHEET_KEY가 설정되지 않았습니다.")
+    else:
+        try:
+            keyfile_dict = json.loads(key)
+            missing = [name for name in ("private_key", "client_email") if not keyfile_dict.get(name)]
+            if missing:
+                problems.append(f"GOOGLE_SHEET_KEY에 {', '.join(missing)} 항목이 없습니다.")
+        except (ValueError, AttributeError) as e:
+            problems.append(f"GOOGLE_SHEET_KEY가 올바른 JSON이 아닙니다: {e}")
+    if STORAGE_BACKEND not in ("sheets", "sqlite"):
+        problems.append(f"STORAGE_BACKEND는 sheets 또는 sqlite여야 합니다: {STORAGE_BACKEND}")
+    for name, path in (
+        ("SHARED_SNAPSHOT_PATH", SHARED_SNAPSHOT_PATH), ("ORDER_ROLLUP_PATH", ORDER_ROLLUP_PATH),
+        ("UPLOAD_JOBS_PATH", UPLOAD_JOBS_PATH),
+    ):
+        directory = os.path.dirname(os.path.abspath(path)) if path else None
+        if directory and not os.path.isdir(directory):
+            problems.append(f"{name}의 폴더가 없습니다: {directory}")
+    return problems
+
+
+def prewarm():
+    try:
+        start_storage_sync()
+        sheet_connection.spreadsheet()
+        member_cache.snapshot()
+        startup.lazy_import("member_query")
+        noun_tokenizer.prepare()
+    except Exception as e:
+        print(f"[시작] 미리 준비 실패 (첫 요청에서 다시 시도): {e}")
+    startup.mark("prewarm")
+    print(f"[시작] 미리 준비 완료 {startup.phases['prewarm']:.2f}초")
+
+
+def create_app():
+    problems = check_config()
+    if problems:
+        raise EnvironmentError("\n".join(problems))
+    startup.mark("config")
+    startup.report()
+    if STARTUP_PREWARM:
+        threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
+    return app
+
 
+startup.mark("import")
 
 
 # 서버 실행
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=10000)
+    create_app().run(host="0.0.0.0", port=10000)
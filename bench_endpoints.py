@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# 실제 시트에 접속하지 않도록 임시 키와 임시 로컬 파일 경로로 app을 불러옴
+_tmpdir = tempfile.mkdtemp(prefix="bench_endpoints_")
+os.environ.setdefault("GOOGLE_SHEET_KEY", "{}")
+os.environ["NOTE_HASH_INDEX_PATH"] = os.path.join(_tmpdir, "note_hashes.db")
+os.environ["NOTE_QUEUE_PATH"] = os.path.join(_tmpdir, "note_queue.db")
+os.environ.setdefault("DELTA_SYNC_INTERVAL", "0")  # 폴링 스레드 없이 매 요청 시트 읽기 비용을 측정
+os.environ.setdefault("SHARED_SNAPSHOT_PATH", "")  # 워커 간 공유 스냅샷 없이 측정
+
+import app
+from gspread.utils import a1_range_to_grid_range
+
+
+DB_HEADERS = [
+    "회원명", "회원번호", "휴대폰번호", "비밀번호", "가입일자", "생년월일", "통신사", "친밀도", "근무처",
+    "계보도", "소개한분", "주소", "메모", "분류", "회원단계", "리더님",
+]
+NOTE_HEADERS = ["회원명", "날짜", "내용"]
+NOTE_MEMBERS = ["홍길동", "김철수", "이영희", "박민수", "최지우", "정하늘", "강서연", "윤도현"]
+TAG_WORDS = ["상담", "제품", "건강", "운동", "가족", "비타민", "회의", "주문", "다이어트", "수면", "피부", "면역"]
+
+
+# ✅ 메모리 안에서 동작하는 가짜 Worksheet (호출마다 지연 시간과 호출 수 기록)
+class FakeWorksheet:
+    def __init__(self, title, rows, latency, calls):
+        self.title = title
+        self.rows = rows
+        self._latency = latency
+        self._calls = calls
+
+    def _call(self, method):
+        self._calls[method] += 1
+        delay = self._latency.get(method, self._latency.get("default", 0))
+        if delay:
+            time.sleep(delay)
+
+    def get_all_values(self, *args, **kwargs):
+        self._call("get_all_values")
+        return [list(row) for row in self.rows]
+
+    def get_all_records(self, *args, **kwargs):
+        self._call("get_all_records")
+        headers = self.rows[0]
+        return [dict(zip(headers, row)) for row in self.rows[1:]]
+
+    def get(self, range_name, **kwargs):
+        # "시작행:끝행" 형태의 행 범위만 지원, 실제 API처럼 끝의 빈 행은 잘라냄
+        self._call("get")
+        start, _, end = range_name.partition(":")
+        rows = [list(row) for row in self.rows[int(start) - 1:int(end)]]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def batch_get(self, ranges, major_dimension="ROWS", **kwargs):
+        # "A2:A" 같은 열 범위만 지원 (major_dimension="COLUMNS"), 끝의 빈 칸은 잘라냄
+        self._call("batch_get")
+        result = []
+        for range_name in ranges:
+            grid = a1_range_to_grid_range(range_name)
+            col = grid["startColumnIndex"]
+            cells = [row[col] if col < len(row) else "" for row in self.rows[grid["startRowIndex"]:]]
+            while cells and not cells[-1]:
+                cells.pop()
+            result.append([cells] if cells else [])
+        return result
+
+    def row_values(self, row, **kwargs):
+        self._call("row_values")
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def update_cell(self, row, col, value):
+        self._call("update_cell")
+        cells = self.rows[row - 1]
+        cells.extend([""] * (col - len(cells)))
+        cells[col - 1] = value
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update")
+        for item in data:
+            grid = a1_range_to_grid_range(item["range"])
+            row = self.rows[grid["startRowIndex"]]
+            start = grid.get("startColumnIndex", 0)
+            values = item["values"][0]
+            row.extend([""] * (start + len(values) - len(row)))
+            row[start:start + len(values)] = values
+
+    def insert_row(self, values, index=1, **kwargs):
+        self._call("insert_row")
+        self.rows.insert(index - 1, list(values))
+
+    def insert_rows(self, values, row=1, **kwargs):
+        self._call("insert_rows")
+        self.rows[row - 1:row - 1] = [list(v) for v in values]
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        self.rows.extend(list(v) for v in values)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("delete_rows")
+        del self.rows[start_index - 1:(end_index or start_index)]
+
+
+def make_sheets(n_rows, latency, calls):
+    rnd = random.Random(n_rows)
+    db = [DB_HEADERS] + [
+        [f"회원{i}", str(10000000 + i), f"010-{i // 10000:04d}-{i % 10000:04d}", "", "2024-01-01", "1990-01-01",
+         "SKT", "", "", "", "", "서울", "", "", "", f"리더{i % 50}"]
+        for i in range(n_rows)
+    ]
+    memo = [NOTE_HEADERS] + [
+        [f"회원{rnd.randrange(n_rows)}", f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 10:00",
+         " ".join(rnd.sample(TAG_WORDS, 4)) + f" 메모{i}"]
+        for i in range(n_rows)
+    ]
+    counseling = [NOTE_HEADERS] + [["2024-01-01 10:00", f"회원{i}", f"상담 내용 {i}"] for i in range(n_rows)]
+    return {
+        "DB": FakeWorksheet("DB", db, latency, calls),
+        "개인메모": FakeWorksheet("개인메모", memo, latency, calls),
+        "상담일지": FakeWorksheet("상담일지", counseling, latency, calls),
+        "활동일지": FakeWorksheet("활동일지", [NOTE_HEADERS], latency, calls),
+    }
+
+
+def install(sheets, latency, calls):
+    # 연결 관리자만 바꿔 끼우면 캐시/인덱스/저장소 계층은 실제 코드 그대로 동작
+    def row_counts(sheet_names):
+        # 실제 API처럼 A열의 마지막 값까지 (끝의 빈 행은 세지 않음)
+        calls["values_batch_get"] += 1
+        delay = latency.get("values_batch_get", latency.get("default", 0))
+        if delay:
+            time.sleep(delay)
+        counts = {}
+        for name in sheet_names:
+            rows = sheets[name].rows
+            count = len(rows)
+            while count and not (rows[count - 1] and rows[count - 1][0]):
+                count -= 1
+            counts[name] = count
+        return counts
+
+    app.sheet_connection.worksheet = lambda name: sheets[name]
+    app.sheet_connection.row_counts = row_counts
+    app.member_cache.invalidate()
+    app.memo_tag_index.invalidate()
+    for sheet_name in app.sheets_storage.locator.columns:
+        app.sheets_storage.locator.invalidate(sheet_name)
+    app.note_hash_index._hashes.clear()
+    app.note_hash_index._row_counts.clear()
+
+
+# ✅ 엔드포인트별 요청 생성기
+def scenarios(n_rows, rnd):
+    seq = iter(range(10 ** 9))
+    saved = []  # save_member로 만든 회원 → delete_member가 먼저 지움
+    kept = max(1, n_rows // 2)  # find/update는 앞쪽 절반만 → 지워진 회원을 찾지 않음
+    seeded = iter(range(n_rows - 1, kept - 1, -1))  # 만든 회원이 없으면 시트 뒤쪽 절반에서 지움
+
+    def save_member():
+        name = f"신규{next(seq)}"
+        saved.append(name)
+        return "/save_member", {"json": {"회원명": name, "주소": "대구"}}
+
+    def delete_member():
+        name = saved.pop() if saved else f"회원{next(seeded)}"
+        return "/delete_member", {"json": {"회원명": name}}
+
+    return {
+        "find_member": lambda: ("/find_member", {"json": {"회원명": f"회원{rnd.randrange(kept)}"}}),
+        "update_member": lambda: ("/update_member", {"data": json.dumps(
+            {"요청문": f"회원{rnd.randrange(kept)} 주소 부산{next(seq)}으로 수정"})}),
+        "save_member": save_member,
+        "delete_member": delete_member,
+        "add_counseling": lambda: ("/add_counseling", {"json": {
+            "요청문": f"{rnd.choice(NOTE_MEMBERS)} 상담일지 저장 벤치마크 메모 {next(seq)}"}}),
+        "search_memo_by_tags": lambda: ("/search_memo_by_tags", {"json": {
+            "tags": rnd.sample(TAG_WORDS, 2), "limit": 10, "sort_by": rnd.choice(["date", "tag"])}}),
+    }
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run(sizes, endpoints, requests_per_endpoint, latency):
+    results = []
+    for n_rows in sizes:
+        calls = Counter()
+        sheets = make_sheets(n_rows, latency, calls)
+        install(sheets, latency, calls)
+        client = app.app.test_client()
+        rnd = random.Random(0)
+        gens = scenarios(n_rows, rnd)
+
+        for endpoint in endpoints:
+            timings, api_calls, statuses = [], [], Counter()
+            started = time.perf_counter()
+            for _ in range(requests_per_endpoint):
+                path, kwargs = gens[endpoint]()
+                before = sum(calls.values())
+                t0 = time.perf_counter()
+                resp = client.post(path, **kwargs)
+                timings.append(time.perf_counter() - t0)
+                api_calls.append(sum(calls.values()) - before)
+                statuses[resp.status_code] += 1
+            wall = time.perf_counter() - started
+            # 실패 응답이 섞이면 그 경로(404 등)의 시간을 재는 셈이므로 결과로 쓰지 않음
+            assert set(statuses) == {200}, f"{endpoint}: 200이 아닌 응답 {dict(statuses)}"
+
+            result = {
+                "rows": n_rows,
+                "endpoint": endpoint,
+                "requests": requests_per_endpoint,
+                "wall_s": round(wall, 6),
+                "p50_ms": round(percentile(timings, 50) * 1000, 3),
+                "p99_ms": round(percentile(timings, 99) * 1000, 3),
+                "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+                "sheets_calls_per_request": round(statistics.fmean(api_calls), 3),
+                "sheets_calls_max": max(api_calls),
+                "status": dict(statuses),
+            }
+            results.append(result)
+            print(
+                f"[{n_rows:>7} rows] {endpoint:22s} p50 {result['p50_ms']:9.3f}ms  p99 {result['p99_ms']:9.3f}ms  "
+                f"calls/req {result['sheets_calls_per_request']:6.2f}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def parse_latency(items, default_ms):
+    latency = {"default": default_ms / 1000}
+    for item in items:
+        method, _, ms = item.partition("=")
+        latency[method] = float(ms) / 1000
+    return latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Worksheet로 app.py 엔드포인트 성능 측정")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="시트 행 수 목록 (쉼표 구분)")
+    parser.add_argument("--endpoints", default="find_member,update_member,save_member,delete_member,add_counseling,search_memo_by_tags")
+    parser.add_argument("--requests", type=int, default=50, help="엔드포인트별 요청 수")
+    parser.add_argument("--default-latency-ms", type=float, default=0.0, help="모든 Sheets 호출에 더할 지연(ms)")
+    parser.add_argument("--latency", action="append", default=[], metavar="METHOD=MS",
+                        help="메서드별 지연, 예: --latency get_all_values=300")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 표준출력)")
+    args = parser.parse_args()
+
+    latency = parse_latency(args.latency, args.default_latency_ms)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "latency_s": latency,
+        "results": run([int(s) for s in args.sizes.split(",")], args.endpoints.split(","), args.requests, latency),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
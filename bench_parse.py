@@ -0,0 +1,117 @@
+import os
+import re
+import random
+import timeit
+
+# 시트 접근 없이 파싱 함수만 사용하므로 임시 키로 app을 불러옴
+os.environ.setdefault("GOOGLE_SHEET_KEY", "{}")
+
+import app
+from app import field_map
+
+
+# ✅ 기존 구현 (엔진 도입 전, 결과 비교 기준)
+def legacy_parse_request(text):
+    result = {"회원명": "", "수정목록": []}
+
+    name_match = re.search(r"^([가-힣]{2,3})", text)
+    if not name_match:
+        name_match = re.search(r"([가-힣]{2,3})\s*회원[의은는이가]?", text)
+    if name_match:
+        result["회원명"] = name_match.group(1)
+
+    필드패턴 = r"(회원명|휴대폰번호|회원번호|비밀번호|가입일자|생년월일|통신사|친밀도|근무처|계보도|소개한분|주소|메모|코드|카드사|카드주인|카드번호|유효기간|비번|카드생년월일|분류|회원단계|연령/성별|직업|가족관계|니즈|애용제품|콘텐츠|습관챌린지|비즈니스시스템|GLC프로젝트|리더님)"
+    수정_패턴 = re.findall(rf"{필드패턴}\s*(?:은|는|을|를)?\s*([\w가-힣\d\-\.:/@]+)", text)
+
+    for 필드, 값 in 수정_패턴:
+        result["수정목록"].append({"필드": 필드, "값": 값})
+
+    return result
+
+
+def legacy_parse_request_and_update(data, member):
+    수정된필드 = {}
+
+    for keyword in sorted(field_map.keys(), key=lambda k: -len(k)):
+        pattern = rf"{keyword}(?:를|은|는|이|:|：)?\s*(?P<value>[\d\-@.\w()]+)"
+        for match in re.finditer(pattern, data):
+            value_raw = match.group("value").strip()
+            value = re.sub(r"(으로|로|에)?(수정|변경|바꿔줘|바꿔|바꿈)?$", "", value_raw)
+            field = field_map[keyword]
+            if field not in 수정된필드 and value not in 수정된필드.values():
+                수정된필드[field] = value
+                member[field] = value
+                member[f"{field}_기록"] = f"(기록됨: {value})"
+
+    return member, 수정된필드
+
+
+def legacy_parse_request_and_update_multi(data, member):
+    for keyword in field_map:
+        pattern = rf"{keyword}\s*[:：]?\s*([^\s]+)"
+        for match in re.finditer(pattern, data):
+            value_raw = match.group(1)
+            value = re.sub(r"(으로|로|에|를|은|는)$", "", value_raw)
+            field = field_map[keyword]
+            member[field] = value
+            member[f"{field}_기록"] = f"(기록됨: {value})"
+    return member
+
+
+# ✅ 골든 케이스 + 무작위 문장
+GOLDEN = [
+    "홍길동 휴대폰번호 010-1234-5678로 수정",
+    "김철수 회원의 주소는 서울시 강남구, 직장 삼성전자로 변경해줘",
+    "이영희 생일 1990-01-01 비밀번호힌트 강아지 카드번호 1234-5678",
+    "박민수 회원번호 12345678 전화번호: 010-9876-5432 메모 내일연락",
+    "홍길동 주소를 부산으로 바꿔줘 리더님은 김리더 멘토 이멘토",
+    "최지우 나이 40대 가족 남편 관심 다이어트 제품 비타민",
+    "GLC 1기 단계 브론즈 시스템코드 A1 카드사 신한 유효기간 12/28",
+    "메모메모메모 번호번호 폰폰 010",
+    "주소를",
+    "",
+]
+WORDS = list(field_map) + ["으로", "로", "를", "은", "는", ":", "：", " ", "  ", "수정", "변경", "바꿔줘",
+                           "서울", "010-1111-2222", "1990-01-01", "a@b.com", "(주)회사", "홍길동", "회원"]
+
+
+def random_texts(n, seed=0):
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice(WORDS) + rnd.choice(["", " "]) for _ in range(rnd.randint(1, 20))) for _ in range(n)]
+
+
+def check_golden(texts):
+    for text in texts:
+        assert app.parse_request(text) == legacy_parse_request(text), text
+        assert app.parse_request_and_update(text, {}) == legacy_parse_request_and_update(text, {}), text
+        assert app.parse_request_and_update_multi(text, {}) == legacy_parse_request_and_update_multi(text, {}), text
+    print(f"✅ 골든 비교 통과: {len(texts)}건")
+
+
+def bench(texts, number=20, repeat=5):
+    # 엔진은 @timed 계측을 뺀 파서 자체(__wrapped__), "계측 포함"은 라우트에서 실제로 부르는 함수
+    # (parse_request처럼 몇 µs짜리 함수는 계측 비용이 결과에 크게 섞이므로 따로 표시)
+    parse_request = app.parse_request
+    parse_request_and_update = app.parse_request_and_update.__wrapped__
+    parse_request_and_update_multi = app.parse_request_and_update_multi.__wrapped__
+    rows = [
+        ("parse_request", legacy_parse_request, parse_request, app.parse_request),
+        ("parse_request_and_update", lambda t: legacy_parse_request_and_update(t, {}),
+         lambda t: parse_request_and_update(t, {}), lambda t: app.parse_request_and_update(t, {})),
+        ("parse_request_and_update_multi", lambda t: legacy_parse_request_and_update_multi(t, {}),
+         lambda t: parse_request_and_update_multi(t, {}), lambda t: app.parse_request_and_update_multi(t, {})),
+    ]
+
+    def per_call(fn):
+        return min(timeit.repeat(lambda: [fn(t) for t in texts], number=number, repeat=repeat)) / (number * len(texts))
+
+    for name, old, engine, timed in rows:
+        t_old, t_engine, t_timed = per_call(old), per_call(engine), per_call(timed)
+        print(f"{name:32s} 기존 {t_old * 1e6:8.1f}µs  엔진 {t_engine * 1e6:8.1f}µs  x{t_old / t_engine:5.1f}"
+              f"  계측 포함 {t_timed * 1e6:8.1f}µs")
+
+
+if __name__ == "__main__":
+    texts = GOLDEN + random_texts(2000)
+    check_golden(texts)
+    bench(GOLDEN + random_texts(200, seed=1))
@@ -0,0 +1,331 @@
+import threading
+import time
+from collections import Counter
+
+from storage import rowcol_to_a1
+
+
+def _quote(sheet_name):
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def _trim(row):
+    # 값 API는 행 끝의 빈 셀을 잘라서 주므로 비교할 때는 양쪽 다 잘라서 비교
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def _keys(rows, col):
+    keys = [row[col] if col < len(row) else "" for row in rows]
+    while keys and keys[-1] == "":
+        keys.pop()
+    return keys
+
+
+# ✅ 시트 변경 감지 + 바뀐 행만 받아오는 증분 동기화
+# 1) Drive 파일 version 한 번 조회 (바뀐 게 없으면 여기서 끝)
+# 2) 바뀌었으면 시트별 키 열 하나만 한 번에 받아 앞/뒤 공통 구간을 빼고 달라진 구간만 다시 받음 (추가/삭제)
+# 3) 키가 그대로인 셀 수정은 알 방법이 없으므로 verify_rows 행씩 위에서부터 돌아가며 비교 (수정)
+# 앱이 직접 쓴 내용은 local_* 로 바로 반영하고, 다음 검증 때 시트 실제 값(서식 적용 결과)으로 맞춰짐
+# 지난 폴링 뒤 이 프로세스가 쓴 적이 있으면 version 변경은 대부분 자기 쓰기 → 검증은 verify_interval 초에 한 번으로 미룸
+# (키 열 비교는 그대로 하므로 다른 곳의 추가/삭제는 바로 반영, 셀 수정만 늦어도 verify_interval 안에 반영)
+class DeltaSync:
+    def __init__(self, sheet_names, key_columns, revision, batch_get, load, interval, verify_rows, on_change=None,
+                 verify_interval=0):
+        self.sheet_names = list(sheet_names)
+        self.key_columns = key_columns
+        self._revision = revision
+        self._batch_get = batch_get
+        self._load = load
+        self.interval = interval
+        self.verify_rows = verify_rows
+        self.verify_interval = verify_interval
+        self.on_change = on_change
+        self._lock = threading.RLock()  # _values/_state 보호
+        self._poll_lock = threading.Lock()
+        self._values = {}  # 시트 → [헤더, 행...] (시트와 같은 순서)
+        self._state = {}   # 시트 → {"verify_from": 다음 검증 위치 또는 None, "rerun": 검증 중 또 바뀜, "generation": 로컬 쓰기 횟수,
+                           #         "polled_generation": 지난 폴링 때의 generation}
+        self._verify_deferred = False  # 자기 쓰기로 보고 미뤄 둔 검증이 있음
+        self._verified_at = 0.0  # 마지막으로 검증을 시작한 시각 (monotonic)
+        self._thread = None
+        self.version = None
+        self.last_poll = None
+        self.last_changes = {}
+        self.stats = Counter()
+
+    # ---- 읽기 / 앱 쓰기 반영 ----
+    def values(self, sheet_name):
+        with self._lock:
+            values = self._values.get(sheet_name)
+            return None if values is None else [list(row) for row in values]
+
+    def row_count(self, sheet_name):
+        with self._lock:
+            values = self._values.get(sheet_name)
+            return None if values is None else len(values)
+
+    def _local(self, sheet_name, apply):
+        with self._lock:
+            values = self._values.get(sheet_name)
+            if values is None:
+                return
+            apply(values)
+            self._state[sheet_name]["generation"] += 1
+            self.stats["local_writes"] += 1
+
+    def local_update(self, sheet_name, row_number, cells):
+        # cells: {열 번호(1부터): 값}
+        def apply(values):
+            if row_number - 1 >= len(values):
+                return
+            row = values[row_number - 1]
+            for col, value in cells.items():
+                row.extend([""] * (col - len(row)))
+                row[col - 1] = str(value)
+        self._local(sheet_name, apply)
+
+    def local_insert(self, sheet_name, row_number, rows):
+        def apply(values):
+            values[row_number - 1:row_number - 1] = [[str(v) for v in row] for row in rows]
+        self._local(sheet_name, apply)
+
+    def local_append(self, sheet_name, rows):
+        def apply(values):
+            values.extend([str(v) for v in row] for row in rows)
+        self._local(sheet_name, apply)
+
+    def local_delete(self, sheet_name, row_number):
+        def apply(values):
+            if row_number - 1 < len(values):
+                del values[row_number - 1]
+        self._local(sheet_name, apply)
+
+    def reload(self, sheet_name):
+        # 다른 프로세스가 이 시트에 쓴 경우: 키 열/검증으로 찾아가지 않고 시트 전체를 다시 받아 교체
+        values = [list(row) for row in self._load(sheet_name)]
+        with self._lock:
+            if sheet_name not in self._values:
+                return
+            self._values[sheet_name] = values
+            self._state[sheet_name]["generation"] += 1  # 진행 중인 폴링 결과는 버리고 다음 폴링에서 다시
+            self.stats["reloads"] += 1
+
+    # ---- 변경 감지 ----
+    def _key_col(self, sheet_name):
+        headers = self._values[sheet_name][0] if self._values[sheet_name] else []
+        key = self.key_columns.get(sheet_name)
+        return headers.index(key) if key in headers else 0
+
+    def _initial_load(self, version):
+        for sheet_name in self.sheet_names:
+            try:
+                values = [list(row) for row in self._load(sheet_name)]
+            except Exception as e:
+                print(f"[증분 동기화] '{sheet_name}' 시트 제외: {e}")
+                continue
+            with self._lock:
+                self._values[sheet_name] = values
+                self._state[sheet_name] = {"verify_from": None, "rerun": False, "generation": 0, "polled_generation": 0}
+        self.version = version
+        self._verified_at = time.monotonic()  # 방금 전체를 읽었으므로 검증한 것과 같음
+        self.stats["full_loads"] += 1
+
+    def _start_verify(self, now):
+        # 어느 시트의 어떤 셀이 바뀌었는지는 알 수 없으므로 모든 시트를 한 바퀴 다시 검증
+        # (검증 중이면 끝까지 간 뒤 처음부터 한 번 더 → 아래쪽 행도 반드시 확인됨)
+        for state in self._state.values():
+            if state["verify_from"] is None:
+                state["verify_from"] = 0
+            else:
+                state["rerun"] = True
+        self._verify_deferred = False
+        self._verified_at = now
+
+    def _plan(self, sheet_name, new_keys, generation):
+        # 키 열 기준으로 앞/뒤 공통 구간을 빼고 남은 가운데 구간이 바뀐 범위
+        values = self._values[sheet_name]
+        plan = {"generation": generation, "middle": None, "verify": None}
+        if new_keys is not None:
+            old_keys = _keys(values, self._key_col(sheet_name))
+            if old_keys != new_keys:
+                p = 0
+                limit = min(len(old_keys), len(new_keys))
+                while p < limit and old_keys[p] == new_keys[p]:
+                    p += 1
+                s = 0
+                while s < limit - p and old_keys[-1 - s] == new_keys[-1 - s]:
+                    s += 1
+                plan["middle"] = (p, len(old_keys) - s, len(new_keys) - s)  # 0부터, 헤더 포함 인덱스
+
+        plan["verify"] = self._state[sheet_name]["verify_from"]
+        return plan
+
+    def _apply_middle(self, sheet_name, middle, fetched, changes):
+        values = self._values[sheet_name]
+        p, old_end, new_end = middle
+        width = len(values[0]) if values else 0
+        new_rows = [row + [""] * (width - len(row)) for row in fetched]
+        new_rows += [[""] * width for _ in range(new_end - p - len(new_rows))]
+        old_rows = values[p:old_end]
+
+        if len(old_rows) == len(new_rows):
+            changes["modified"] += [p + i + 1 for i, (a, b) in enumerate(zip(old_rows, new_rows)) if _trim(a) != _trim(b)]
+        else:
+            # 같은 내용의 행은 자리만 옮긴 것으로 보고, 나머지만 추가/삭제로 표시
+            remaining = Counter(tuple(_trim(row)) for row in old_rows)
+            for i, row in enumerate(new_rows):
+                key = tuple(_trim(row))
+                if remaining[key] > 0:
+                    remaining[key] -= 1
+                else:
+                    changes["added"].append(p + i + 1)
+            leftover = Counter(remaining)
+            for i, row in enumerate(old_rows):
+                key = tuple(_trim(row))
+                if leftover[key] > 0:
+                    leftover[key] -= 1
+                    changes["removed"].append(p + i + 1)
+        values[p:old_end] = new_rows
+
+    def _apply_verify(self, sheet_name, start, fetched, changes):
+        values = self._values[sheet_name]
+        end = start + self.verify_rows
+        covers_end = end >= len(values)
+        width = len(values[0]) if values else 0
+        for i, row in enumerate(fetched):
+            idx = start + i
+            row = row + [""] * (width - len(row))
+            if idx < len(values):
+                if _trim(values[idx]) != _trim(row):
+                    values[idx] = row
+                    changes["modified"].append(idx + 1)
+            else:
+                values.append(row)  # 키 열이 비어 있어 키 비교로는 안 보였던 아래쪽 새 행
+                changes["added"].append(idx + 1)
+        if covers_end and len(fetched) < self.verify_rows:
+            # 마지막 구간인데 받아온 행이 모자라면 그 아래는 시트에서 비워진 행
+            for idx in range(len(values) - 1, start + len(fetched) - 1, -1):
+                if any(values[idx]):
+                    changes["removed"].append(idx + 1)
+                del values[idx]
+            state = self._state[sheet_name]
+            state["verify_from"] = 0 if state["rerun"] else None
+            state["rerun"] = False
+            self.stats["verify_passes"] += 1
+        else:
+            self._state[sheet_name]["verify_from"] = end
+
+    def poll(self):
+        with self._poll_lock:
+            started = time.time()  # 이 시각 이전에 시트에 쓴 내용은 이번 폴링 결과에 들어 있음
+            version = self._revision()
+            self.last_poll = started
+            if not self._values:
+                self._initial_load(version)
+                return {}
+
+            version_changed = version != self.version
+            with self._lock:
+                names = list(self._values)
+                own_writes = any(self._state[n]["generation"] != self._state[n]["polled_generation"] for n in names)
+                for n in names:
+                    self._state[n]["polled_generation"] = self._state[n]["generation"]
+                now = time.monotonic()
+                verify_due = now - self._verified_at >= self.verify_interval
+                if version_changed and own_writes and not verify_due:
+                    self._verify_deferred = True
+                    self.stats["verify_deferred"] += 1
+                elif version_changed or (self._verify_deferred and verify_due):
+                    self._start_verify(now)
+                if not version_changed and all(self._state[n]["verify_from"] is None for n in names):
+                    self.stats["idle_polls"] += 1
+                    return {}
+                generations = {n: self._state[n]["generation"] for n in names}
+
+            new_keys = dict.fromkeys(names)
+            if version_changed:
+                self.stats["changed_polls"] += 1
+                with self._lock:
+                    ranges = []
+                    for n in names:
+                        col = rowcol_to_a1(1, self._key_col(n) + 1).rstrip("0123456789")
+                        ranges.append(f"{_quote(n)}!{col}:{col}")
+                for n, rows in zip(names, self._batch_get(ranges)):
+                    new_keys[n] = _keys(rows, 0)
+
+            with self._lock:
+                plans = {n: self._plan(n, new_keys[n], generations[n]) for n in names}
+            ranges, slots = [], []
+            for n, plan in plans.items():
+                if plan["middle"] and plan["middle"][2] > plan["middle"][0]:
+                    p, _, new_end = plan["middle"]
+                    ranges.append(f"{_quote(n)}!{p + 1}:{new_end}")
+                    slots.append((n, "middle"))
+                if plan["verify"] is not None:
+                    start = plan["verify"]
+                    ranges.append(f"{_quote(n)}!{start + 1}:{start + self.verify_rows}")
+                    slots.append((n, "verify"))
+            fetched = {slot: rows for slot, rows in zip(slots, self._batch_get(ranges) if ranges else [])}
+            self.stats["rows_fetched"] += sum(len(rows) for rows in fetched.values())
+
+            all_changes = {}
+            retry = False
+            with self._lock:
+                for n, plan in plans.items():
+                    if self._state[n]["generation"] != plan["generation"]:
+                        # 받아오는 동안 앱이 이 시트에 썼으면 위치가 어긋나므로 다음 폴링에서 다시
+                        retry = True
+                        continue
+                    changes = {"added": [], "removed": [], "modified": []}
+                    if plan["middle"]:
+                        self._apply_middle(n, plan["middle"], fetched.get((n, "middle"), []), changes)
+                    if plan["verify"] is not None:
+                        self._apply_verify(n, plan["verify"], fetched.get((n, "verify"), []), changes)
+                    if any(changes.values()):
+                        all_changes[n] = changes
+                        for kind, rows in changes.items():
+                            self.stats[f"rows_{kind}"] += len(rows)
+            self.version = None if retry else version
+
+        if all_changes:
+            self.last_changes = all_changes
+            for n, changes in all_changes.items():
+                print(f"[증분 동기화] {n}: 추가 {len(changes['added'])} / 삭제 {len(changes['removed'])} / 수정 {len(changes['modified'])}")
+                if self.on_change:
+                    self.on_change(n, changes)
+        return all_changes
+
+    # ---- 백그라운드 실행 ----
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="delta-sync", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[증분 동기화 오류] {e}")
+            time.sleep(self.interval)
+
+    def info(self):
+        with self._lock:
+            verifying = sorted(n for n, s in self._state.items() if s["verify_from"] is not None)
+            rows = {n: len(v) for n, v in self._values.items()}
+        return {
+            **self.stats,
+            "version": self.version,
+            "last_poll": self.last_poll,
+            "rows": rows,
+            "verifying": verifying,
+            "verify_deferred": self._verify_deferred,
+            "last_changes": {n: {k: len(v) for k, v in c.items()} for n, c in self.last_changes.items()},
+        }
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime
+
+
+KEY_COLUMNS = ("회원번호", "회원명")
+AMOUNT_HINTS = ("수당", "금액", "합계", "공제", "지급액")  # 헤더에 들어 있으면 숫자여야 하는 열
+DATE_TEXT = re.compile(r"^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*[.일]?$")
+AMOUNT_TEXT = re.compile(r"^-?\d+(\.\d+)?$")
+JOB_SAVE_INTERVAL = 1.0  # 초, 진행 중인 작업 상태를 저장소에 남기는 간격
+
+
+def iter_workbook_rows(path, filename):
+    # 첫 번째 시트를 한 행씩 (xlsx는 read_only 스트리밍이라 파일 크기와 상관없이 메모리 일정)
+    ext = os.path.splitext(filename)[1].lower()
+    # 엑셀 모듈은 업로드할 때만 불러옴 (앱 시작 시간 단축)
+    if ext == ".xlsx":
+        try:
+            import openpyxl
+        except ImportError:
+            raise RuntimeError("xlsx를 읽으려면 openpyxl이 필요합니다.")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    elif ext == ".xls":
+        try:
+            import xlrd
+        except ImportError:
+            raise RuntimeError("xls를 읽으려면 xlrd가 필요합니다.")
+        book = xlrd.open_workbook(path, on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            for r in range(sheet.nrows):
+                yield [
+                    xlrd.xldate_as_datetime(cell.value, book.datemode) if cell.ctype == xlrd.XL_CELL_DATE else cell.value
+                    for cell in sheet.row(r)
+                ]
+        finally:
+            book.release_resources()
+    else:
+        raise ValueError("xls 또는 xlsx 파일만 업로드할 수 있습니다.")
+
+
+def normalize_value(header, value):
+    # 엑셀 값과 시트에서 읽은 문자열이 같은 기준으로 비교되도록 정리
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M" if (value.hour or value.minute) else "%Y-%m-%d")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    match = DATE_TEXT.match(text)
+    if match:
+        y, m, d = match.groups()
+        return f"{y}-{int(m):02d}-{int(d):02d}"
+    if any(hint in header for hint in AMOUNT_HINTS) or header == "회원번호":
+        plain = text.replace(",", "").replace("₩", "").replace("원", "").strip()
+        if AMOUNT_TEXT.match(plain):
+            return plain[:-2] if plain.endswith(".0") else plain
+    return text
+
+
+def row_key(row):
+    return hashlib.sha1("\x1f".join(row).encode("utf-8")).digest()
+
+
+def validate_row(headers, row):
+    values = dict(zip(headers, row))
+    if not any(values.get(col) for col in KEY_COLUMNS):
+        return "회원번호/회원명이 비어 있습니다."
+    if values.get("회원번호") and not values["회원번호"].isdigit():
+        return f"회원번호가 숫자가 아닙니다: {values['회원번호']}"
+    for header, value in values.items():
+        if value and any(hint in header for hint in AMOUNT_HINTS) and not AMOUNT_TEXT.match(value):
+            return f"'{header}' 값이 숫자가 아닙니다: {value}"
+    return None
+
+
+# ✅ 업로드 작업 상태 저장소 (로컬 SQLite, 모든 gunicorn 워커가 같은 파일을 봄)
+# 작업을 실행하는 워커가 상태를 저장하고, 진행 상황 조회는 어느 워커로 와도 여기서 읽음
+class UploadJobStore:
+    def __init__(self, path, keep):
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = Counter()
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS upload_jobs (
+                    id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    info TEXT NOT NULL
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    def save(self, job):
+        info = json.dumps(job.info(), ensure_ascii=False)
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO upload_jobs (id, started_at, finished_at, info) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET finished_at = excluded.finished_at, info = excluded.info",
+                (job.id, job.started_at, job.finished_at, info),
+            )
+            self.stats["saves"] += 1
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db().execute("SELECT info FROM upload_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self):
+        # 최근 keep개만 남김 (진행 중인 작업은 지우지 않음)
+        with self._lock:
+            self._db().execute(
+                "DELETE FROM upload_jobs WHERE finished_at IS NOT NULL AND id NOT IN "
+                "(SELECT id FROM upload_jobs ORDER BY started_at DESC LIMIT ?)",
+                (self.keep,),
+            )
+
+    def info(self):
+        return {**self.stats}
+
+
+# ✅ 엑셀 업로드 작업 (요청은 바로 돌려주고 백그라운드 스레드에서 처리, 진행 상황은 조회로 확인)
+class UploadJob:
+    def __init__(self, filename, max_errors, store=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.filename = filename
+        self.max_errors = max_errors
+        self.store = store
+        self._saved_at = 0.0
+        self.status = "대기"
+        self.message = ""
+        self.ignored_columns = []
+        self.errors = []
+        self.counts = Counter()
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def save(self, force=False):
+        # 진행 중에는 JOB_SAVE_INTERVAL마다 한 번만 저장
+        if self.store is None:
+            return
+        now = time.monotonic()
+        if force or now - self._saved_at >= JOB_SAVE_INTERVAL:
+            self._saved_at = now
+            self.store.save(self)
+
+    def error(self, excel_row, message):
+        self.counts["오류"] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"행": excel_row, "error": message})
+
+    def info(self):
+        return {
+            "job_id": self.id,
+            "파일": self.filename,
+            "상태": self.status,
+            "메시지": self.message,
+            **self.counts,
+            "무시된_열": self.ignored_columns,
+            "오류목록": self.errors,
+            "오류목록_생략": max(0, self.counts["오류"] - len(self.errors)),
+            "경과초": round((self.finished_at or time.time()) - self.started_at, 1),
+        }
+
+
+def run_upload(job, path, storage, sheet_name, batch_rows, scan_rows=5000):
+    try:
+        job.status = "진행중"
+        job.save(force=True)
+        headers = storage.headers(sheet_name)
+        if not headers:
+            raise LookupError(f"'{sheet_name}' 시트를 찾을 수 없습니다.")
+
+        # 이미 시트에 있는 행의 키 색인 (chunk 단위로 읽어 해시만 보관)
+        seen = set()
+        for chunk in storage.iter_chunks(sheet_name, scan_rows):
+            for row in chunk:
+                seen.add(row_key([normalize_value(h, v) for h, v in zip(headers, list(row) + [""] * (len(headers) - len(row)))]))
+        job.counts["기존행"] = len(seen)
+
+        rows = iter_workbook_rows(path, job.filename)
+        mapping = None
+        batch = []
+        for excel_row, values in enumerate(rows, 1):
+            job.save()
+            if not any(v not in (None, "") for v in values):
+                continue
+            if mapping is None:
+                # 첫 번째 비어 있지 않은 행이 헤더
+                names = [normalize_value("", v) for v in values]
+                mapping = [(i, headers.index(name)) for i, name in enumerate(names) if name in headers]
+                job.ignored_columns = [name for name in names if name and name not in headers]
+                if not any(headers[col] in KEY_COLUMNS for _, col in mapping):
+                    raise ValueError("엑셀에 회원번호 또는 회원명 열이 없습니다.")
+                continue
+
+            job.counts["읽은행"] += 1
+            row = [""] * len(headers)
+            for i, col in mapping:
+                if i < len(values):
+                    row[col] = normalize_value(headers[col], values[i])
+            problem = validate_row(headers, row)
+            if problem:
+                job.error(excel_row, problem)
+                continue
+            key = row_key(row)
+            if key in seen:
+                job.counts["중복"] += 1
+                continue
+            seen.add(key)
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                storage.append_rows(sheet_name, batch)
+                job.counts["추가"] += len(batch)
+                job.counts["쓰기호출"] += 1
+                batch = []
+
+        if mapping is None:
+            raise ValueError("엑셀에 데이터가 없습니다.")
+        if batch:
+            storage.append_rows(sheet_name, batch)
+            job.counts["추가"] += len(batch)
+            job.counts["쓰기호출"] += 1
+        job.status = "완료"
+    except Exception as e:
+        job.status = "실패"
+        job.message = str(e)
+        import traceback
+        traceback.print_exc()
+    finally:
+        job.finished_at = time.time()
+        try:
+            job.save(force=True)
+        except Exception as e:
+            print(f"[엑셀 업로드] 작업 상태 저장 실패: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        print(f"[엑셀 업로드] {job.filename}: {job.status} {dict(job.counts)}")
+
+
+def start_upload(job, path, storage, sheet_name, batch_rows):
+    thread = threading.Thread(
+        target=run_upload, args=(job, path, storage, sheet_name, batch_rows), name=f"upload-{job.id}", daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,180 @@
+import re
+import threading
+from collections import Counter
+
+
+GENEALOGY_COLUMNS = ("회원번호", "소개한분", "계보도", "리더님")
+LINEAGE_SPLIT = re.compile(r"\s*(?:>|→|->|/|,)\s*")  # 계보도: "김리더 > 박상위 > 홍길동" 같은 경로 표기
+
+
+def parent_ref(name, sponsor, lineage, leader):
+    # 바로 위 회원: 소개한분 → 계보도 경로에서 본인 바로 앞 → 리더님 순서로 처음 채워진 값
+    if sponsor:
+        return sponsor
+    path = [p for p in LINEAGE_SPLIT.split(lineage) if p]
+    if name in path:
+        path = path[:path.index(name)]
+    if path:
+        return path[-1]
+    return leader or None
+
+
+# ✅ 계보 색인 (DB 시트의 소개한분/계보도/리더님 → 부모/자식 + Euler tour 구간)
+# 회원마다 [tin, tout) 구간을 두어 하위 여부·하위 인원은 O(1), 하위 목록은 O(k)
+# 회원 스냅샷이 바뀌면 계보 필드가 달라진 회원만 반영하고, 부모 관계가 실제로 바뀐 경우에만 구간을 다시 계산
+# (구간 재계산은 전체 O(N): 한 회원을 옮겨도 뒤쪽 회원의 구간 번호가 모두 밀리므로 부분 갱신하지 않음)
+class GenealogyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}  # 회원명 → (회원번호, 소개한분, 계보도, 리더님), 시트 순서
+        self._dirty = True
+        self._raw_parent = None  # 순환을 끊기 전 부모 관계 (다음 비교 기준)
+        self._parent = {}
+        self._children = {}
+        self._order = []  # Euler tour 방문 순서 (회원명)
+        self._tin = {}
+        self._tout = {}
+        self._depth = {}
+        self._by_number = {}
+        self.stats = Counter()
+
+    def sync(self, headers, rows):
+        cols = [headers.index(c) if c in headers else None for c in ("회원명",) + GENEALOGY_COLUMNS]
+        records = {}
+        for row in rows:
+            name, *fields = (str(row[c]).strip() if c is not None and c < len(row) else "" for c in cols)
+            if name and name not in records:  # 같은 이름은 시트에서 먼저 나오는 행 기준
+                records[name] = tuple(fields)
+
+        with self._lock:
+            changed = 0
+            for name in [n for n in self._records if n not in records]:
+                del self._records[name]
+                changed += 1
+            for name, fields in records.items():
+                if self._records.get(name) != fields:
+                    self._records[name] = fields
+                    changed += 1
+            if changed:
+                self._dirty = True
+                self.stats["changed_members"] += changed
+
+    def _parents(self):
+        by_number = {fields[0]: name for name, fields in self._records.items() if fields[0]}
+        parent = {}
+        for name, (number, sponsor, lineage, leader) in self._records.items():
+            ref = parent_ref(name, sponsor, lineage, leader)
+            if ref and ref not in self._records and ref in by_number:
+                ref = by_number[ref]  # 회원번호로 적힌 경우
+            if ref == name:
+                ref = None
+            parent[name] = ref
+            if ref and ref not in parent and ref not in self._records:
+                parent[ref] = None  # DB에 없는 상위 회원도 계보에는 남김
+        return parent, by_number
+
+    def _rebuild(self):
+        parent, by_number = self._parents()
+        if parent == self._raw_parent:
+            # 회원번호/계보도 표기만 바뀌고 부모 관계는 그대로 → 구간은 두고 번호 색인만 교체
+            self._by_number = by_number
+            self._dirty = False
+            self.stats["retours_skipped"] += 1
+            return
+        self._raw_parent = dict(parent)
+        children = {name: [] for name in parent}
+        for name, ref in parent.items():
+            if ref:
+                children[ref].append(name)
+
+        order, tin, tout, depth = [], {}, {}, {}
+        roots = [name for name, p in parent.items() if p is None]
+        # 순환(서로를 소개한분으로 적은 경우)에 걸려 루트에서 닿지 않는 회원은 그 자리에서 끊어 루트로 취급
+        pending = iter(roots + list(parent))
+        for root in pending:
+            if root in tin:
+                continue
+            if parent[root] is not None:
+                parent[root] = None
+                self.stats["cycles_broken"] += 1
+            stack = [(root, 0, iter(children[root]))]
+            tin[root], depth[root] = len(order), 0
+            order.append(root)
+            while stack:
+                node, d, it = stack[-1]
+                child = next(it, None)
+                if child is None:
+                    tout[node] = len(order)
+                    stack.pop()
+                elif child not in tin:
+                    tin[child], depth[child] = len(order), d + 1
+                    order.append(child)
+                    stack.append((child, d + 1, iter(children[child])))
+
+        self._parent, self._children, self._by_number = parent, children, by_number
+        self._order, self._tin, self._tout, self._depth = order, tin, tout, depth
+        self._dirty = False
+        self.stats["rebuilds"] += 1
+
+    def _ready(self):
+        if self._dirty:
+            self._rebuild()
+
+    def resolve(self, name="", number=""):
+        with self._lock:
+            self._ready()
+            if name and name in self._tin:
+                return name
+            if number and number in self._by_number:
+                return self._by_number[number]
+            return None
+
+    def _entry(self, name, base_depth=0):
+        fields = self._records.get(name)
+        return {"회원명": name, "회원번호": fields[0] if fields else "", "depth": self._depth[name] - base_depth}
+
+    def downline(self, name, max_depth=None, limit=None):
+        # (전체 하위 인원, 하위 회원 목록): 자기 자신 제외, 계보 순서(위에서 아래, 형제는 시트 순서)
+        with self._lock:
+            self._ready()
+            start, end = self._tin[name] + 1, self._tout[name]
+            base = self._depth[name]
+            members = []
+            for member in self._order[start:end]:
+                if max_depth is not None and self._depth[member] - base > max_depth:
+                    continue
+                members.append(self._entry(member, base))
+                if limit is not None and len(members) >= limit:
+                    break
+            self.stats["downline_queries"] += 1
+            return end - start, members
+
+    def upline(self, name):
+        # 최상위부터 자기 자신까지의 경로
+        with self._lock:
+            self._ready()
+            path = []
+            node = name
+            while node is not None:
+                path.append(self._entry(node))
+                node = self._parent.get(node)
+            self.stats["upline_queries"] += 1
+            return path[::-1]
+
+    def depth(self, name):
+        with self._lock:
+            self._ready()
+            return self._depth[name]
+
+    def is_under(self, name, ancestor):
+        with self._lock:
+            self._ready()
+            return ancestor in self._tin and self._tin[ancestor] < self._tin[name] < self._tout[ancestor]
+
+    def subtree_size(self, name):
+        with self._lock:
+            self._ready()
+            return self._tout[name] - self._tin[name] - 1
+
+    def info(self):
+        return {**self.stats, "members": len(self._records), "nodes": len(self._order), "dirty": self._dirty}
@@ -0,0 +1,107 @@
+import pandas as pd
+
+
+CATEGORY_COLUMNS = ["분류", "회원단계", "통신사", "리더님"]
+DATE_COLUMNS = ["가입일자", "생년월일"]
+MAX_PAGE_SIZE = 1000
+CATEGORY_OPS = {"eq", "ne", "in", "not_in", "contains", "startswith", "empty", "not_empty"}  # 범주형은 크기 비교 없음
+
+
+# ✅ DB 시트를 타입이 있는 DataFrame으로 (범주형 / 날짜), 조건은 벡터 마스크로 계산
+class MemberFrame:
+    def __init__(self, headers, rows):
+        width = len(headers)
+        df = pd.DataFrame([list(row[:width]) + [""] * (width - len(row)) for row in rows], columns=headers, dtype=object)
+        df = df.loc[:, ~df.columns.duplicated()]  # 이름이 겹치는 열(빈 헤더 등)은 첫 번째만
+        self.raw = df  # 응답은 시트에 적힌 문자열 그대로
+        typed = df.copy()
+        for col in CATEGORY_COLUMNS:
+            if col in typed:
+                typed[col] = typed[col].astype("category")
+        for col in DATE_COLUMNS:
+            if col in typed:
+                # "2024-01-01", "2024.01.01", "20240101" 등 섞여 있어도 파싱, 빈 값/잘못된 값은 NaT
+                typed[col] = pd.to_datetime(typed[col].str.replace(".", "-", regex=False), errors="coerce", format="mixed")
+        self.df = typed
+
+    def __len__(self):
+        return len(self.df)
+
+    def _column(self, field):
+        if field not in self.df:
+            raise ValueError(f"'{field}' 필드를 찾을 수 없습니다.")
+        return self.df[field]
+
+    def _coerce(self, field, value):
+        if field in DATE_COLUMNS:
+            parsed = pd.to_datetime(str(value).replace(".", "-"), errors="coerce", format="mixed")
+            if pd.isna(parsed):
+                raise ValueError(f"'{field}' 날짜 형식이 올바르지 않습니다: {value}")
+            return parsed
+        return str(value)
+
+    def mask(self, condition):
+        field = condition.get("field")
+        op = condition.get("op", "eq")
+        value = condition.get("value")
+        col = self._column(field)
+        if field in CATEGORY_COLUMNS and op not in CATEGORY_OPS:
+            raise ValueError(f"'{field}'은 범주형 필드라 {op} 조건을 쓸 수 없습니다. ({', '.join(sorted(CATEGORY_OPS))})")
+
+        if op in ("empty", "not_empty"):
+            empty = self.raw[field].astype(str).str.strip() == ""
+            return empty if op == "empty" else ~empty
+        if op in ("in", "not_in"):
+            values = value if isinstance(value, list) else [value]
+            result = col.isin([self._coerce(field, v) for v in values])
+            return result if op == "in" else ~result
+        if op == "between":
+            if not isinstance(value, list) or len(value) != 2:
+                raise ValueError("between은 [시작, 끝] 두 값이 필요합니다.")
+            low, high = (self._coerce(field, v) if v not in (None, "") else None for v in value)
+            result = pd.Series(True, index=col.index) & col.notna()
+            if low is not None:
+                result &= col >= low
+            if high is not None:
+                result &= col <= high
+            return result
+        if op in ("contains", "startswith"):
+            text = col.astype(str)
+            return text.str.contains(str(value), regex=False) if op == "contains" else text.str.startswith(str(value))
+
+        compare = {"eq": "__eq__", "ne": "__ne__", "gt": "__gt__", "gte": "__ge__", "lt": "__lt__", "lte": "__le__"}
+        if op not in compare:
+            raise ValueError(f"지원하지 않는 연산입니다: {op}")
+        target = self._coerce(field, value)
+        result = getattr(col, compare[op])(target)
+        return result.fillna(op == "ne").astype(bool)
+
+    def query(self, filters=(), fields=None, sort=(), page=1, page_size=50):
+        selected = pd.Series(True, index=self.df.index)
+        for condition in filters:
+            selected &= self.mask(condition)
+        result = self.df[selected]
+
+        if sort:
+            by, ascending = [], []
+            for item in sort:
+                # "가입일자" / "-가입일자" / {"field": "가입일자", "desc": true}
+                if isinstance(item, dict):
+                    name, desc = item.get("field"), bool(item.get("desc"))
+                else:
+                    name, desc = str(item).lstrip("-"), str(item).startswith("-")
+                self._column(name)
+                by.append(name)
+                ascending.append(not desc)
+            result = result.sort_values(by=by, ascending=ascending, kind="mergesort", na_position="last")
+
+        columns = list(self.raw.columns)
+        if fields:
+            for name in fields:
+                self._column(name)
+            columns = list(fields)
+
+        page = max(1, int(page))
+        page_size = min(MAX_PAGE_SIZE, max(1, int(page_size)))
+        index = result.index[(page - 1) * page_size:page * page_size]
+        return len(result), self.raw.loc[index, columns].to_dict("records")
@@ -0,0 +1,154 @@
+import re
+import threading
+from collections import Counter, defaultdict
+
+
+NON_DIGIT = re.compile(r"\D")
+PHONE_GRAM = 3  # 전화번호는 숫자 3-gram으로 색인, 더 짧은 검색어는 색인 없이 전체를 훑음
+
+
+def normalize_name(name):
+    return re.sub(r"\s+", "", str(name)).lower()
+
+
+def normalize_phone(phone):
+    return NON_DIGIT.sub("", str(phone))
+
+
+def name_grams(name):
+    return set(name) | {name[i:i + 2] for i in range(len(name) - 1)}
+
+
+def phone_grams(digits):
+    return {digits[i:i + PHONE_GRAM] for i in range(len(digits) - PHONE_GRAM + 1)}
+
+
+def edit_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+# ✅ 회원 검색 색인 (회원명: 1/2-gram → 부분 일치 + 오타 허용, 휴대폰번호: 숫자만 남긴 3-gram → 앞/뒤/중간 일치)
+# 회원 스냅샷이 바뀌면 행 내용 기준으로 달라진 행만 빼고 넣음 (전체 재색인 없음)
+class MemberSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._headers = None
+        self._entries = {}  # id → (행, 정규화 이름, 숫자만 남긴 전화번호)
+        self._by_row = defaultdict(list)  # 행 tuple → [id]
+        self._name_index = defaultdict(set)
+        self._phone_index = defaultdict(set)
+        self._next_id = 0
+        self.stats = Counter()
+
+    def _add(self, row, name_col, phone_col):
+        entry_id = self._next_id
+        self._next_id += 1
+        name = normalize_name(row[name_col]) if name_col is not None and name_col < len(row) else ""
+        digits = normalize_phone(row[phone_col]) if phone_col is not None and phone_col < len(row) else ""
+        self._entries[entry_id] = (row, name, digits)
+        self._by_row[row].append(entry_id)
+        for gram in name_grams(name):
+            self._name_index[gram].add(entry_id)
+        for gram in phone_grams(digits):
+            self._phone_index[gram].add(entry_id)
+
+    def _remove(self, entry_id):
+        row, name, digits = self._entries.pop(entry_id)
+        self._by_row[row].remove(entry_id)
+        if not self._by_row[row]:
+            del self._by_row[row]
+        for index, grams in ((self._name_index, name_grams(name)), (self._phone_index, phone_grams(digits))):
+            for gram in grams:
+                index[gram].discard(entry_id)
+                if not index[gram]:
+                    del index[gram]
+
+    def sync(self, headers, rows):
+        with self._lock:
+            headers = list(headers)
+            if headers != self._headers:
+                self._headers = headers
+                self._entries, self._by_row = {}, defaultdict(list)
+                self._name_index, self._phone_index = defaultdict(set), defaultdict(set)
+                self.stats["rebuilds"] += 1
+
+            name_col = headers.index("회원명") if "회원명" in headers else None
+            phone_col = headers.index("휴대폰번호") if "휴대폰번호" in headers else None
+            wanted = Counter(tuple(row) for row in rows)
+            for row, ids in list(self._by_row.items()):
+                for entry_id in ids[wanted.get(row, 0):]:
+                    self._remove(entry_id)
+                    self.stats["removed"] += 1
+            for row, count in wanted.items():
+                for _ in range(count - len(self._by_row.get(row, ()))):
+                    self._add(row, name_col, phone_col)
+                    self.stats["added"] += 1
+
+    def _match_name(self, query):
+        # 순위: 0 같음, 1 앞부분 일치, 2 포함, 3+ 오타 거리 (부분 일치가 하나도 없을 때만)
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = sorted((self._name_index.get(g, set()) for g in grams), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        ranks = {}
+        for entry_id in candidates:
+            name = self._entries[entry_id][1]
+            if query in name:
+                ranks[entry_id] = 0 if name == query else 1 if name.startswith(query) else 2
+        if ranks or len(query) < 2:
+            return ranks
+
+        max_distance = 1 if len(query) <= 4 else 2
+        nearby = set().union(*(self._name_index.get(g, set()) for g in name_grams(query)))
+        for entry_id in nearby:
+            name = self._entries[entry_id][1]
+            if abs(len(name) - len(query)) <= max_distance:
+                distance = edit_distance(query, name)
+                if distance <= max_distance:
+                    ranks[entry_id] = 2 + distance
+        self.stats["fuzzy_queries"] += 1
+        return ranks
+
+    def _match_phone(self, digits):
+        # 순위: 0 앞자리 일치 (010-1234), 1 뒷자리 일치 (5678), 2 중간 일치
+        if len(digits) < PHONE_GRAM:
+            candidates = self._entries  # 1~2자리는 거의 모든 번호에 들어 있어 색인으로 줄어들지 않음
+            self.stats["short_phone_scans"] += 1
+        else:
+            postings = sorted((self._phone_index.get(g, set()) for g in phone_grams(digits)), key=len)
+            candidates = set.intersection(*postings)
+        ranks = {}
+        for entry_id in candidates:
+            number = self._entries[entry_id][2]
+            if digits in number:
+                ranks[entry_id] = 0 if number.startswith(digits) else 1 if number.endswith(digits) else 2
+        return ranks
+
+    def search(self, name="", phone="", limit=50):
+        name, digits = normalize_name(name), normalize_phone(phone)
+        if not name and not digits:
+            raise ValueError("이름 또는 전화번호 중 최소 하나를 입력하세요.")
+        if phone and not digits:
+            raise ValueError("전화번호에 숫자가 없습니다.")
+
+        with self._lock:
+            ranked = None
+            for matches in (self._match_name(name) if name else None, self._match_phone(digits) if digits else None):
+                if matches is None:
+                    continue
+                if ranked is None:
+                    ranked = matches
+                else:  # 이름과 전화번호를 같이 주면 둘 다 맞는 회원만
+                    ranked = {i: ranked[i] + rank for i, rank in matches.items() if i in ranked}
+
+            self.stats["queries"] += 1
+            order = sorted(ranked, key=lambda i: (ranked[i], self._entries[i][1], i))[:limit]
+            return [dict(zip(self._headers, self._entries[i][0])) for i in order]
+
+    def info(self):
+        return {**self.stats, "entries": len(self._entries)}
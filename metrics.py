@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+
+from flask import g, has_request_context, request
+
+
+# ✅ 요청 지연 시간 히스토그램 구간 (초)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# ✅ Prometheus 텍스트 형식으로 내보내는 최소 카운터/히스토그램 저장소
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # 이름 → (종류, 설명)
+        self._counters = defaultdict(float)  # (이름, 라벨) → 값
+        self._histograms = {}  # (이름, 라벨) → [구간별 개수..., 합계, 개수]
+        self._buckets = {}
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self._meta[name] = (kind, help_text)
+        if buckets:
+            self._buckets[name] = tuple(buckets)
+
+    def inc(self, name, labels=(), value=1):
+        with self._lock:
+            self._counters[(name, labels)] += value
+
+    def inc_many(self, items):
+        # items: [((이름, 라벨), 값)...], 잠금 한 번으로 여러 카운터 (자주 불리는 파싱 함수용)
+        with self._lock:
+            for key, value in items:
+                self._counters[key] += value
+
+    def observe(self, name, labels, value):
+        buckets = self._buckets.get(name, REQUEST_BUCKETS)
+        with self._lock:
+            h = self._histograms.get((name, labels))
+            if h is None:
+                h = self._histograms[(name, labels)] = [0] * len(buckets) + [0.0, 0]
+            for i, le in enumerate(buckets):
+                if value <= le:
+                    h[i] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def _labels(self, labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{self._escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                buckets = self._buckets.get(name, REQUEST_BUCKETS)
+                for (n, labels), h in sorted(histograms.items()):
+                    if n != name:
+                        continue
+                    for le, count in zip(buckets, h):
+                        lines.append(f"{name}_bucket{self._labels(labels, [('le', le)])} {count}")
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {h[-1]}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {h[-2]}")
+                    lines.append(f"{name}_count{self._labels(labels)} {h[-1]}")
+            else:
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{self._labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("app_request_duration_seconds", "histogram", "Flask 라우트별 처리 시간")
+metrics.describe("app_requests_total", "counter", "라우트/상태 코드별 요청 수")
+metrics.describe("app_sheets_calls_total", "counter", "라우트별 Google Sheets API 호출 수")
+metrics.describe("app_sheets_bytes_total", "counter", "라우트별 Google Sheets 응답 바이트")
+metrics.describe("app_sheets_seconds_total", "counter", "라우트별 Google Sheets API 대기 시간 합계")
+metrics.describe("app_sheets_quota_errors_total", "counter", "라우트별 Google Sheets 할당량 초과(429) 응답 수")
+metrics.describe("app_sheets_errors_total", "counter", "라우트/상태 코드별 Google Sheets 오류 응답 수")
+metrics.describe("app_helper_seconds_total", "counter", "파싱/태그 추출 함수별 소요 시간 합계")
+metrics.describe("app_helper_calls_total", "counter", "파싱/태그 추출 함수별 호출 수")
+
+
+def current_route():
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule else "unmatched"
+    return "background"
+
+
+def request_stats():
+    # 요청 하나 동안 쌓이는 값 (Server-Timing 헤더용), 요청 밖이면 None
+    if not has_request_context():
+        return None
+    if "metrics_acc" not in g:
+        g.metrics_acc = Counter()
+    return g.metrics_acc
+
+
+# ✅ 파싱 함수 소요 시간 기록용 데코레이터
+def timed(helper):
+    def decorator(fn):
+        labels = (("helper", helper),)
+        seconds_key = ("app_helper_seconds_total", labels)
+        calls_key = ("app_helper_calls_total", labels)
+        perf_counter = time.perf_counter
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - started
+                metrics.inc_many(((seconds_key, elapsed), (calls_key, 1)))
+                if has_request_context():
+                    request_stats()["parse_seconds"] += elapsed
+        return wrapper
+    return decorator
+
+
+# ✅ gspread 세션 응답 훅: 모든 Sheets API 호출의 횟수/바이트/시간/오류를 라우트별로 기록
+def record_sheets_response(response, *args, **kwargs):
+    labels = (("route", current_route()),)
+    elapsed = response.elapsed.total_seconds()
+    metrics.inc("app_sheets_calls_total", labels)
+    metrics.inc("app_sheets_bytes_total", labels, len(response.content or b""))
+    metrics.inc("app_sheets_seconds_total", labels, elapsed)
+    if response.status_code == 429:
+        metrics.inc("app_sheets_quota_errors_total", labels)
+    elif response.status_code >= 400:
+        metrics.inc("app_sheets_errors_total", labels + (("status", response.status_code),))
+
+    acc = request_stats()
+    if acc is not None:
+        acc["sheets_calls"] += 1
+        acc["sheets_seconds"] += elapsed
+    return response
+
+
+def record_request(response, started):
+    route = current_route()
+    elapsed = time.perf_counter() - started
+    metrics.observe("app_request_duration_seconds", (("route", route), ("method", request.method)), elapsed)
+    metrics.inc("app_requests_total", (("route", route), ("method", request.method), ("status", response.status_code)))
+    return elapsed
+
+
+def server_timing(total):
+    acc = request_stats() or Counter()
+    return ", ".join([
+        f"app;dur={total * 1000:.1f}",
+        f'sheets;dur={acc["sheets_seconds"] * 1000:.1f};desc="{acc["sheets_calls"]} calls"',
+        f"parse;dur={acc['parse_seconds'] * 1000:.1f}",
+    ])
@@ -0,0 +1,212 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+ORDER_SHEET = "제품주문"
+DIMENSIONS = {
+    "member": "회원번호",
+    "month": "월",
+    "product": "제품명",
+    "member_month": "회원번호_월",
+}
+CONFIRMED_VALUES = {"o", "○", "◯", "v", "✔", "y", "yes", "true", "예", "확인", "완료", "수령", "수령완료"}
+MONTH_TEXT = re.compile(r"(\d{4})\s*[-./년]\s*(\d{1,2})")
+FIELDS = ("주문수", "제품가격", "PV", "미수령")
+
+
+def parse_amount(value):
+    text = str(value).replace(",", "").replace("원", "").replace("₩", "").strip()
+    if not text:
+        return 0.0
+    return float(text)  # 숫자가 아니면 ValueError
+
+
+def order_month(value):
+    match = MONTH_TEXT.search(str(value))
+    return f"{match.group(1)}-{int(match.group(2)):02d}" if match else "미상"
+
+
+def is_confirmed(value):
+    return str(value).strip().lower() in CONFIRMED_VALUES
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+# ✅ 제품주문 집계 (회원번호별 / 월별 / 제품명별 / 회원번호×월별 제품가격·PV 합계, 미수령 건수)
+# 처음 한 번만 시트를 chunk 단위로 훑어 만들고 이후에는 추가된 주문만 더함 (로컬 SQLite에 저장)
+# 시트의 실제 데이터 행 수(storage.row_count, 빈 grid 행 제외)가 예상과 다르거나 직접 수정이 감지되면 다시 만든다.
+class OrderRollups:
+    def __init__(self, storage, path, check_interval, scan_rows=5000):
+        self.storage = storage
+        self.path = path
+        self.check_interval = check_interval
+        self.scan_rows = scan_rows
+        self._lock = threading.RLock()
+        self._conn = None
+        self._rollups = None  # 기준 → {키: [주문수, 제품가격, PV, 미수령]}
+        self._row_count = None
+        self._checked_at = 0.0
+        self.stats = Counter()
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS order_rollups (
+                    dim TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    orders INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    pv REAL NOT NULL,
+                    unconfirmed INTEGER NOT NULL,
+                    PRIMARY KEY (dim, key)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS sheet_state (sheet_name TEXT PRIMARY KEY, row_count INTEGER)")
+            self._conn = conn
+        return self._conn
+
+    def _save_state(self, row_count):
+        self._db().execute(
+            "INSERT INTO sheet_state (sheet_name, row_count) VALUES (?, ?) "
+            "ON CONFLICT(sheet_name) DO UPDATE SET row_count = excluded.row_count",
+            (ORDER_SHEET, row_count),
+        )
+
+    def _contributions(self, headers, row):
+        values = dict(zip(headers, row))
+        try:
+            price = parse_amount(values.get("제품가격", ""))
+            pv = parse_amount(values.get("PV", ""))
+        except ValueError:
+            self.stats["invalid_rows"] += 1
+            price = pv = 0.0
+        number = str(values.get("회원번호", "")).strip() or "미상"
+        month = order_month(values.get("주문일자", ""))
+        delta = (1, price, pv, 0 if is_confirmed(values.get("수령확인", "")) else 1)
+        keys = {
+            "member": number,
+            "month": month,
+            "product": str(values.get("제품명", "")).strip() or "미상",
+            "member_month": f"{number}|{month}",
+        }
+        return keys, delta
+
+    def _accumulate(self, rollups, headers, rows):
+        touched = set()
+        for row in rows:
+            if not any(row):
+                continue
+            keys, delta = self._contributions(headers, row)
+            for dim, key in keys.items():
+                total = rollups[dim].setdefault(key, [0, 0.0, 0.0, 0])
+                for i, d in enumerate(delta):
+                    total[i] += d
+                touched.add((dim, key))
+        return touched
+
+    def _write(self, rollups, keys, replace=False):
+        db = self._db()
+        db.execute("BEGIN")
+        if replace:
+            db.execute("DELETE FROM order_rollups")
+        db.executemany(
+            "INSERT INTO order_rollups (dim, key, orders, price, pv, unconfirmed) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(dim, key) DO UPDATE SET orders = excluded.orders, price = excluded.price, "
+            "pv = excluded.pv, unconfirmed = excluded.unconfirmed",
+            ((dim, key, *rollups[dim][key]) for dim, key in keys),
+        )
+        self._save_state(self._row_count)
+        db.execute("COMMIT")
+
+    def _rebuild(self, row_count):
+        headers = self.storage.headers(ORDER_SHEET)
+        rollups = {dim: {} for dim in DIMENSIONS}
+        for chunk in self.storage.iter_chunks(ORDER_SHEET, self.scan_rows):
+            self._accumulate(rollups, headers, chunk)
+        self._rollups = rollups
+        self._row_count = row_count
+        self._write(rollups, [(dim, key) for dim in rollups for key in rollups[dim]], replace=True)
+        self.stats["rebuilds"] += 1
+
+    def _ensure(self):
+        now = time.monotonic()
+        if self._rollups is not None and now - self._checked_at < self.check_interval:
+            return
+
+        actual = self.storage.row_count(ORDER_SHEET)
+        self._checked_at = now
+        if self._rollups is not None and self._row_count == actual:
+            return
+
+        # 다른 워커가 이미 최신 집계를 저장해 두었으면 시트 대신 로컬 파일에서 읽음
+        db = self._db()
+        persisted = db.execute("SELECT row_count FROM sheet_state WHERE sheet_name = ?", (ORDER_SHEET,)).fetchone()
+        if persisted and persisted[0] == actual:
+            rollups = {dim: {} for dim in DIMENSIONS}
+            for dim, key, *totals in db.execute("SELECT dim, key, orders, price, pv, unconfirmed FROM order_rollups"):
+                rollups.setdefault(dim, {})[key] = list(totals)
+            self._rollups = rollups
+            self._row_count = actual
+            self.stats["reloads"] += 1
+        else:
+            self._rebuild(actual)
+
+    def append(self, headers, rows):
+        # 시트에 주문 추가 + 집계 반영을 한 단계로: 사이에 _ensure가 시트를 다시 읽으면 새 주문이 두 번 더해짐
+        with self._lock:
+            self.storage.append_rows(ORDER_SHEET, rows)
+            self.add(headers, rows)
+
+    def add(self, headers, rows):
+        # 시트에 주문이 추가된 뒤 잠금 안에서 호출 (시트 전체를 다시 읽지 않고 추가분만 반영)
+        with self._lock:
+            if self._rollups is None:
+                return
+            touched = self._accumulate(self._rollups, headers, rows)
+            self._row_count += len(rows)
+            self._write(self._rollups, touched)
+            self.stats["incremental_adds"] += len(rows)
+
+    def invalidate(self):
+        # 시트에서 직접 수정됨 (행 수는 그대로일 수 있으므로 저장된 상태도 버림)
+        with self._lock:
+            self._rollups = None
+            self._db().execute("DELETE FROM sheet_state WHERE sheet_name = ?", (ORDER_SHEET,))
+            self.stats["invalidations"] += 1
+
+    def query(self, by, filters=None):
+        # filters: {"회원번호": ..., "월": "2024-06", "제품명": ...} 중 결과 항목에 있는 필드만 적용
+        if by not in DIMENSIONS:
+            raise ValueError(f"by는 {', '.join(DIMENSIONS)} 중 하나여야 합니다.")
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        with self._lock:
+            self._ensure()
+            items = list(self._rollups[by].items())
+            overall = [0, 0.0, 0.0, 0]
+            for totals in self._rollups["month"].values():
+                for i, v in enumerate(totals):
+                    overall[i] += v
+
+        result = []
+        for key, totals in sorted(items):
+            if by == "member_month":
+                number, _, month = key.partition("|")
+                entry = {"회원번호": number, "월": month}
+            else:
+                entry = {DIMENSIONS[by]: key}
+            if any(name in entry and entry[name] != value for name, value in filters.items()):
+                continue
+            entry.update({name: _number(v) for name, v in zip(FIELDS, totals)})
+            result.append(entry)
+        return result, {name: _number(v) for name, v in zip(FIELDS, overall)}
+
+    def info(self):
+        rollups = self._rollups or {}
+        return {**self.stats, "row_count": self._row_count, **{dim: len(rollups.get(dim, {})) for dim in DIMENSIONS}}
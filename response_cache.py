@@ -0,0 +1,52 @@
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+# ✅ 읽기 응답 캐시 (키: 경로 + 정규화한 조회 조건 + 관련 시트 revision)
+# revision은 앱이 쓰거나 시트 직접 수정이 감지될 때 올라가므로 그 전까지는 같은 키 → 다시 계산하지 않음
+# 변경 감지가 꺼져 있어도 오래된 결과가 남지 않도록 ttl이 지나면 다시 계산 (내용이 같으면 ETag도 같음)
+class ResponseCache:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # 키 → (ETag, 본문, 상태코드, 저장 시각)
+        self._revisions = Counter()
+        self.stats = Counter()
+
+    def bump(self, sheet_name):
+        with self._lock:
+            self._revisions[sheet_name] += 1
+
+    def revisions(self, sheet_names):
+        with self._lock:
+            return tuple(self._revisions[name] for name in sheet_names)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[3] >= self.ttl:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, body, status):
+        etag = hashlib.sha1(body).hexdigest()[:20]
+        entry = (etag, body, status, time.monotonic())
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return entry
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "ttl": self.ttl, "revisions": dict(self._revisions)}
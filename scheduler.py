@@ -0,0 +1,185 @@
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import has_request_context
+
+from metrics import metrics
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 쓰기는 429(실행되지 않고 거절됨)만 재시도, 5xx/연결 오류는 이미 반영됐을 수 있으므로
+# 같은 범위를 같은 값으로 덮어쓰는 호출만 재시도 (행 삽입/삭제/append는 두 번 실행되면 행이 늘거나 더 지워짐)
+WRITE_RETRY_STATUSES = {429}
+IDEMPOTENT_WRITE_SUFFIXES = ("values:batchUpdate", "values:batchClear", ":clear")
+
+
+def is_idempotent_write(method, endpoint):
+    return method.lower() == "put" or str(endpoint).endswith(IDEMPOTENT_WRITE_SUFFIXES)
+
+# 숫자가 작을수록 먼저 처리: 요청 처리 중 읽기 → 요청 처리 중 쓰기 → 백그라운드 읽기 → 백그라운드 쓰기
+PRIORITY_INTERACTIVE_READ = 0
+PRIORITY_INTERACTIVE_WRITE = 1
+PRIORITY_BACKGROUND_READ = 2
+PRIORITY_BACKGROUND_WRITE = 3
+
+metrics.describe("app_sheets_throttle_seconds_total", "counter", "토큰 버킷 대기 시간 합계 (읽기/쓰기별)")
+metrics.describe("app_sheets_retries_total", "counter", "429/5xx/연결 오류로 다시 시도한 Sheets 호출 수 (쓰기는 429 또는 같은 범위 덮어쓰기만)")
+metrics.describe("app_sheets_coalesced_total", "counter", "진행 중인 같은 읽기 요청에 합쳐진 호출 수")
+
+
+# ✅ 분당 할당량 크기의 토큰 버킷 (토큰이 모자라면 우선순위 순서대로 대기)
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority):
+        started = time.monotonic()
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            while True:
+                self._refill()
+                if self._waiters[0] == entry:
+                    if self.tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= 1
+                        self._cond.notify_all()
+                        return time.monotonic() - started
+                    self._cond.wait((1 - self.tokens) / self.rate)
+                else:
+                    self._cond.wait(0.5)
+
+    def waiting(self):
+        with self._cond:
+            return len(self._waiters)
+
+
+# ✅ 모든 Sheets API 호출이 지나가는 스케줄러
+# gspread Client.request를 감싸서 할당량 대기, 우선순위, 재시도, 같은 읽기 합치기(single-flight)를 처리
+# 쓰기가 끝날 때마다 write epoch를 올리고 읽기 합치기 키에 포함 → 쓰기 뒤의 읽기는 쓰기 전에 시작한 읽기에 합쳐지지 않음
+class SheetsScheduler:
+    def __init__(self, read_per_minute, write_per_minute, max_retries, base_delay, max_delay):
+        self.read_bucket = TokenBucket(read_per_minute)
+        self.write_bucket = TokenBucket(write_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._write_epoch = 0
+        self.stats = Counter()
+
+    def wrap(self, request_fn):
+        def scheduled_request(method, endpoint, params=None, *args, **kwargs):
+            is_read = method.lower() == "get"
+            idempotent = is_read or is_idempotent_write(method, endpoint)
+            call = lambda: self._call(request_fn, is_read, (method, endpoint, params) + args, kwargs, idempotent)
+            if not is_read:
+                try:
+                    return call()
+                finally:
+                    with self._inflight_lock:
+                        self._write_epoch += 1
+            with self._inflight_lock:
+                epoch = self._write_epoch
+            key = (epoch, endpoint, json.dumps(params, sort_keys=True, default=str))
+            return self._single_flight(key, call)
+
+        scheduled_request.__wrapped__ = request_fn
+        return scheduled_request
+
+    def _single_flight(self, key, call):
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = {"done": threading.Event()}
+
+        if not leader:
+            self.stats["coalesced"] += 1
+            metrics.inc("app_sheets_coalesced_total")
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["result"]
+
+        try:
+            flight["result"] = call()
+            return flight["result"]
+        except Exception as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight["done"].set()
+
+    def _retry_delay(self, attempt, error):
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.max_delay, float(retry_after))
+        # full jitter 지수 백오프
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call(self, request_fn, is_read, args, kwargs, idempotent=True):
+        # gspread 클라이언트 요청에서만 불리므로 이 시점에는 이미 로드돼 있음 (app 시작 시 import하지 않도록)
+        import requests
+        from gspread.exceptions import APIError
+
+        interactive = has_request_context()
+        if is_read:
+            bucket, kind = self.read_bucket, "read"
+            priority = PRIORITY_INTERACTIVE_READ if interactive else PRIORITY_BACKGROUND_READ
+        else:
+            bucket, kind = self.write_bucket, "write"
+            priority = PRIORITY_INTERACTIVE_WRITE if interactive else PRIORITY_BACKGROUND_WRITE
+
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire(priority)
+            if waited > 0.001:
+                self.stats[f"{kind}_wait_seconds"] += waited
+                metrics.inc("app_sheets_throttle_seconds_total", (("kind", kind),), waited)
+            self.stats[f"{kind}_calls"] += 1
+            try:
+                return request_fn(*args, **kwargs)
+            except (APIError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if idempotent:
+                    retryable = status in RETRY_STATUSES or not isinstance(e, APIError)
+                else:
+                    retryable = status in WRITE_RETRY_STATUSES
+                    if not retryable:
+                        self.stats["write_not_retried"] += 1
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+                self.stats["retries"] += 1
+                metrics.inc("app_sheets_retries_total", (("status", status or "connection"),))
+                print(f"[Sheets 재시도] {status or type(e).__name__} → {delay:.1f}초 후 다시 시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def info(self):
+        return {
+            **self.stats,
+            "read_tokens": round(self.read_bucket.tokens, 2),
+            "write_tokens": round(self.write_bucket.tokens, 2),
+            "waiting": self.read_bucket.waiting() + self.write_bucket.waiting(),
+            "write_epoch": self._write_epoch,
+        }
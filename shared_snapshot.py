@@ -0,0 +1,389 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 모든 프로세스가 직접 발행
+    fcntl = None
+
+
+MAGIC = b"MTSNAP01"
+HEADER = struct.Struct("<8sQdII")  # magic, 세대, 데이터 기준 시각, 목차 길이, 데이터 시작 위치
+CELL_SEP = "\x1f"
+
+
+def _key_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+# ---- 쓰기 (발행 워커만) ----
+def write_snapshot(path, generation, as_of, sheets, index_columns, writes=None):
+    # 파일 구조: [헤더][목차 JSON][시트별: 행 offset 배열(uint32) | 행 데이터(UTF-8, 셀 구분 \x1f) | 색인(해시 uint64 정렬 | 행 번호 uint32)]
+    # 목차의 위치는 데이터 시작 기준 상대값, 배열은 8바이트 정렬
+    # writes: 시트 → 이 스냅샷에 반영된 워커 쓰기 번호 (공유 쓰기 카운터 기준)
+    sections, directory, pos = [], {}, 0
+
+    def add(data):
+        nonlocal pos
+        start = pos
+        sections.append(data)
+        pos += len(data)
+        padding = _align(pos) - pos
+        if padding:
+            sections.append(b"\0" * padding)
+            pos += padding
+        return start
+
+    for sheet_name, values in sheets.items():
+        headers = [str(h) for h in values[0]] if values else []
+        rows = [CELL_SEP.join(str(v) for v in row).encode("utf-8") for row in values[1:]]
+        offsets = array("I", [0])
+        for row in rows:
+            offsets.append(offsets[-1] + len(row))
+        entry = {
+            "headers": headers,
+            "rows": len(rows),
+            "offsets": add(offsets.tobytes()),
+            "blob": add(b"".join(rows)),
+            "indexes": {},
+            "writes": (writes or {}).get(sheet_name, 0),
+        }
+        for col_name in index_columns.get(sheet_name, []):
+            if col_name not in headers:
+                continue
+            col = headers.index(col_name)
+            pairs = sorted(
+                (_key_hash(str(row[col])), i) for i, row in enumerate(values[1:]) if col < len(row) and str(row[col])
+            )
+            entry["indexes"][col_name] = {
+                "count": len(pairs),
+                "hashes": add(array("Q", [h for h, _ in pairs]).tobytes()),
+                "positions": add(array("I", [i for _, i in pairs]).tobytes()),
+            }
+        directory[sheet_name] = entry
+
+    dir_bytes = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+    data_start = _align(HEADER.size + len(dir_bytes))
+    head = HEADER.pack(MAGIC, generation, as_of, len(dir_bytes), data_start) + dir_bytes
+    head += b"\0" * (data_start - len(head))
+
+    # 같은 디렉터리에 임시 파일로 쓰고 rename → 읽는 쪽은 이전 파일 또는 새 파일만 보게 됨
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(head)
+            for data in sections:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return data_start + pos
+
+
+# ---- 읽기 (모든 워커, mmap 위에서 복사 없이) ----
+class SheetIndexView:
+    # dict처럼 .get(값) → 행 번호 목록 (시트 순서), 없으면 None
+    def __init__(self, sheet, col, count, hashes, positions):
+        self._sheet = sheet
+        self._col = col
+        self._hashes = hashes[:count * 8].cast("Q")
+        self._positions = positions[:count * 4].cast("I")
+
+    def get(self, value, default=None):
+        value = str(value)
+        target = _key_hash(value)
+        i = bisect.bisect_left(self._hashes, target)
+        found = []
+        while i < len(self._hashes) and self._hashes[i] == target:
+            row_index = self._positions[i]
+            row = self._sheet[row_index]
+            if self._col < len(row) and row[self._col] == value:  # 해시 충돌 확인
+                found.append(row_index)
+            i += 1
+        return found or default
+
+    def __getitem__(self, value):
+        found = self.get(value)
+        if found is None:
+            raise KeyError(value)
+        return found
+
+    def __contains__(self, value):
+        return self.get(value) is not None
+
+
+class SheetView:
+    # 헤더를 뺀 행들의 읽기 전용 시퀀스, 행은 꺼낼 때만 디코딩
+    def __init__(self, buf, entry):
+        self.headers = entry["headers"]
+        self.writes = entry.get("writes", 0)
+        self._count = entry["rows"]
+        self._offsets = buf[entry["offsets"]:entry["offsets"] + (self._count + 1) * 4].cast("I")
+        self._blob = buf[entry["blob"]:entry["blob"] + self._offsets[self._count]]
+        self._indexes = {
+            col_name: SheetIndexView(self, self.headers.index(col_name), spec["count"], buf[spec["hashes"]:], buf[spec["positions"]:])
+            for col_name, spec in entry["indexes"].items()
+        }
+
+    def __len__(self):
+        return self._count
+
+    def _row(self, i):
+        cells = bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8").split(CELL_SEP)
+        return cells + [""] * (len(self.headers) - len(cells))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._row(i)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._row(i)
+
+    def index(self, col_name):
+        return self._indexes.get(col_name)
+
+
+class Snapshot:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.generation, self.as_of, dir_len, data_start = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"스냅샷 파일 형식이 아닙니다: {path}")
+        directory = json.loads(bytes(self._mm[HEADER.size:HEADER.size + dir_len]).decode("utf-8"))
+        buf = memoryview(self._mm)[data_start:]
+        self.sheets = {name: SheetView(buf, entry) for name, entry in directory.items()}
+        self.size = len(self._mm)
+
+    # mmap은 명시적으로 닫지 않음: 이전 세대를 쓰는 요청이 끝나 참조가 사라지면 함께 해제됨
+
+
+# ✅ 워커 간 공유 시트 스냅샷 (gunicorn 워커마다 시트 사본/API 호출을 두지 않도록)
+# 발행: 잠금 파일을 잡은 워커 하나만 시트를 읽어 스냅샷 파일을 새로 쓰고 rename (세대 +1)
+# 읽기: 모든 워커가 같은 파일을 mmap, 파일이 바뀌면 다음 요청부터 새 세대로 교체
+# 쓰기 알림: 시트에 쓴 워커는 <path>.writes 의 시트별 쓰기 번호를 올리고(파일 잠금), 발행 워커는 이 번호가
+# 바뀐 시트를 다시 읽어 발행하며 스냅샷에 반영된 번호를 함께 기록
+# 쓴 워커는 자기 쓰기 번호 이상이 기록된 세대가 나올 때까지 해당 시트 스냅샷을 쓰지 않음
+# load(시트, reload): reload면 발행 워커의 사본이 다른 워커의 쓰기를 모르므로 시트에서 다시 읽어야 함
+# refresh_interval: 시트 직접 수정을 알려 줄 증분 동기화가 없을 때 이 주기(초)마다 모든 시트를 다시 발행 (None이면 안 함)
+class SharedSnapshot:
+    def __init__(self, path, sheet_names, index_columns, load, as_of, interval, check_interval=1.0, on_lead=None,
+                 refresh_interval=None):
+        self.path = path
+        self.sheet_names = list(sheet_names)
+        self.index_columns = index_columns
+        self._load = load
+        self._as_of = as_of
+        self.interval = interval
+        self.check_interval = check_interval
+        self.on_lead = on_lead
+        self.refresh_interval = refresh_interval
+        self._published_at = None  # 발행 워커: 마지막 발행 시각 (monotonic)
+        self._lock = threading.Lock()
+        self._current = None
+        self._file_id = None
+        self._checked_at = 0.0
+        self._writes_path = path + ".writes"
+        self._writes_lock = threading.Lock()
+        self._written = {}  # 시트 → 이 워커가 마지막으로 받은 쓰기 번호
+        self._own_writes = Counter()  # 시트 → 이 워커가 쓴 횟수
+        self._published_writes = {}  # 발행 워커: 마지막 발행에 반영한 쓰기 번호
+        self._published_own = {}  # 발행 워커: 그때까지 자기가 쓴 횟수
+        self._dirty = set(self.sheet_names)
+        self._lock_file = None
+        self.is_leader = False
+        self._thread = None
+        self.stats = Counter()
+
+    # ---- 읽기 ----
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._current
+        with self._lock:
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return self._current
+            file_id = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if file_id != self._file_id:
+                try:
+                    self._current = Snapshot(self.path)
+                    self._file_id = file_id
+                    self.stats["generation_swaps"] += 1
+                except (OSError, ValueError, struct.error) as e:
+                    self.stats["open_errors"] += 1
+                    print(f"[공유 스냅샷] 열기 실패: {e}")
+            return self._current
+
+    def sheet(self, sheet_name):
+        # (세대, SheetView) 또는 None (스냅샷이 없거나 이 워커가 쓴 내용보다 오래된 경우)
+        snapshot = self.current()
+        if snapshot is None or sheet_name not in snapshot.sheets:
+            return None
+        view = snapshot.sheets[sheet_name]
+        if view.writes < self._written.get(sheet_name, 0):
+            self.stats["stale_skips"] += 1
+            return None
+        return snapshot.generation, view
+
+    # ---- 쓰기 알림 (모든 워커 공용 카운터 파일) ----
+    def _open_writes(self, exclusive):
+        f = open(self._writes_path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        f.seek(0)
+        try:
+            counts = json.loads(f.read() or "{}")
+        except ValueError:
+            counts = {}
+        return f, counts
+
+    def read_writes(self):
+        with self._writes_lock:
+            f, counts = self._open_writes(exclusive=False)
+            f.close()  # 닫으면 잠금도 풀림
+        return counts
+
+    def mark_written(self, sheet_name):
+        if sheet_name not in self.sheet_names:
+            return
+        self._own_writes[sheet_name] += 1
+        try:
+            with self._writes_lock:
+                f, counts = self._open_writes(exclusive=True)
+                try:
+                    counts[sheet_name] = counts.get(sheet_name, 0) + 1
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(counts, ensure_ascii=False))
+                    f.flush()
+                finally:
+                    f.close()
+            self._written[sheet_name] = counts[sheet_name]
+        except OSError as e:
+            # 번호를 못 남겼으면 이 워커는 다음 쓰기가 성공할 때까지 해당 시트를 직접 읽음
+            self._written[sheet_name] = float("inf")
+            self.stats["write_signal_errors"] += 1
+            print(f"[공유 스냅샷] 쓰기 알림 실패: {e}")
+        self._dirty.add(sheet_name)
+
+    def mark_dirty(self, sheet_name):
+        if sheet_name in self.sheet_names:
+            self._dirty.add(sheet_name)
+
+    # ---- 발행 ----
+    def _try_lead(self):
+        if self.is_leader:
+            return True
+        if fcntl is not None:
+            lock_file = open(self.path + ".lock", "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file  # 프로세스가 끝나면 잠금이 풀려 다른 워커가 이어받음
+        self.is_leader = True
+        # 이전 발행 워커가 반영한 쓰기는 새로 시작하는 사본(처음 읽기)에 들어 있음
+        self._published_own = dict(self._own_writes)
+        self._published_writes = self.read_writes()
+        print(f"[공유 스냅샷] 발행 워커: pid {os.getpid()}")
+        if self.on_lead:
+            self.on_lead()
+        return True
+
+    def _collect_writes(self):
+        # 발행 뒤 쓰기 번호가 바뀐 시트 → 다시 발행
+        counts = self.read_writes()
+        for sheet_name in self.sheet_names:
+            if counts.get(sheet_name, 0) != self._published_writes.get(sheet_name, 0):
+                self._dirty.add(sheet_name)
+
+    def publish(self):
+        own = dict(self._own_writes)  # 쓰기 번호보다 먼저 → 사이에 끼어든 자기 쓰기는 다른 워커 쓰기로 취급(다시 읽을 뿐)
+        writes = self.read_writes()
+        as_of = self._as_of()
+        dirty, self._dirty = self._dirty, set()
+        reload = {
+            sheet_name for sheet_name in self.sheet_names
+            if writes.get(sheet_name, 0) - self._published_writes.get(sheet_name, 0)
+            > own.get(sheet_name, 0) - self._published_own.get(sheet_name, 0)
+        }
+        try:
+            sheets = {sheet_name: self._load(sheet_name, sheet_name in reload) for sheet_name in self.sheet_names}
+            previous = self.current()
+            generation = (previous.generation if previous else 0) + 1
+            size = write_snapshot(self.path, generation, as_of, sheets, self.index_columns, writes)
+        except Exception:
+            self._dirty |= dirty
+            raise
+        self._published_writes, self._published_own = writes, own
+        self._published_at = time.monotonic()
+        self.stats["foreign_reloads"] += len(reload)
+        self._checked_at = 0.0
+        self.stats["publishes"] += 1
+        print(f"[공유 스냅샷] {generation}세대 발행 ({size:,} bytes)")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shared-snapshot", daemon=True)
+                self._thread.start()
+
+    def tick(self):
+        if self._try_lead():
+            self._collect_writes()
+            if (
+                self.refresh_interval is not None and self._published_at is not None
+                and time.monotonic() - self._published_at >= self.refresh_interval
+            ):
+                self._dirty.update(self.sheet_names)
+                self.stats["refreshes"] += 1
+            if self._dirty:
+                self.publish()
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[공유 스냅샷 오류] {e}")
+            time.sleep(self.interval)
+
+    def info(self):
+        snapshot = self._current
+        return {
+            **self.stats,
+            "leader": self.is_leader,
+            "generation": snapshot.generation if snapshot else None,
+            "as_of": snapshot.as_of if snapshot else None,
+            "bytes": snapshot.size if snapshot else None,
+            "sheets": {n: len(v) for n, v in snapshot.sheets.items()} if snapshot else {},
+            "writes": {n: v.writes for n, v in snapshot.sheets.items()} if snapshot else {},
+            "dirty": sorted(self._dirty),
+        }
@@ -0,0 +1,52 @@
+import importlib
+import os
+import sys
+import time
+
+
+HEAVY_MODULES = ("pandas", "numpy", "gspread", "oauth2client", "openpyxl", "xlrd", "MeCab")
+STARTUP_IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "1.0"))  # 초, app import가 이보다 길면 경고
+
+
+# ✅ 시작 시간 기록 (app import / 설정 확인 / 미리 준비 단계별 소요 시간, 처음 쓸 때 불러온 무거운 모듈)
+# app.py가 가장 먼저 import하므로 여기서 잰 시각이 app 모듈 import 시작 시각
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}        # 단계 → 시작부터 걸린 초
+        self.lazy_imports = {}  # 모듈 → 처음 import에 걸린 초
+        self.eager_heavy = []   # app import가 끝났을 때 이미 올라와 있던 무거운 모듈
+
+    def mark(self, phase):
+        self.phases[phase] = round(time.perf_counter() - self.started, 4)
+        if phase == "import":
+            self.eager_heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def lazy_import(self, module_name):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        t = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.lazy_imports.setdefault(module_name, round(time.perf_counter() - t, 4))
+        return module
+
+    def report(self):
+        imported = self.phases.get("import")
+        line = f"[시작] app import {imported:.2f}초" if imported is not None else "[시작]"
+        if self.eager_heavy:
+            line += f", import 시점에 로드된 무거운 모듈: {', '.join(self.eager_heavy)}"
+        print(line)
+        if imported is not None and imported > STARTUP_IMPORT_BUDGET:
+            print(f"[시작] app import가 기준 {STARTUP_IMPORT_BUDGET:.2f}초를 넘었습니다. 새로 추가된 모듈 수준 import를 확인하세요.")
+
+    def info(self):
+        return {
+            "phases": self.phases,
+            "lazy_imports": self.lazy_imports,
+            "eager_heavy_modules": self.eager_heavy,
+            "import_budget": STARTUP_IMPORT_BUDGET,
+        }
+
+
+startup = StartupReport()
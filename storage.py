@@ -0,0 +1,873 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+def rowcol_to_a1(row, col):
+    # gspread.utils.rowcol_to_a1과 같은 결과 (gspread 전체를 import하지 않도록 직접 계산)
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"{letters}{row}"
+
+
+# ✅ 로컬에 미러링할 시트와 시트별 키/인덱스 컬럼
+MIRRORED_SHEETS = ["DB", "제품주문", "후원수당", "상담일지", "개인메모", "활동일지"]
+SHEET_KEYS = {"DB": "회원명"}  # 수정/삭제를 Sheets에 다시 반영할 때 행을 찾는 기준
+SHEET_INDEXES = {
+    "DB": ["회원명", "회원번호", "휴대폰번호"],
+    "제품주문": ["회원번호", "회원명", "주문일자"],
+    "후원수당": ["회원번호", "회원명"],
+    "상담일지": ["회원명"],
+    "개인메모": ["회원명"],
+    "활동일지": ["회원명"],
+}
+LOCATOR_COLUMNS = {"DB": ["회원명", "회원번호"]}  # 쓰기 전에 행 번호를 찾는 열 (Sheets 백엔드)
+SYNC_CLAIM_TIMEOUT = 600  # 초, 처리 중 죽은 워커가 잡고 있던 outbox 항목을 다시 가져오는 기준
+
+
+# ✅ 한 행의 변경 셀 {열 번호: 값}을 인접한 열끼리 묶은 batch_update 범위 목록으로 변환
+def row_change_ranges(row_index, changes):
+    if not changes:
+        return []
+
+    cols = sorted(changes)
+    data = []
+    start = prev = cols[0]
+    for col in cols[1:] + [None]:
+        if col is not None and col == prev + 1:
+            prev = col
+            continue
+        data.append({
+            "range": f"{rowcol_to_a1(row_index, start)}:{rowcol_to_a1(row_index, prev)}",
+            "values": [[changes[c] for c in range(start, prev + 1)]],
+        })
+        start = prev = col
+    return data
+
+
+# ✅ 한 행의 변경된 셀만 모아 batch_update 한 번으로 기록
+def write_row_changes(sheet, row_index, changes):
+    if not changes:
+        return 0
+    # update_cell과 같은 방식으로 값 해석
+    sheet.batch_update(row_change_ranges(row_index, changes), value_input_option="USER_ENTERED")
+    return len(changes)
+
+
+# ✅ 여러 건 upsert 계획: 한 번 읽은 값 기준으로 행별 변경 셀과 새 행을 계산
+# 결과: (행 번호(0부터, 헤더 제외) → {열 번호: 값}, 새 행 목록(먼저 들어온 순), 건별 결과)
+def plan_upserts(values, key_column, records):
+    headers = values[0] if values else []
+    if key_column not in headers:
+        raise LookupError(f"'{key_column}' 컬럼을 찾을 수 없습니다.")
+    key_col = headers.index(key_column)
+    rows = [list(row) + [''] * (len(headers) - len(row)) for row in values[1:]]
+    first_row = {}
+    for i, row in enumerate(rows):
+        first_row.setdefault(row[key_col], i)
+
+    changes = {}
+    new_rows = {}
+    results = []
+    for record in records:
+        key = str(record.get(key_column) or "").strip()
+        if not key:
+            results.append({key_column: key, "결과": "오류", "error": f"{key_column}은 필수입니다"})
+            continue
+        fields = {h: v for h, v in record.items() if h in headers}
+        if key in first_row:
+            row = rows[first_row[key]]
+            changed = {headers.index(h) + 1: v for h, v in fields.items() if str(row[headers.index(h)]) != str(v)}
+            for col, v in changed.items():
+                row[col - 1] = str(v)
+            if changed:
+                changes.setdefault(first_row[key], {}).update(changed)
+            results.append({key_column: key, "결과": "수정" if changed else "변경없음"})
+        else:
+            # 같은 요청 안에서 다시 나온 새 회원은 앞에서 추가한 행에 합침 (행은 하나만 추가됨)
+            merged = key in new_rows
+            row = new_rows.setdefault(key, [''] * len(headers))
+            for h, v in fields.items():
+                row[headers.index(h)] = v
+            results.append({key_column: key, "결과": "병합" if merged else "추가"})
+    return changes, list(new_rows.values()), results
+
+
+# ✅ 키 → 행 번호 위치 색인 (Sheets 백엔드 전용)
+# 행마다 순번을 붙이고 열별로 {값: [순번...]} 사전을 두어 찾기는 O(1)
+# 행 번호 = 순번 - 맨 위 순번 + 2 - (그 위에서 지워진 행 수) → 2행 삽입/삭제 때 다른 행의 순번은 그대로
+# 찾은 행은 쓰기 전에 그 한 행만 다시 읽어 확인하고, 다르면(시트 직접 수정) 키 열만 다시 받아 재구성
+LOCATOR_COMPACT_DELETES = 1000  # 지워진 순번이 이만큼 쌓이면 순번을 다시 매김
+
+
+class _LocatedSheet:
+    def __init__(self, columns):
+        # columns: {열 이름: [2행부터 값...]}
+        self.top = 0  # 2행의 순번 (맨 위 삽입마다 1씩 감소)
+        self.end = max((len(values) for values in columns.values()), default=0)  # 다음 맨 아래 추가 순번
+        self.deleted = []  # 지워진 순번 (정렬)
+        self.values = {}  # 열 → {순번: 값}
+        self.positions = {}  # 열 → {값: [순번...]}
+        for name, values in columns.items():
+            self.values[name] = dict(enumerate(values))
+            positions = self.positions[name] = {}
+            for seq, value in enumerate(values):
+                found = positions.get(value)
+                if found is None:
+                    positions[value] = [seq]
+                else:
+                    found.append(seq)
+
+    def set_row(self, seq, row):
+        for name, value in row.items():
+            if name not in self.values:
+                continue
+            old = self.values[name].get(seq)
+            if old == value:
+                continue
+            if old is not None:
+                self.positions[name][old].remove(seq)
+                if not self.positions[name][old]:
+                    del self.positions[name][old]
+            self.values[name][seq] = value
+            self.positions[name].setdefault(value, []).append(seq)
+
+    def drop_row(self, seq):
+        for name, values in self.values.items():
+            value = values.pop(seq, None)
+            if value is not None:
+                self.positions[name][value].remove(seq)
+                if not self.positions[name][value]:
+                    del self.positions[name][value]
+        bisect.insort(self.deleted, seq)
+
+    def row_number(self, seq):
+        return seq - self.top + 2 - bisect.bisect_right(self.deleted, seq)
+
+    def seq(self, row_number):
+        # row_number번째 행의 순번: 위에서 지워진 행 수만큼 뒤로 밀어 가며 고정점 탐색
+        offset = row_number - 2
+        seq = self.top + offset
+        while True:
+            candidate = self.top + offset + bisect.bisect_right(self.deleted, seq)
+            if candidate == seq:
+                return seq if seq < self.end else None
+            seq = candidate
+
+    def __len__(self):
+        return self.end - self.top - len(self.deleted)
+
+
+class RowLocator:
+    def __init__(self, columns):
+        self.columns = columns
+        self._lock = threading.Lock()
+        self._sheets = {}  # 시트 → _LocatedSheet
+        self.stats = Counter()
+
+    def tracks(self, sheet_name, column=None):
+        names = self.columns.get(sheet_name, [])
+        return bool(names) if column is None else column in names
+
+    def loaded(self, sheet_name):
+        return sheet_name in self._sheets
+
+    def _records(self, sheet_name, headers, rows):
+        cols = {name: headers.index(name) for name in self.columns.get(sheet_name, []) if name in headers}
+        return [{name: str(row[col]) if col < len(row) else "" for name, col in cols.items()} for row in rows]
+
+    def load(self, sheet_name, headers, rows):
+        # rows: 헤더 아래 행들 (전체 행 또는 키 열만 담은 행)
+        columns = {}
+        for name in self.columns.get(sheet_name, []):
+            col = headers.index(name) if name in headers else None
+            columns[name] = [str(row[col]) if col is not None and col < len(row) else "" for row in rows]
+        located = _LocatedSheet(columns)
+        with self._lock:
+            self._sheets[sheet_name] = located
+            self.stats["loads"] += 1
+
+    def rows(self, sheet_name, column, value):
+        with self._lock:
+            located = self._sheets[sheet_name]
+            return sorted(located.row_number(seq) for seq in located.positions[column].get(value, ()))
+
+    def update(self, sheet_name, row_number, record):
+        with self._lock:
+            located = self._sheets.get(sheet_name)
+            if located is None:
+                return
+            seq = located.seq(row_number)
+            if seq is not None:
+                located.set_row(seq, {name: str(value) for name, value in record.items()})
+
+    def insert(self, sheet_name, row_number, headers, rows):
+        records = self._records(sheet_name, headers, rows)
+        with self._lock:
+            located = self._sheets.get(sheet_name)
+            if located is None:
+                return
+            if row_number != 2:
+                # 맨 위가 아닌 곳에 끼워 넣는 경우는 없음 → 다음 찾기 때 키 열을 다시 받음
+                del self._sheets[sheet_name]
+                return
+            located.top -= len(records)
+            for seq, record in enumerate(records, located.top):
+                located.set_row(seq, record)
+            self.stats["shifted_inserts"] += len(records)
+
+    def append(self, sheet_name, headers, rows):
+        records = self._records(sheet_name, headers, rows)
+        with self._lock:
+            located = self._sheets.get(sheet_name)
+            if located is None:
+                return
+            for record in records:
+                located.set_row(located.end, record)
+                located.end += 1
+
+    def delete(self, sheet_name, row_number):
+        with self._lock:
+            located = self._sheets.get(sheet_name)
+            if located is None:
+                return
+            seq = located.seq(row_number)
+            if seq is None:
+                return
+            located.drop_row(seq)
+            self.stats["shifted_deletes"] += 1
+            if len(located.deleted) >= LOCATOR_COMPACT_DELETES:
+                self._compact(sheet_name, located)
+
+    def _compact(self, sheet_name, located):
+        live = sorted(set(range(located.top, located.end)) - set(located.deleted))
+        columns = {name: [values.get(seq, "") for seq in live] for name, values in located.values.items()}
+        self._sheets[sheet_name] = _LocatedSheet(columns)
+        self.stats["compactions"] += 1
+
+    def invalidate(self, sheet_name):
+        with self._lock:
+            self._sheets.pop(sheet_name, None)
+
+    def info(self):
+        with self._lock:
+            rows = {name: len(located) for name, located in self._sheets.items()}
+        return {**self.stats, "rows": rows}
+
+
+# ✅ 저장소 공통 동작
+# read_all(시트) → [헤더, 행...] / find(시트, 컬럼, 값) → [(row_id, dict)] (시트 순서, Sheets는 위치 색인 + 한 행 확인)
+# update_row / insert_row(맨 위) / delete_row / upsert_many(키 기준 여러 건, 건별 결과) / append_notes(최신이 앞, 맨 위에 삽입)
+# append_rows(맨 아래에 한 번에 추가) / row_count(헤더 포함 실제 데이터 행 수, 끝의 빈 행 제외)
+# iter_chunks(시트, 행 수) → 헤더 아래 행을 위(최신)부터 chunk 단위로 필요할 때만 읽어 옴
+# row_id는 구현마다 다름 (Sheets: 시트 행 번호, SQLite: 로컬 행 id)
+class SheetsBackend:
+    name = "sheets"
+
+    def __init__(self, get_worksheet, row_counts):
+        self._get_worksheet = get_worksheet
+        self._row_counts = row_counts
+        self._headers = {}
+        self.mirror = None  # DeltaSync가 연결되면 읽기는 메모리 사본, 쓰기는 시트 반영 후 사본에도 반영
+        self.on_write = None  # 시트에 쓴 뒤 호출 (시트 이름)
+        self.locator = RowLocator(LOCATOR_COLUMNS)
+
+    def _written(self, sheet_name):
+        if self.on_write is not None:
+            self.on_write(sheet_name)
+
+    def _sheet(self, sheet_name):
+        sheet = self._get_worksheet(sheet_name)
+        if sheet is None:
+            raise LookupError(f"'{sheet_name}' 시트를 찾을 수 없습니다.")
+        return sheet
+
+    def read_all(self, sheet_name):
+        values = self.mirror.values(sheet_name) if self.mirror is not None else None
+        if values is None:
+            return self.read_remote(sheet_name)
+        if values:
+            self._headers[sheet_name] = values[0]
+        return values
+
+    def read_remote(self, sheet_name):
+        values = self._sheet(sheet_name).get_all_values()
+        if values:
+            self._headers[sheet_name] = values[0]
+            if self.locator.tracks(sheet_name):
+                self.locator.load(sheet_name, values[0], values[1:])  # 전체를 읽은 김에 위치 색인도 최신으로
+        return values
+
+    def headers(self, sheet_name):
+        if sheet_name not in self._headers:
+            self._headers[sheet_name] = self._sheet(sheet_name).row_values(1)
+        return self._headers[sheet_name]
+
+    def iter_chunks(self, sheet_name, chunk_size):
+        values = self.mirror.values(sheet_name) if self.mirror is not None else None
+        if values is not None:
+            for i in range(1, len(values), chunk_size):
+                yield values[i:i + chunk_size]
+            return
+
+        sheet = self._sheet(sheet_name)
+        start = 2
+        while True:
+            end = start + chunk_size - 1
+            rows = sheet.get(f"{start}:{end}")  # 행 범위 A1 표기 (열 수를 몰라도 됨)
+            if rows:
+                yield [list(row) for row in rows]
+            # 값 API는 마지막 빈 행을 잘라내므로 덜 채워진 chunk면 끝
+            if len(rows) < chunk_size:
+                return
+            start = end + 1
+
+    def _load_locator(self, sheet_name):
+        # 키 열만 한 번에 받아 재구성 (시트 전체를 내려받지 않음)
+        headers = self.headers(sheet_name)
+        names = [name for name in self.locator.columns[sheet_name] if name in headers]
+        letters = [rowcol_to_a1(1, headers.index(name) + 1)[:-1] for name in names]
+        ranges = self._sheet(sheet_name).batch_get([f"{c}2:{c}" for c in letters], major_dimension="COLUMNS")
+        columns = [(list(r[0]) if r else []) for r in ranges]
+        length = max((len(c) for c in columns), default=0)
+        rows = [[c[i] if i < len(c) else "" for c in columns] for i in range(length)]
+        self.locator.load(sheet_name, names, rows)
+        self.locator.stats["column_reads"] += 1
+
+    def _find_located(self, sheet_name, column, value):
+        # 위치 색인으로 행 번호를 찾고 그 행만 읽어 확인, 어긋나면 키 열을 다시 받아 한 번 더
+        sheet = self._sheet(sheet_name)
+        headers = self.headers(sheet_name)
+        col = headers.index(column)
+        fresh = False
+        if not self.locator.loaded(sheet_name):
+            self._load_locator(sheet_name)
+            fresh = True
+        while True:
+            found, stale = [], False
+            for row_number in self.locator.rows(sheet_name, column, value):
+                row = sheet.row_values(row_number)
+                self.locator.stats["verify_reads"] += 1
+                if col < len(row) and row[col] == value:
+                    found.append((row_number, dict(zip(headers, row + [""] * (len(headers) - len(row))))))
+                else:
+                    stale = True
+                    break
+            if not stale and (found or fresh):
+                self.locator.stats["hits" if found else "misses"] += 1
+                return found
+            if fresh:
+                return None  # 방금 받은 키 열과도 어긋남 (동시에 수정 중) → 전체 읽기로
+            # 어긋났거나, 못 찾았어도 시트에 직접 추가된 행일 수 있으므로 키 열을 다시 받아 한 번 더
+            self.locator.stats["mismatches" if stale else "rechecks"] += 1
+            self._load_locator(sheet_name)
+            fresh = True
+
+    def find(self, sheet_name, column, value):
+        if self.locator.tracks(sheet_name, column) and column in self.headers(sheet_name):
+            found = self._find_located(sheet_name, column, value)
+            if found is not None:
+                return found
+        # 찾은 행 번호로 바로 쓰기/삭제하므로 사본이 아닌 시트에서 읽음
+        values = self.read_remote(sheet_name)
+        if not values or column not in values[0]:
+            return []
+        headers = values[0]
+        col = headers.index(column)
+        return [
+            (i + 2, dict(zip(headers, row)))  # 헤더 포함으로 +2
+            for i, row in enumerate(values[1:])
+            if col < len(row) and row[col] == value
+        ]
+
+    def update_row(self, sheet_name, row_id, changes):
+        headers = self.headers(sheet_name)
+        cells = {headers.index(key) + 1: value for key, value in changes.items() if key in headers}
+        count = write_row_changes(self._sheet(sheet_name), row_id, cells)
+        if count:
+            if self.mirror is not None:
+                self.mirror.local_update(sheet_name, row_id, cells)
+            self.locator.update(sheet_name, row_id, {headers[c - 1]: v for c, v in cells.items()})
+            self._written(sheet_name)
+        return count
+
+    def insert_row(self, sheet_name, record):
+        headers = self.headers(sheet_name)
+        new_row = [''] * len(headers)
+        for key, value in record.items():
+            if key in headers:
+                new_row[headers.index(key)] = value
+        self._sheet(sheet_name).insert_row(new_row, 2)
+        if self.mirror is not None:
+            self.mirror.local_insert(sheet_name, 2, [new_row])
+        self.locator.insert(sheet_name, 2, headers, [new_row])
+        self._written(sheet_name)
+
+    def delete_row(self, sheet_name, row_id):
+        self._sheet(sheet_name).delete_rows(row_id)
+        if self.mirror is not None:
+            self.mirror.local_delete(sheet_name, row_id)
+        self.locator.delete(sheet_name, row_id)
+        self._written(sheet_name)
+
+    def upsert_many(self, sheet_name, key_column, records):
+        # 읽기 1번 + 기존 행 수정 batch_update 1번 + 새 행 insert_rows 1번
+        changes, new_rows, results = plan_upserts(self.read_remote(sheet_name), key_column, records)
+        sheet = self._sheet(sheet_name)
+        data = []
+        for i, cells in sorted(changes.items()):
+            data.extend(row_change_ranges(i + 2, cells))  # 헤더 포함으로 +2
+        if data:
+            sheet.batch_update(data, value_input_option="USER_ENTERED")
+        if new_rows:
+            # 한 건씩 2행에 넣던 것과 같은 순서 (나중에 추가된 회원이 위)
+            sheet.insert_rows(new_rows[::-1], row=2)
+        if self.mirror is not None:
+            for i, cells in changes.items():
+                self.mirror.local_update(sheet_name, i + 2, cells)
+            if new_rows:
+                self.mirror.local_insert(sheet_name, 2, new_rows[::-1])
+        headers = self.headers(sheet_name)
+        for i, cells in changes.items():
+            self.locator.update(sheet_name, i + 2, {headers[c - 1]: v for c, v in cells.items()})
+        if new_rows:
+            self.locator.insert(sheet_name, 2, headers, new_rows[::-1])
+        if data or new_rows:
+            self._written(sheet_name)
+        return results
+
+    def append_notes(self, sheet_name, rows):
+        sheet = self._sheet(sheet_name)
+        if len(rows) == 1:
+            sheet.insert_row(rows[0], index=2)
+        else:
+            # 최신 항목이 위로 오도록 2행에 한 번에 삽입
+            sheet.insert_rows(rows, row=2)
+        if self.mirror is not None:
+            self.mirror.local_insert(sheet_name, 2, rows)
+        if self.locator.tracks(sheet_name):
+            self.locator.insert(sheet_name, 2, self.headers(sheet_name), rows)
+        self._written(sheet_name)
+
+    def append_rows(self, sheet_name, rows):
+        # 시트 끝에 한 번의 호출로 추가 (values.append, 빈 행을 덮어쓰지 않고 새 행을 끼워 넣어 행 수가 늘어남)
+        self._sheet(sheet_name).append_rows(
+            rows, value_input_option="USER_ENTERED", insert_data_option="INSERT_ROWS", table_range="A1",
+        )
+        if self.mirror is not None:
+            self.mirror.local_append(sheet_name, rows)
+        if self.locator.tracks(sheet_name):
+            self.locator.append(sheet_name, self.headers(sheet_name), rows)
+        self._written(sheet_name)
+
+    def row_count(self, sheet_name):
+        count = self.mirror.row_count(sheet_name) if self.mirror is not None else None
+        if count is not None:
+            return count
+        return self._row_counts([sheet_name]).get(sheet_name)
+
+
+# ✅ 로컬 SQLite 미러 (읽기는 로컬, 쓰기는 로컬 반영 후 outbox에 쌓아 동기화 때 Sheets로 보냄)
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sheet_meta (sheet_name TEXT PRIMARY KEY, headers TEXT NOT NULL)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sheet_name TEXT NOT NULL,
+                op TEXT NOT NULL,
+                key_value TEXT,
+                payload TEXT NOT NULL,
+                claimed_by TEXT,
+                claimed_at REAL
+            )
+        """)
+        self.stats = Counter()
+
+    @staticmethod
+    def _table(sheet_name):
+        return '"m_' + sheet_name.replace('"', '""') + '"'
+
+    def headers(self, sheet_name):
+        row = self._conn.execute("SELECT headers FROM sheet_meta WHERE sheet_name = ?", (sheet_name,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def _columns(self, headers):
+        return [f"c{i}" for i in range(len(headers))]
+
+    def _row_values(self, headers, row):
+        return [str(v) for v in row[:len(headers)]] + [''] * (len(headers) - len(row))
+
+    def _previous_ids(self, sheet_name, headers):
+        # 테이블을 다시 만들기 전: 키 값 → 기존 _id 목록(시트 순서), 지금까지 쓴 가장 큰 _id
+        table = self._table(sheet_name)
+        name = "m_" + sheet_name
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone():
+            return {}, 0
+        high = self._conn.execute(f"SELECT MAX(_id) FROM {table}").fetchone()[0] or 0
+        if self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            seq = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (name,)).fetchone()
+            high = max(high, seq[0] if seq else 0)
+        key_column = SHEET_KEYS.get(sheet_name)
+        old_headers = self.headers(sheet_name)
+        if key_column not in old_headers or key_column not in headers:
+            return {}, high
+        c = self._columns(old_headers)[old_headers.index(key_column)]
+        ids = {}
+        for row_id, key in self._conn.execute(f"SELECT _id, {c} FROM {table} ORDER BY _ord, _id"):
+            ids.setdefault(key, []).append(row_id)
+        return ids, high
+
+    def replace_all(self, sheet_name, values):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._replace_all_locked(sheet_name, values)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.stats["replaces"] += 1
+
+    def _replace_all_locked(self, sheet_name, values):
+        # Sheets에서 받은 전체 값으로 테이블을 새로 만듦 (헤더가 바뀌어도 그대로 반영), 잠금/트랜잭션 안에서 호출
+        # 키 컬럼이 있는 시트는 같은 키 행의 _id를 그대로 이어받아, 받아오기 전에 find()로 얻은 row_id가
+        # 다른 회원을 가리키지 않게 함 (지워진 행의 _id도 AUTOINCREMENT로 다시 쓰지 않음)
+        headers = values[0] if values else []
+        cols = self._columns(headers)
+        table = self._table(sheet_name)
+        db = self._conn
+        old_ids, high = self._previous_ids(sheet_name, headers)
+        db.execute(f"DROP TABLE IF EXISTS {table}")
+        col_defs = "".join(f", {c} TEXT" for c in cols)
+        db.execute(f"CREATE TABLE {table} (_id INTEGER PRIMARY KEY AUTOINCREMENT, _ord REAL NOT NULL{col_defs})")
+        db.execute(f'CREATE INDEX "{table[1:-1]}_ord" ON {table} (_ord)')
+        for column in SHEET_INDEXES.get(sheet_name, []):
+            if column in headers:
+                c = cols[headers.index(column)]
+                db.execute(f'CREATE INDEX "{table[1:-1]}_{c}" ON {table} ({c})')
+        if cols:
+            key_col = headers.index(SHEET_KEYS[sheet_name]) if old_ids else None
+            rows = []
+            for i, row in enumerate(values[1:]):
+                row = self._row_values(headers, row)
+                reused = old_ids.get(row[key_col]) if key_col is not None else None
+                if reused:
+                    row_id = reused.pop(0)
+                else:
+                    high += 1
+                    row_id = high
+                rows.append([row_id, i] + row)
+            marks = ", ".join("?" * (len(cols) + 2))
+            db.executemany(f"INSERT INTO {table} (_id, _ord, {', '.join(cols)}) VALUES ({marks})", rows)
+        # 이번에 쓰지 않은 큰 _id(지워진 행)도 다시 나오지 않도록 순번을 맞춤
+        name = "m_" + sheet_name
+        if not db.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (high, name)).rowcount:
+            db.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (name, high))
+        db.execute(
+            "INSERT INTO sheet_meta (sheet_name, headers) VALUES (?, ?) "
+            "ON CONFLICT(sheet_name) DO UPDATE SET headers = excluded.headers",
+            (sheet_name, json.dumps(headers, ensure_ascii=False)),
+        )
+
+    def read_all(self, sheet_name):
+        headers = self.headers(sheet_name)
+        if not headers:
+            return []
+        cols = ", ".join(self._columns(headers))
+        rows = self._conn.execute(f"SELECT {cols} FROM {self._table(sheet_name)} ORDER BY _ord, _id").fetchall()
+        return [list(headers)] + [list(row) for row in rows]
+
+    def iter_chunks(self, sheet_name, chunk_size):
+        headers = self.headers(sheet_name)
+        if not headers:
+            return
+        cols = ", ".join(self._columns(headers))
+        offset = 0
+        while True:
+            rows = self._conn.execute(
+                f"SELECT {cols} FROM {self._table(sheet_name)} ORDER BY _ord, _id LIMIT ? OFFSET ?",
+                (chunk_size, offset),
+            ).fetchall()
+            if rows:
+                yield [list(row) for row in rows]
+            if len(rows) < chunk_size:
+                return
+            offset += chunk_size
+
+    def _find_ids(self, sheet_name, column, value):
+        headers = self.headers(sheet_name)
+        if column not in headers:
+            return headers, []
+        cols = self._columns(headers)
+        rows = self._conn.execute(
+            f"SELECT _id, {', '.join(cols)} FROM {self._table(sheet_name)} "
+            f"WHERE {cols[headers.index(column)]} = ? ORDER BY _ord, _id",
+            (str(value),),
+        ).fetchall()
+        return headers, rows
+
+    def find(self, sheet_name, column, value):
+        headers, rows = self._find_ids(sheet_name, column, value)
+        return [(row[0], dict(zip(headers, row[1:]))) for row in rows]
+
+    def _key_of(self, sheet_name, row_id):
+        key_column = SHEET_KEYS.get(sheet_name)
+        headers = self.headers(sheet_name)
+        if key_column not in headers:
+            raise ValueError(f"'{sheet_name}' 시트는 행 단위 수정/삭제를 동기화할 키 컬럼이 없습니다.")
+        c = self._columns(headers)[headers.index(key_column)]
+        row = self._conn.execute(f"SELECT {c} FROM {self._table(sheet_name)} WHERE _id = ?", (row_id,)).fetchone()
+        return row[0] if row else None
+
+    def _enqueue(self, sheet_name, op, key_value, payload):
+        self._conn.execute(
+            "INSERT INTO outbox (sheet_name, op, key_value, payload) VALUES (?, ?, ?, ?)",
+            (sheet_name, op, key_value, json.dumps(payload, ensure_ascii=False)),
+        )
+        self.stats[f"local_{op}"] += 1
+
+    def _update_local(self, sheet_name, row_id, changes):
+        headers = self.headers(sheet_name)
+        cols = self._columns(headers)
+        sets = [(cols[headers.index(k)], str(v)) for k, v in changes.items() if k in headers]
+        if sets:
+            self._conn.execute(
+                f"UPDATE {self._table(sheet_name)} SET {', '.join(c + ' = ?' for c, _ in sets)} WHERE _id = ?",
+                [v for _, v in sets] + [row_id],
+            )
+        return len(sets)
+
+    def _insert_top_local(self, sheet_name, rows):
+        # rows는 최신이 앞, 맨 위에 같은 순서로 놓이도록 뒤에서부터 더 작은 _ord 부여
+        headers = self.headers(sheet_name)
+        cols = self._columns(headers)
+        table = self._table(sheet_name)
+        top = self._conn.execute(f"SELECT MIN(_ord) FROM {table}").fetchone()[0]
+        top = 0 if top is None else top
+        marks = ", ".join("?" * (len(cols) + 1))
+        for row in reversed(rows):
+            top -= 1
+            self._conn.execute(
+                f"INSERT INTO {table} (_ord, {', '.join(cols)}) VALUES ({marks})",
+                [top] + self._row_values(headers, row),
+            )
+
+    def _insert_bottom_local(self, sheet_name, rows):
+        headers = self.headers(sheet_name)
+        cols = self._columns(headers)
+        table = self._table(sheet_name)
+        bottom = self._conn.execute(f"SELECT MAX(_ord) FROM {table}").fetchone()[0] or 0
+        marks = ", ".join("?" * (len(cols) + 1))
+        self._conn.executemany(
+            f"INSERT INTO {table} (_ord, {', '.join(cols)}) VALUES ({marks})",
+            [[bottom + i + 1] + self._row_values(headers, row) for i, row in enumerate(rows)],
+        )
+
+    def _record_row(self, sheet_name, record):
+        headers = self.headers(sheet_name)
+        return [record.get(h, '') for h in headers]
+
+    def update_row(self, sheet_name, row_id, changes):
+        with self._lock:
+            key_value = self._key_of(sheet_name, row_id)
+            self._conn.execute("BEGIN IMMEDIATE")
+            count = self._update_local(sheet_name, row_id, changes)
+            if count:
+                self._enqueue(sheet_name, "update", key_value, changes)
+            self._conn.execute("COMMIT")
+            return count
+
+    def insert_row(self, sheet_name, record):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._insert_top_local(sheet_name, [self._record_row(sheet_name, record)])
+            self._enqueue(sheet_name, "insert", None, record)
+            self._conn.execute("COMMIT")
+
+    def delete_row(self, sheet_name, row_id):
+        with self._lock:
+            key_value = self._key_of(sheet_name, row_id)
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(f"DELETE FROM {self._table(sheet_name)} WHERE _id = ?", (row_id,))
+            self._enqueue(sheet_name, "delete", key_value, {})
+            self._conn.execute("COMMIT")
+
+    def upsert_many(self, sheet_name, key_column, records):
+        with self._lock:
+            values = self.read_all(sheet_name)
+            changes, new_rows, results = plan_upserts(values, key_column, records)
+            headers = values[0]
+            for i, cells in changes.items():
+                key_value = values[i + 1][headers.index(key_column)]
+                _, rows = self._find_ids(sheet_name, key_column, key_value)
+                self.update_row(sheet_name, rows[0][0], {headers[col - 1]: v for col, v in cells.items()})
+            for row in new_rows:
+                self.insert_row(sheet_name, dict(zip(headers, row)))
+            return results
+
+    def append_notes(self, sheet_name, rows):
+        with self._lock:
+            if not self.headers(sheet_name):
+                raise LookupError(f"'{sheet_name}' 시트를 찾을 수 없습니다.")
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._insert_top_local(sheet_name, rows)
+            self._enqueue(sheet_name, "append_notes", None, rows)
+            self._conn.execute("COMMIT")
+
+    def append_rows(self, sheet_name, rows):
+        with self._lock:
+            if not self.headers(sheet_name):
+                raise LookupError(f"'{sheet_name}' 시트를 찾을 수 없습니다.")
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._insert_bottom_local(sheet_name, rows)
+            self._enqueue(sheet_name, "append_rows", None, rows)
+            self._conn.execute("COMMIT")
+
+    def row_count(self, sheet_name):
+        if not self.headers(sheet_name):
+            return None
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self._table(sheet_name)}").fetchone()[0] + 1
+
+    def pending(self):
+        return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    # ✅ 동기화: 로컬 변경을 Sheets로 보내고(push), Sheets 전체를 다시 받아옴(pull)
+    def push(self, remote):
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET claimed_by = ?, claimed_at = ? WHERE claimed_by IS NULL OR claimed_at < ?",
+                (owner, now, now - SYNC_CLAIM_TIMEOUT),
+            )
+            ops = self._conn.execute(
+                "SELECT id, sheet_name, op, key_value, payload FROM outbox WHERE claimed_by = ? ORDER BY id",
+                (owner,),
+            ).fetchall()
+
+        pushed = 0
+        for op_id, sheet_name, op, key_value, payload in ops:
+            try:
+                self._apply_remote(remote, sheet_name, op, key_value, json.loads(payload))
+            except Exception:
+                # 순서를 지키기 위해 실패한 항목부터 다음 동기화로 넘김
+                with self._lock:
+                    self._conn.execute("UPDATE outbox SET claimed_by = NULL WHERE claimed_by = ?", (owner,))
+                self.stats["push_errors"] += 1
+                raise
+            with self._lock:
+                self._conn.execute("DELETE FROM outbox WHERE id = ?", (op_id,))
+            pushed += 1
+        self.stats["pushed"] += pushed
+        return pushed
+
+    @staticmethod
+    def _apply_remote(remote, sheet_name, op, key_value, payload):
+        if op == "insert":
+            remote.insert_row(sheet_name, payload)
+        elif op == "append_notes":
+            remote.append_notes(sheet_name, payload)
+        elif op == "append_rows":
+            remote.append_rows(sheet_name, payload)
+        else:
+            matches = remote.find(sheet_name, SHEET_KEYS[sheet_name], key_value)
+            if not matches:
+                print(f"[동기화] '{sheet_name}' 시트에서 '{key_value}' 행을 찾지 못해 {op} 건너뜀")
+                return
+            if op == "update":
+                remote.update_row(sheet_name, matches[0][0], payload)
+            elif op == "delete":
+                remote.delete_row(sheet_name, matches[0][0])
+
+    def pull(self, remote, sheet_name):
+        values = remote.read_all(sheet_name)
+        # 교체와 재적용을 한 트랜잭션으로: 사이에 끼어든 로컬 쓰기가 outbox 재적용으로 한 번 더 반영되지 않게 함
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._replace_all_locked(sheet_name, values)
+                self._reapply_outbox(sheet_name)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.stats["replaces"] += 1
+        self.stats["pulls"] += 1
+
+    def _reapply_outbox(self, sheet_name):
+        # 아직 Sheets로 보내지 못한 로컬 변경은 새로 받은 데이터 위에 다시 적용
+        ops = self._conn.execute(
+            "SELECT op, key_value, payload FROM outbox WHERE sheet_name = ? ORDER BY id", (sheet_name,)
+        ).fetchall()
+        for op, key_value, payload in ops:
+            payload = json.loads(payload)
+            if op == "insert":
+                self._insert_top_local(sheet_name, [self._record_row(sheet_name, payload)])
+            elif op == "append_notes":
+                self._insert_top_local(sheet_name, payload)
+            elif op == "append_rows":
+                self._insert_bottom_local(sheet_name, payload)
+            else:
+                _, rows = self._find_ids(sheet_name, SHEET_KEYS[sheet_name], key_value)
+                if not rows:
+                    continue
+                if op == "update":
+                    self._update_local(sheet_name, rows[0][0], payload)
+                elif op == "delete":
+                    self._conn.execute(f"DELETE FROM {self._table(sheet_name)} WHERE _id = ?", (rows[0][0],))
+
+
+# ✅ 주기적 양방향 동기화 (워커마다 처음 요청 때 시작)
+class StorageSync:
+    def __init__(self, local, remote, sheet_names, interval, on_pulled=None):
+        self.local = local
+        self.remote = remote
+        self.sheet_names = list(sheet_names)
+        self.interval = interval
+        self.on_pulled = on_pulled
+        self._lock = threading.Lock()
+        self._thread = None
+        self.last_sync = None
+        self.stats = Counter()
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="storage-sync", daemon=True)
+                self._thread.start()
+
+    def sync_once(self):
+        try:
+            self.local.push(self.remote)
+            for sheet_name in self.sheet_names:
+                self.local.pull(self.remote, sheet_name)
+                if self.on_pulled:
+                    self.on_pulled(sheet_name)
+            self.last_sync = time.time()
+            self.stats["syncs"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[동기화 오류] {e}")
+
+    def _run(self):
+        while True:
+            self.sync_once()
+            time.sleep(self.interval)
+
+    def info(self):
+        return {**self.stats, **self.local.stats, "pending": self.local.pending(), "last_sync": self.last_sync}
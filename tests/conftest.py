@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+from collections import Counter
+
+import pytest
+
+# 실제 시트/백그라운드 스레드 없이 app을 불러옴 (bench_endpoints의 가짜 Worksheet 재사용)
+_tmpdir = tempfile.mkdtemp(prefix="member_tiger_tests_")
+os.environ.setdefault("GOOGLE_SHEET_KEY", "{}")
+os.environ["DELTA_SYNC_INTERVAL"] = "0"
+os.environ["SHARED_SNAPSHOT_PATH"] = ""
+os.environ["NOTE_HASH_INDEX_PATH"] = os.path.join(_tmpdir, "note_hashes.db")
+os.environ["NOTE_QUEUE_PATH"] = os.path.join(_tmpdir, "note_queue.db")
+os.environ["ORDER_ROLLUP_PATH"] = os.path.join(_tmpdir, "order_rollups.db")
+os.environ["TOKENIZER_CACHE_PATH"] = os.path.join(_tmpdir, "noun_cache.db")
+os.environ["UPLOAD_JOBS_PATH"] = os.path.join(_tmpdir, "upload_jobs.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import bench_endpoints  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return app_module
+
+
+@pytest.fixture
+def calls():
+    return Counter()
+
+
+@pytest.fixture
+def make_sheets(calls):
+    # make_sheets(n) → {시트 이름: FakeWorksheet}, app에 연결된 상태로 반환
+    def make(n_rows=50):
+        sheets = bench_endpoints.make_sheets(n_rows, {}, calls)
+        bench_endpoints.install(sheets, {}, calls)
+        app_module.sheets_storage._headers.clear()
+        return sheets
+    return make
+
+
+@pytest.fixture
+def client(app):
+    return app.app.test_client()
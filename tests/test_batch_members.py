@@ -0,0 +1,65 @@
+def test_find_members_reads_sheet_once(app, make_sheets, calls, client):
+    make_sheets(50)
+    before = calls["get_all_values"]
+
+    response = client.post("/find_members", json={
+        "회원목록": [{"회원명": "회원3"}, {"회원번호": "10000007"}, "없는회원"],
+        "회원명": ["회원10"],
+    })
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [r["회원"]["회원명"] if r["회원"] else None for r in body["결과"]] == ["회원3", "회원7", None, "회원10"]
+    assert body["찾음"] == 3 and body["못찾음"] == 1
+    assert calls["get_all_values"] - before == 1
+
+    client.post("/find_members", json={"회원명": ["회원1", "회원2"]})
+    assert calls["get_all_values"] - before == 1  # 캐시된 DB에서 찾음
+
+
+def test_find_members_requires_queries(client):
+    assert client.post("/find_members", json={}).status_code == 400
+
+
+def test_save_members_updates_and_inserts_in_one_pass(app, make_sheets, calls, client):
+    sheets = make_sheets(20)
+    calls.clear()
+
+    response = client.post("/save_members", json={"회원목록": [
+        {"회원명": "회원3", "주소": "부산"},
+        {"회원명": "회원4", "주소": "서울"},  # 이미 서울
+        {"회원명": "신규1", "주소": "대구"},
+        {"회원명": ""},
+    ]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [r["결과"] for r in body["회원별"]] == ["수정", "변경없음", "추가", "오류"]
+    assert calls["get_all_values"] == 1
+    assert calls["batch_update"] == 1 and calls["insert_rows"] == 1
+    assert calls["update_cell"] == 0 and calls["insert_row"] == 0
+
+    rows = {row[0]: row for row in sheets["DB"].rows[1:]}
+    assert rows["회원3"][11] == "부산"
+    assert rows["신규1"][11] == "대구"
+    assert client.post("/find_member", json={"회원명": "신규1"}).status_code == 200  # 저장 뒤 캐시 무효화
+
+
+def test_save_members_merges_repeated_names(app, make_sheets, client):
+    sheets = make_sheets(20)
+
+    response = client.post("/save_members", json={"회원목록": [
+        {"회원명": "신규2", "주소": "대구"},
+        {"회원명": "신규2", "휴대폰번호": "010-1111-2222"},
+        {"회원명": "회원5", "주소": "광주"},
+        {"회원명": "회원5", "메모": "두 번째"},
+    ]})
+
+    body = response.get_json()
+    assert [r["결과"] for r in body["회원별"]] == ["추가", "병합", "수정", "수정"]
+    assert body["결과"] == {"추가": 1, "병합": 1, "수정": 2}
+    added = [row for row in sheets["DB"].rows[1:] if row[0] == "신규2"]
+    assert len(added) == 1
+    assert added[0][2] == "010-1111-2222" and added[0][11] == "대구"
+    member5 = next(row for row in sheets["DB"].rows[1:] if row[0] == "회원5")
+    assert member5[11] == "광주" and member5[12] == "두 번째"
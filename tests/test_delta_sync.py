@@ -0,0 +1,167 @@
+import re
+
+from delta_sync import DeltaSync
+
+
+class FakeSheets:
+    # 시트 이름 → 행 목록, 값 API처럼 행 끝의 빈 셀과 범위 끝의 빈 행은 잘라서 돌려줌
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.version = 1
+
+    def revision(self):
+        return self.version
+
+    def load(self, sheet_name):
+        return [list(row) for row in self.sheets[sheet_name]]
+
+    def batch_get(self, ranges):
+        result = []
+        for a1 in ranges:
+            name, ref = re.fullmatch(r"'(.*)'!(.+)", a1).groups()
+            rows = self.sheets[name.replace("''", "'")]
+            cols = re.fullmatch(r"([A-Z]+):\1", ref)
+            if cols:
+                col = ord(cols.group(1)) - ord("A")
+                picked = [[row[col]] if col < len(row) and row[col] != "" else [] for row in rows]
+            else:
+                start, end = (int(n) for n in ref.split(":"))
+                picked = [list(row) for row in rows[start - 1:end]]
+            picked = [_trim(row) for row in picked]
+            while picked and not picked[-1]:
+                picked.pop()
+            result.append(picked)
+        return result
+
+
+def _trim(row):
+    while row and row[-1] == "":
+        row = row[:-1]
+    return row
+
+
+def _sync(fake, verify_rows=4):
+    sync = DeltaSync(["DB"], {"DB": "회원명"}, fake.revision, fake.batch_get, fake.load, 0, verify_rows)
+    sync.poll()  # 처음에는 전체 로드
+    return sync
+
+
+def _poll_until_idle(sync, limit=20):
+    merged = {"added": [], "removed": [], "modified": []}
+    for _ in range(limit):
+        changes = sync.poll()
+        for kind, rows in changes.get("DB", {}).items():
+            merged[kind] += rows
+        if sync.info()["verifying"] == []:
+            return merged
+    raise AssertionError("검증이 끝나지 않음")
+
+
+def _db(n):
+    return [["회원명", "회원번호", "메모"]] + [[f"회원{i}", str(100 + i), ""] for i in range(n)]
+
+
+def test_insert_and_delete_are_reconciled_from_key_column():
+    fake = FakeSheets({"DB": _db(10)})
+    sync = _sync(fake)
+    rows = fake.sheets["DB"]
+
+    rows.insert(4, ["신규회원", "999", ""])
+    fake.version += 1
+    changes = _poll_until_idle(sync)
+    assert changes == {"added": [5], "removed": [], "modified": []}
+    assert sync.values("DB") == rows
+
+    del rows[8]
+    fake.version += 1
+    changes = _poll_until_idle(sync)
+    assert changes == {"added": [], "removed": [9], "modified": []}
+    assert sync.values("DB") == rows
+
+
+def test_cell_edit_without_key_change_is_found_by_verify_pass():
+    fake = FakeSheets({"DB": _db(10)})
+    sync = _sync(fake, verify_rows=3)
+
+    fake.sheets["DB"][9][2] = "직접 수정"
+    fake.version += 1
+    changes = _poll_until_idle(sync)
+
+    assert sync.values("DB")[9][2] == "직접 수정"
+    assert changes["modified"] == [10]
+    assert sync.poll() == {}  # 버전이 그대로면 더 읽지 않음
+    assert sync.info()["idle_polls"] == 1
+
+
+def test_rows_removed_from_bottom_are_dropped():
+    fake = FakeSheets({"DB": _db(10)})
+    sync = _sync(fake)
+
+    del fake.sheets["DB"][7:]
+    fake.version += 1
+    _poll_until_idle(sync)
+
+    assert sync.values("DB") == fake.sheets["DB"]
+
+
+def test_poll_during_local_write_is_retried():
+    fake = FakeSheets({"DB": _db(5)})
+    sync = _sync(fake)
+    original = fake.batch_get
+
+    def batch_get_with_local_write(ranges):
+        result = original(ranges)
+        if not sync.stats["local_writes"]:
+            # 받아오는 사이에 앱이 같은 시트에 씀 → 이번 결과는 버리고 다음 폴링에서 다시
+            fake.sheets["DB"].append(["앱저장", "500", ""])
+            sync.local_append("DB", [["앱저장", "500", ""]])
+        return result
+
+    fake.batch_get = batch_get_with_local_write
+    sync._batch_get = batch_get_with_local_write
+    fake.sheets["DB"][2][2] = "수정"
+    fake.version += 1
+    assert sync.poll() == {}
+    assert sync.version is None
+
+    _poll_until_idle(sync)
+    assert sync.values("DB") == fake.sheets["DB"]
+
+
+def test_verify_after_own_write_is_deferred_to_verify_interval():
+    fake = FakeSheets({"DB": _db(10)})
+    sync = DeltaSync(["DB"], {"DB": "회원명"}, fake.revision, fake.batch_get, fake.load, 0, 4, verify_interval=60)
+    sync.poll()
+    requested = []
+    batch_get = fake.batch_get
+    sync._batch_get = lambda ranges: requested.extend(ranges) or batch_get(ranges)
+
+    # 앱이 셀을 쓰면 Drive version이 올라감 → 키 열만 확인하고 행 검증은 건너뜀
+    fake.sheets["DB"][3][2] = "앱이 쓴 값"
+    sync.local_update("DB", 4, {3: "앱이 쓴 값"})
+    fake.version += 1
+    assert sync.poll() == {}
+    assert requested == ["'DB'!A:A"]
+    assert sync.info()["verify_deferred"] is True
+
+    fake.sheets["DB"][8][2] = "시트에서 직접 수정"  # 같은 사이에 다른 곳에서 고친 셀
+    assert sync.poll() == {}  # version 그대로, 아직 주기 전
+    assert sync.stats["verify_deferred"] == 1
+
+    sync._verified_at -= 60
+    changes = _poll_until_idle(sync)
+    assert changes["modified"] == [9]
+    assert sync.values("DB") == fake.sheets["DB"]
+    assert sync.info()["verify_deferred"] is False
+
+
+def test_foreign_version_change_verifies_immediately():
+    fake = FakeSheets({"DB": _db(10)})
+    sync = DeltaSync(["DB"], {"DB": "회원명"}, fake.revision, fake.batch_get, fake.load, 0, 4, verify_interval=60)
+    sync.poll()
+
+    fake.sheets["DB"][2][2] = "직접 수정"  # 이 프로세스는 쓰지 않음
+    fake.version += 1
+
+    assert sync.poll() == {"DB": {"added": [], "removed": [], "modified": [3]}}
+    assert sync.stats["verify_deferred"] == 0
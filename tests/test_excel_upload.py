@@ -0,0 +1,39 @@
+import io
+import time
+
+import openpyxl
+
+import bench_endpoints
+from excel_upload import UploadJobStore
+
+
+def _workbook(rows):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    data = io.BytesIO()
+    workbook.save(data)
+    data.seek(0)
+    return data
+
+
+def test_job_status_is_visible_from_another_worker(app, make_sheets, calls, client):
+    sheets = make_sheets(5)
+    sheets["후원수당"] = bench_endpoints.FakeWorksheet("후원수당", [["회원번호", "회원명", "수당"]], {}, calls)
+    data = _workbook([["회원번호", "회원명", "수당"], [1001, "홍길동", 5000], [1002, "김철수", "abc"]])
+
+    resp = client.post("/upload_excel", data={"file": (data, "수당.xlsx")}, content_type="multipart/form-data")
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+
+    other_worker = UploadJobStore(app.UPLOAD_JOBS_PATH, app.UPLOAD_KEEP_JOBS)  # 같은 파일을 여는 다른 프로세스
+    deadline = time.monotonic() + 5
+    while other_worker.get(job_id)["상태"] in ("대기", "진행중") and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    info = other_worker.get(job_id)
+    assert info["상태"] == "완료"
+    assert info["추가"] == 1 and info["오류"] == 1
+    assert sheets["후원수당"].rows[1] == ["1001", "홍길동", "5000"]
+    assert client.get(f"/upload_excel/{job_id}").get_json()["상태"] == "완료"
+    assert client.get("/upload_excel/없는작업").status_code == 404
@@ -0,0 +1,50 @@
+from genealogy import GenealogyIndex
+
+HEADERS = ["회원명", "회원번호", "소개한분", "계보도", "리더님"]
+
+
+def _index(rows):
+    index = GenealogyIndex()
+    index.sync(HEADERS, rows)
+    return index
+
+
+def test_sponsor_cycle_is_broken_and_every_member_is_reachable():
+    index = _index([
+        ["가", "1", "나", "", ""],
+        ["나", "2", "가", "", ""],  # 서로를 소개한분으로 적음
+        ["다", "3", "나", "", ""],
+        ["라", "4", "라", "", ""],  # 자기 자신
+    ])
+
+    assert index.stats["rebuilds"] == 0
+    total, members = index.downline("가")
+    assert index.stats["cycles_broken"] == 1
+    assert total == 2 and {m["회원명"] for m in members} == {"나", "다"}
+    assert [m["회원명"] for m in index.upline("다")] == ["가", "나", "다"]
+    assert index.subtree_size("라") == 0 and index.depth("라") == 0
+
+
+def test_number_only_change_skips_retour_but_updates_lookup():
+    rows = [["가", "1", "", "", ""], ["나", "2", "1", "", ""], ["다", "3", "", "가 > 나 > 다", ""]]
+    index = _index(rows)
+    assert index.subtree_size("가") == 2
+
+    rows[2] = ["다", "30", "", "가>나>다", ""]  # 번호와 표기만 바뀜
+    index.sync(HEADERS, rows)
+
+    assert index.resolve(number="30") == "다"
+    assert index.stats["rebuilds"] == 1 and index.stats["retours_skipped"] == 1
+
+
+def test_moving_a_member_retours_like_a_fresh_index():
+    rows = [["가", "1", "", "", ""], ["나", "2", "가", "", ""], ["다", "3", "나", "", ""], ["라", "4", "가", "", ""]]
+    index = _index(rows)
+    index.downline("가")
+
+    rows[2] = ["다", "3", "라", "", ""]
+    index.sync(HEADERS, rows)
+
+    assert index.downline("가") == _index(rows).downline("가")
+    assert index.is_under("다", "라") and not index.is_under("다", "나")
+    assert index.stats["rebuilds"] == 2
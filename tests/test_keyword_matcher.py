@@ -0,0 +1,39 @@
+import json
+
+
+def test_overlapping_names_prefer_longest(app):
+    matcher = app.KeywordMatcher(["홍길", "홍길동", "길동", "김철수"])
+
+    assert matcher.find_all("홍길동 주소 수정") == {"홍길", "홍길동", "길동"}
+    assert matcher.match("홍길동 주소 수정") == ("홍길동", ["홍길동", "홍길", "길동"])
+    assert matcher.match("주소 수정") == (None, [])
+
+
+def test_equal_length_names_follow_sheet_order(app):
+    matcher = app.KeywordMatcher(["김철수", "홍길동", "", "김철수"])  # 빈 이름/중복은 무시
+
+    assert matcher.match("홍길동과 김철수 주소 수정") == ("김철수", ["김철수", "홍길동"])
+    assert [kw for _, kw in matcher.iter_matches("김철수홍길동")] == ["김철수", "홍길동"]
+
+
+def test_update_member_rejects_duplicate_name_with_candidates(app, make_sheets, client):
+    sheets = make_sheets(20)
+    sheets["DB"].rows.append(list(sheets["DB"].rows[14]))  # 회원13이 두 행
+    app.member_cache.invalidate()
+
+    response = client.post("/update_member", data=json.dumps({"요청문": "회원13 주소 부산 수정"}))
+
+    body = response.get_json()
+    assert response.status_code == 400
+    assert "중복" in body["error"]
+    assert body["후보"] == ["회원13", "회원1"]  # 가장 긴 이름이 중복이면 다른 후보로 넘어가지 않음
+
+
+def test_update_member_picks_longest_name(app, make_sheets, client):
+    sheets = make_sheets(20)
+    response = client.post("/update_member", data=json.dumps({"요청문": "회원12 주소 부산 수정"}))  # 회원1도 포함됨
+
+    assert response.status_code == 200
+    assert response.get_json()["회원명"] == "회원12"
+    assert sheets["DB"].rows[13][11] == "부산"
+    assert sheets["DB"].rows[2][11] == "서울"
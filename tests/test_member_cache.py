@@ -0,0 +1,16 @@
+def test_snapshot_survives_invalidate_during_fast_path(app, make_sheets, monkeypatch):
+    make_sheets(20)
+    cache = app.member_cache
+    cache.snapshot()
+    fresh = cache._fresh
+
+    def fresh_then_invalidate(snapshot):
+        result = fresh(snapshot)
+        cache.invalidate()  # 다른 요청이 확인 직후 무효화
+        return result
+
+    monkeypatch.setattr(cache, "_fresh", fresh_then_invalidate)
+    snapshot = cache.snapshot()
+
+    assert snapshot is not None
+    assert cache.find(name="회원3", snapshot=snapshot)["회원번호"] == "10000003"
@@ -0,0 +1,70 @@
+from member_search import MemberSearchIndex
+
+HEADERS = ["회원명", "회원번호", "휴대폰번호"]
+ROWS = [
+    ["홍길동", "1", "010-1234-5678"],
+    ["홍길순", "2", "010-9999-1234"],
+    ["김길동", "3", "010-5555-1239"],
+    ["이영희", "4", ""],
+]
+
+
+def _index(rows=ROWS):
+    index = MemberSearchIndex()
+    index.sync(HEADERS, [tuple(row) for row in rows])
+    return index
+
+
+def _names(results):
+    return [r["회원명"] for r in results]
+
+
+def test_name_one_and_two_gram_matching():
+    index = _index()
+    assert _names(index.search("홍")) == ["홍길동", "홍길순"]
+    assert _names(index.search("길동")) == ["김길동", "홍길동"]
+    assert _names(index.search("홍길동")) == ["홍길동"]  # 같음이 먼저
+    assert _names(index.search("홍길돈")) == ["홍길동", "홍길순"]  # 부분 일치가 없으면 오타 1자까지
+    assert index.stats["fuzzy_queries"] == 1
+
+
+def test_phone_three_gram_matching_ranks_prefix_suffix_middle():
+    index = _index()
+    assert _names(index.search(phone="010-1234")) == ["홍길동"]
+    assert _names(index.search(phone="1234")) == ["홍길순", "홍길동"]  # 뒷자리 일치가 중간 일치보다 먼저
+    assert _names(index.search(phone="555")) == ["김길동"]
+    assert _names(index.search(name="홍", phone="5678")) == ["홍길동"]  # 이름과 전화번호 둘 다 맞는 회원만
+
+
+def test_short_phone_query_scans_instead_of_failing():
+    index = _index()
+    assert _names(index.search(phone="39")) == ["김길동"]
+    assert _names(index.search(phone="0")) == ["김길동", "홍길동", "홍길순"]
+    assert index.stats["short_phone_scans"] == 2
+
+
+def test_sync_applies_only_changed_rows():
+    index = _index()
+    rows = [tuple(row) for row in ROWS[1:]] + [("박길동", "5", "010-7777-8888")]
+    index.sync(HEADERS, rows)
+    assert _names(index.search("길동")) == ["김길동", "박길동"]
+    assert index.stats["removed"] == 1 and index.stats["added"] == len(ROWS) + 1
+
+
+def test_search_endpoint_reflects_save_and_delete(app, make_sheets, client):
+    make_sheets(30)
+    assert client.post("/search", json={"name": "블루베리"}).get_json() == []
+
+    client.post("/save_member", json={"회원명": "블루베리", "휴대폰번호": "010-4321-8765"})
+    found = client.post("/search", json={"phone": "4321-87"}).get_json()
+    assert [r["회원명"] for r in found] == ["블루베리"]
+
+    client.post("/delete_member", json={"회원명": "블루베리"})
+    assert client.post("/search", json={"name": "블루베리"}).get_json() == []
+
+
+def test_search_endpoint_short_phone_returns_list(app, make_sheets, client):
+    make_sheets(30)
+    response = client.post("/search", json={"phone": "29"})
+    assert response.status_code == 200
+    assert [r["회원명"] for r in response.get_json()] == ["회원29"]
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+
+def test_add_new_is_searchable_without_rebuild(app, make_sheets):
+    make_sheets(50)
+    index = app.memo_tag_index
+    index.search(["상담"], 1, "tag", 5)  # 색인 생성
+    builds = index.stats["builds"]
+
+    index.add_new([["2099-01-01 10:00", "홍길동", "새로운 블루베리 상담 메모"]])
+    results = index.search(["블루베리"], 1, "tag", 5)
+
+    assert [r["내용"] for r in results] == ["새로운 블루베리 상담 메모"]
+    assert index.stats["builds"] == builds
+
+
+def test_index_matches_linear_scan(app, make_sheets):
+    sheets = make_sheets(200)
+    rows = sheets["개인메모"].rows[1:]
+    expected = [row for row in rows if "비타민" in row[2] and "수면" in row[2]]
+
+    results = app.memo_tag_index.search(["비타민", "수면"], 2, "tag", 1000)
+
+    assert sorted(r["내용"] for r in results) == sorted(row[2] for row in expected)
+
+
+def _newest_first_memos(sheets, n):
+    # save_to_sheet처럼 최신 메모가 위에 오는 시트
+    newest = datetime(2024, 12, 31, 23, 0)
+    sheets["개인메모"].rows[1:] = [
+        [f"회원{i % 7}", (newest - timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"), f"비타민 상담 메모{i}"]
+        for i in range(n)
+    ]
+
+
+def test_cold_date_search_reads_few_chunks_then_warms_index(app, make_sheets, calls, monkeypatch):
+    monkeypatch.setattr(app, "MEMO_SCAN_CHUNK_ROWS", 100)
+    monkeypatch.setattr(app, "MEMO_SCAN_MAX_CHUNKS", 2)
+    sheets = make_sheets(50)
+    _newest_first_memos(sheets, 2000)
+    index = app.memo_tag_index
+    index.invalidate()
+    calls.clear()
+
+    results = index.search(["비타민"], 1, "date", 5)
+
+    assert [r["내용"] for r in results] == [f"비타민 상담 메모{i}" for i in range(5)]
+    assert calls["get"] <= 2
+    index._build_thread.join(5)
+    assert index.info()["memos"] == 2000
+
+    calls.clear()
+    assert index.search(["비타민"], 1, "date", 5) == results
+    assert sum(calls.values()) == 0
+
+
+def test_cold_date_search_falls_back_to_index_when_scan_cannot_stop(app, make_sheets, monkeypatch):
+    monkeypatch.setattr(app, "MEMO_SCAN_CHUNK_ROWS", 100)
+    monkeypatch.setattr(app, "MEMO_SCAN_MAX_CHUNKS", 2)
+    sheets = make_sheets(50)
+    _newest_first_memos(sheets, 2000)
+    sheets["개인메모"].rows[1500][2] = "드문 블루베리 메모"
+    index = app.memo_tag_index
+    index.invalidate()
+    builds = index.stats["builds"]
+
+    results = index.search(["블루베리"], 1, "date", 5)
+
+    assert [r["내용"] for r in results] == ["드문 블루베리 메모"]
+    assert index.stats["builds"] == builds + 1
@@ -0,0 +1,72 @@
+import re
+import types
+from datetime import timedelta
+
+from metrics import Metrics, record_sheets_response
+
+
+def _value(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_render_exposition_format():
+    m = Metrics()
+    m.describe("jobs_total", "counter", "처리한 작업 수")
+    m.describe("job_seconds", "histogram", "작업 시간", buckets=(0.1, 1))
+    m.inc("jobs_total", (("kind", 'a"b\\c'),), 2)
+    m.inc_many(((("jobs_total", (("kind", "x"),)), 1), (("jobs_total", (("kind", "x"),)), 0.5)))
+    for value in (0.05, 0.5, 3):
+        m.observe("job_seconds", (("route", "/r"),), value)
+
+    text = m.render()
+    assert text.endswith("\n")
+    assert "# HELP jobs_total 처리한 작업 수\n# TYPE jobs_total counter\n" in text
+    assert 'jobs_total{kind="a\\"b\\\\c"} 2\n' in text  # 라벨 값 이스케이프
+    assert 'jobs_total{kind="x"} 1.5\n' in text
+    assert "# TYPE job_seconds histogram\n" in text
+    assert 'job_seconds_bucket{route="/r",le="0.1"} 1\n' in text  # 구간은 누적
+    assert 'job_seconds_bucket{route="/r",le="1"} 2\n' in text
+    assert 'job_seconds_bucket{route="/r",le="+Inf"} 3\n' in text
+    assert 'job_seconds_sum{route="/r"} 3.55\n' in text
+    assert 'job_seconds_count{route="/r"} 3\n' in text
+
+
+def test_sheets_response_hook_counts_quota_and_errors():
+    from metrics import metrics
+
+    def response(status, size=10):
+        return types.SimpleNamespace(status_code=status, content=b"x" * size, elapsed=timedelta(milliseconds=20))
+
+    before = metrics.render()
+    for status in (200, 429, 500):
+        record_sheets_response(response(status))
+    after = metrics.render()
+
+    labels = '{route="background"}'
+    assert _value(after, f"app_sheets_calls_total{labels}") - _value(before, f"app_sheets_calls_total{labels}") == 3
+    assert _value(after, f"app_sheets_bytes_total{labels}") - _value(before, f"app_sheets_bytes_total{labels}") == 30
+    quota = f"app_sheets_quota_errors_total{labels}"
+    assert _value(after, quota) - _value(before, quota) == 1
+    errors = 'app_sheets_errors_total{route="background",status="500"}'
+    assert _value(after, errors) - _value(before, errors) == 1
+
+
+def test_metrics_endpoint_counts_routes(app, make_sheets, client, monkeypatch):
+    make_sheets(20)
+    monkeypatch.setattr(app, "METRICS_SERVER_TIMING", True)
+    series = 'app_requests_total{route="/find_member",method="POST",status="200"}'
+    before = _value(client.get("/metrics").get_data(as_text=True), series)
+
+    response = client.post("/find_member", json={"회원명": "회원3"})
+    assert re.fullmatch(r'app;dur=[\d.]+, sheets;dur=[\d.]+;desc="\d+ calls", parse;dur=[\d.]+',
+                        response.headers["Server-Timing"])
+
+    metrics_response = client.get("/metrics")
+    text = metrics_response.get_data(as_text=True)
+    assert metrics_response.mimetype == "text/plain"
+    assert _value(text, series) - before == 1
+    assert 'app_request_duration_seconds_count{route="/find_member",method="POST"}' in text
+    assert "# TYPE app_request_duration_seconds histogram" in text
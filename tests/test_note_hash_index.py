@@ -0,0 +1,11 @@
+def test_row_typed_into_blank_grid_row_is_detected(app, make_sheets, monkeypatch):
+    sheets = make_sheets(20)
+    memo = sheets["개인메모"]
+    memo.rows.extend([["", "", ""] for _ in range(5)])  # 시트 끝의 미리 만들어진 빈 행 (grid)
+    index = app.note_hash_index
+    monkeypatch.setattr(index, "check_interval", 0)
+    assert not index.contains("개인메모", "브라우저에서 직접 입력한 메모")
+
+    memo.rows[21] = ["홍길동", "2024-05-01 10:00", "브라우저에서 직접 입력한 메모"]
+
+    assert index.contains("개인메모", "브라우저에서 직접 입력한 메모")
@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.fixture
+def queue(app, tmp_path, monkeypatch):
+    q = app.NoteQueue(str(tmp_path / "queue.db"), flush_size=100, flush_interval=100)
+    monkeypatch.setattr(q, "start", lambda: None)  # 백그라운드 저장 없이 flush를 직접 호출
+    return q
+
+
+def test_duplicate_enqueue_is_rejected(queue):
+    assert queue.enqueue("상담일지", "회원1", "새 상담 메모", "2099-01-01 10:00")
+    assert not queue.enqueue("상담일지", "회원2", "새 상담 메모", "2099-01-01 10:01")
+    assert queue.enqueue("활동일지", "회원1", "새 상담 메모", "2099-01-01 10:00")  # 다른 시트는 따로
+
+    assert queue.pending("상담일지") == 1
+    assert queue.stats["duplicates"] == 1
+
+
+def test_flush_drops_notes_already_in_sheet(queue, make_sheets):
+    sheets = make_sheets(10)
+    queue.enqueue("상담일지", "회원1", "새 메모 A", "2099-01-01 10:00")
+    queue.enqueue("상담일지", "회원3", "상담 내용 3", "2099-01-01 10:01")  # 시트에 이미 있는 내용
+    queue.enqueue("상담일지", "회원2", "새 메모 B", "2099-01-01 10:02")
+
+    queue.flush()
+
+    contents = [row[2] for row in sheets["상담일지"].rows[1:]]
+    assert contents[:2] == ["새 메모 B", "새 메모 A"]  # 최신 항목이 위로
+    assert contents.count("상담 내용 3") == 1
+    assert queue.pending() == 0
+    assert queue.stats["flushed"] == 2
+    assert queue.stats["dropped_duplicates"] == 1
+
+
+def test_flush_dedupes_within_batch(queue, make_sheets):
+    sheets = make_sheets(10)
+    # 다른 워커가 같은 내용을 동시에 넣어 대기열에 두 건이 남은 경우
+    db = queue._db()
+    for created_at in ("2099-01-01 10:00", "2099-01-01 10:01"):
+        db.execute(
+            "INSERT INTO pending_notes (sheet_name, member_name, content, created_at) VALUES (?, ?, ?, ?)",
+            ("상담일지", "회원1", "동시에 들어온 메모", created_at),
+        )
+
+    queue.flush()
+
+    contents = [row[2] for row in sheets["상담일지"].rows[1:]]
+    assert contents.count("동시에 들어온 메모") == 1
+    assert queue.pending() == 0
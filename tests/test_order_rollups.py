@@ -0,0 +1,55 @@
+import threading
+
+import bench_endpoints
+
+
+def _order(number, price):
+    return ["2024-06-01", f"회원{number}", str(number), "", "비타민", str(price), "10", "", "", "", "", ""]
+
+
+def test_order_typed_into_blank_grid_row_triggers_rebuild(app, make_sheets, calls, monkeypatch):
+    sheets = make_sheets(10)
+    rows = [app.ORDER_HEADERS] + [_order(1, 1000), _order(2, 2000)] + [[""] * 12 for _ in range(5)]
+    sheets["제품주문"] = bench_endpoints.FakeWorksheet("제품주문", rows, {}, calls)
+    rollups = app.order_rollups
+    rollups._rollups = None
+    monkeypatch.setattr(rollups, "check_interval", 0)
+    _, overall = rollups.query("member")
+    assert overall["제품가격"] == 3000
+
+    rows[3] = _order(3, 500)  # 빈 grid 행에 직접 입력 → grid 행 수는 그대로
+
+    _, overall = rollups.query("member")
+    assert overall["주문수"] == 3
+    assert overall["제품가격"] == 3500
+
+
+def test_query_during_add_order_does_not_double_count(app, make_sheets, calls, client, monkeypatch):
+    sheets = make_sheets(10)
+    sheets["제품주문"] = bench_endpoints.FakeWorksheet("제품주문", [app.ORDER_HEADERS, _order(1, 1000)], {}, calls)
+    rollups = app.order_rollups
+    rollups._rollups = None
+    monkeypatch.setattr(rollups, "check_interval", 0)
+    rollups.query("member")
+
+    append_rows = app.storage.append_rows
+    readers = []
+
+    def append_then_query(sheet_name, rows):
+        append_rows(sheet_name, rows)
+        # 시트에는 들어갔고 집계에는 아직 → 다른 요청의 조회는 반영이 끝날 때까지 기다려야 함
+        rollups._checked_at = 0.0
+        reader = threading.Thread(target=rollups.query, args=("member",))
+        reader.start()
+        reader.join(0.1)
+        readers.append(reader)
+
+    monkeypatch.setattr(app.storage, "append_rows", append_then_query)
+    monkeypatch.setattr(rollups, "check_interval", 3600)  # 조회 스레드가 확인한 뒤로는 행 수를 다시 보지 않음
+    response = client.post("/add_order", json={"회원명": "회원2", "회원번호": "2", "제품명": "비타민", "제품가격": 500, "PV": 5})
+    readers[0].join()
+
+    assert response.status_code == 200
+    _, overall = rollups.query("member")
+    assert overall["주문수"] == 2
+    assert overall["제품가격"] == 1500
@@ -0,0 +1,16 @@
+import pytest
+
+import bench_parse
+
+TEXTS = bench_parse.GOLDEN + bench_parse.random_texts(500)
+
+
+@pytest.mark.parametrize("text", bench_parse.GOLDEN)
+def test_golden_sentences_match_legacy_parsers(app, text):
+    assert app.parse_request(text) == bench_parse.legacy_parse_request(text)
+    assert app.parse_request_and_update(text, {}) == bench_parse.legacy_parse_request_and_update(text, {})
+    assert app.parse_request_and_update_multi(text, {}) == bench_parse.legacy_parse_request_and_update_multi(text, {})
+
+
+def test_random_sentences_match_legacy_parsers(app):
+    bench_parse.check_golden(TEXTS)
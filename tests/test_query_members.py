@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def members(app, make_sheets):
+    sheets = make_sheets(12)
+    for i, row in enumerate(sheets["DB"].rows[1:]):
+        row[4] = f"2024.01.{i + 1:02d}" if i != 6 else ""  # 가입일자, 표기가 섞이고 하나는 비어 있음
+        row[6] = "KT" if i % 3 == 0 else "SKT"  # 통신사 (범주형)
+    app.member_cache.invalidate()
+    return sheets
+
+
+def _query(client, **body):
+    response = client.post("/query_members", json=body)
+    return response.status_code, response.get_json()
+
+
+def _names(body):
+    return [m["회원명"] for m in body["회원목록"]]
+
+
+def test_filters_combine_category_and_date_range(members, client):
+    status, body = _query(client, filters=[
+        {"field": "통신사", "op": "eq", "value": "KT"},
+        {"field": "가입일자", "op": "between", "value": ["2024-01-02", "2024-01-10"]},
+    ], fields=["회원명", "가입일자"])
+
+    assert status == 200
+    assert _names(body) == ["회원3", "회원9"]  # 회원6은 가입일자가 비어 있음
+    assert body["회원목록"][0] == {"회원명": "회원3", "가입일자": "2024.01.04"}  # 시트 표기 그대로
+
+
+def test_in_empty_and_contains(members, client):
+    assert _names(_query(client, filters=[{"field": "가입일자", "op": "empty"}])[1]) == ["회원6"]
+    status, body = _query(client, filters=[
+        {"field": "회원명", "op": "in", "value": ["회원1", "회원2", "없음"]},
+        {"field": "휴대폰번호", "op": "contains", "value": "0002"},
+    ])
+    assert _names(body) == ["회원2"]
+
+
+def test_sort_and_paging(members, client):
+    status, body = _query(client, sort=["-가입일자"], page=2, page_size=5, fields=["회원명"])
+
+    assert status == 200
+    assert body["총건수"] == 12 and body["page"] == 2 and body["page_size"] == 5
+    assert _names(body) == ["회원5", "회원4", "회원3", "회원2", "회원1"]  # 빈 날짜는 맨 뒤
+
+    status, body = _query(client, sort=[{"field": "통신사"}, "-회원번호"], page_size=3)
+    assert _names(body) == ["회원9", "회원6", "회원3"]
+
+
+def test_invalid_requests_return_400(members, client):
+    bad = [
+        {"filters": [{"field": "통신사", "op": "between", "value": ["KT", "SKT"]}]},
+        {"filters": [{"field": "리더님", "op": "gt", "value": "리더1"}]},
+        {"filters": [{"field": "없는필드", "op": "eq", "value": "x"}]},
+        {"filters": [{"field": "가입일자", "op": "gte", "value": "날짜아님"}]},
+        {"filters": [{"field": "회원명", "op": "regex", "value": "."}]},
+        {"filters": {"field": "회원명"}},
+        {"sort": ["없는필드"]},
+    ]
+    for body in bad:
+        status, result = _query(client, **body)
+        assert status == 400, body
+        assert result["error"]
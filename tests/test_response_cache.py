@@ -0,0 +1,34 @@
+def _find(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/find_member", query_string={"회원명": "회원3"}, headers=headers)
+
+
+def test_etag_returns_304_until_sheet_is_written(app, make_sheets, client):
+    make_sheets(20)
+    first = _find(client)
+    etag = first.headers["ETag"].strip('"')
+    assert first.status_code == 200
+
+    again = _find(client, etag)
+    assert again.status_code == 304
+    assert again.data == b""
+
+    response = client.post("/save_member", json={"회원명": "회원3", "주소": "부산"})
+    assert response.status_code == 200
+
+    changed = _find(client, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"].strip('"') != etag
+    assert changed.get_json()["주소"] == "부산"
+
+
+def test_bump_recomputes_cached_response(app, make_sheets, client):
+    sheets = make_sheets(20)
+    etag = _find(client).headers["ETag"].strip('"')
+
+    sheets["DB"].rows[4][11] = "대구"  # 시트 직접 수정 → 변경 감지가 revision을 올림
+    app.member_cache.invalidate()
+
+    response = _find(client, etag)
+    assert response.status_code == 200
+    assert response.get_json()["주소"] == "대구"
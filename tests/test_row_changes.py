@@ -0,0 +1,41 @@
+import json
+from collections import Counter
+
+from storage import row_change_ranges, write_row_changes
+
+
+def test_adjacent_columns_are_coalesced_into_ranges():
+    data = row_change_ranges(5, {3: "c", 1: "a", 2: "b", 7: "g", 9: "i", 10: "j"})
+
+    assert data == [
+        {"range": "A5:C5", "values": [["a", "b", "c"]]},
+        {"range": "G5:G5", "values": [["g"]]},
+        {"range": "I5:J5", "values": [["i", "j"]]},
+    ]
+    assert row_change_ranges(5, {}) == []
+
+
+def test_write_row_changes_sends_one_batch_update():
+    sent = []
+
+    class Sheet:
+        def batch_update(self, data, **kwargs):
+            sent.append((data, kwargs))
+
+    assert write_row_changes(Sheet(), 2, {4: "x", 5: "y"}) == 2
+    assert write_row_changes(Sheet(), 2, {}) == 0
+    assert sent == [([{"range": "D2:E2", "values": [["x", "y"]]}], {"value_input_option": "USER_ENTERED"})]
+
+
+def test_update_member_writes_changed_cells_in_one_call(app, make_sheets, calls, client):
+    sheets = make_sheets(20)
+    client.post("/find_member", json={"회원명": "회원3"})  # 위치 색인/캐시 준비
+    before = Counter(calls)
+
+    response = client.post("/update_member", data=json.dumps({"요청문": "회원3 주소 부산 휴대폰번호 010-9999-0000 수정"}))
+
+    assert response.status_code == 200
+    writes = {k: calls[k] - before[k] for k in ("batch_update", "update_cell")}
+    assert writes == {"batch_update": 1, "update_cell": 0}
+    row = next(row for row in sheets["DB"].rows if row[0] == "회원3")
+    assert row[11] == "부산" and row[2] == "010-9999-0000"
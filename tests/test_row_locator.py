@@ -0,0 +1,80 @@
+import storage
+
+HEADERS = ["회원명", "회원번호"]
+
+
+def _locator(names):
+    locator = storage.RowLocator({"DB": HEADERS})
+    locator.load("DB", HEADERS, [[name, str(i)] for i, name in enumerate(names)])
+    return locator
+
+
+def _expected(rows, name):
+    return [i + 2 for i, row in enumerate(rows) if row[0] == name]
+
+
+def test_insert_at_top_shifts_rows_down():
+    locator = _locator(["가", "나", "다"])
+    locator.insert("DB", 2, HEADERS, [["라", "9"], ["마", "8"]])
+
+    assert locator.rows("DB", "회원명", "라") == [2]
+    assert locator.rows("DB", "회원명", "마") == [3]
+    assert locator.rows("DB", "회원명", "다") == [6]
+    assert locator.rows("DB", "회원번호", "0") == [4]
+
+
+def test_delete_shifts_rows_up_and_update_follows_shift():
+    locator = _locator(["가", "나", "다", "라"])
+    locator.delete("DB", 3)  # 나
+    locator.update("DB", 3, {"회원명": "다2"})  # 지운 뒤 3행은 다
+
+    assert locator.rows("DB", "회원명", "나") == []
+    assert locator.rows("DB", "회원명", "다") == []
+    assert locator.rows("DB", "회원명", "다2") == [3]
+    assert locator.rows("DB", "회원명", "라") == [4]
+
+
+def test_mixed_edits_match_list_model(monkeypatch):
+    monkeypatch.setattr(storage, "LOCATOR_COMPACT_DELETES", 7)
+    rows = [[f"회원{i % 13}", str(i)] for i in range(40)]
+    locator = storage.RowLocator({"DB": HEADERS})
+    locator.load("DB", HEADERS, rows)
+    for step in range(60):
+        if step % 3 == 0:
+            new = [[f"신규{step}", f"n{step}"]]
+            rows[0:0] = new
+            locator.insert("DB", 2, HEADERS, new)
+        elif step % 3 == 1:
+            row_number = 2 + step * 7 % len(rows)
+            del rows[row_number - 2]
+            locator.delete("DB", row_number)
+        else:
+            row_number = 2 + step * 5 % len(rows)
+            rows[row_number - 2][0] = f"회원{step % 13}"
+            locator.update("DB", row_number, {"회원명": f"회원{step % 13}"})
+        if step % 10 == 0:
+            new = [[f"끝{step}", f"e{step}"]]
+            rows.extend(new)
+            locator.append("DB", HEADERS, new)
+
+    for name in {row[0] for row in rows} | {"신규0", "없음"}:
+        assert locator.rows("DB", "회원명", name) == _expected(rows, name)
+    assert locator.info()["rows"]["DB"] == len(rows)
+    assert locator.info()["compactions"] >= 1
+
+
+def test_save_and_delete_through_backend_keep_locator_in_sync(app, make_sheets):
+    sheets = make_sheets(30)
+    backend = app.sheets_storage
+    mismatches = backend.locator.stats["mismatches"]
+    assert backend.find("DB", "회원명", "회원10")[0][0] == 12
+
+    backend.insert_row("DB", {"회원명": "신규", "회원번호": "99999999"})
+    assert backend.find("DB", "회원명", "회원10")[0][0] == 13
+    assert backend.find("DB", "회원번호", "99999999")[0][0] == 2
+
+    backend.delete_row("DB", 2)
+    found = backend.find("DB", "회원명", "회원10")
+    assert found[0][0] == 12
+    assert sheets["DB"].rows[11][0] == "회원10"
+    assert backend.locator.stats["mismatches"] == mismatches
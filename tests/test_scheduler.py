@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from scheduler import SheetsScheduler
+
+URL = "https://sheets.googleapis.com/v4/spreadsheets/abc"
+
+
+def _api_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{"error": {"code": %d, "message": "x", "status": "x"}}' % status
+    return APIError(response)
+
+
+def _failing(status, failures=1):
+    calls = []
+
+    def request(method, endpoint, params=None, **kwargs):
+        calls.append(endpoint)
+        if len(calls) <= failures:
+            raise _api_error(status)
+        return "ok"
+    return request, calls
+
+
+def _scheduler():
+    return SheetsScheduler(6000, 6000, max_retries=3, base_delay=0, max_delay=0)
+
+
+def test_row_insert_is_not_retried_on_5xx():
+    request, calls = _failing(503)
+    wrapped = _scheduler().wrap(request)
+
+    with pytest.raises(APIError):
+        wrapped("post", URL + ":batchUpdate", json={"requests": [{"insertDimension": {}}]})
+    assert len(calls) == 1
+
+
+def test_writes_are_retried_on_429_and_fixed_range_updates_on_5xx():
+    scheduler = _scheduler()
+    request, calls = _failing(429)
+    assert scheduler.wrap(request)("post", URL + "/values:append") == "ok"
+    assert len(calls) == 2
+
+    request, calls = _failing(503)
+    assert scheduler.wrap(request)("post", URL + "/values:batchUpdate") == "ok"
+    assert len(calls) == 2
+
+
+def test_read_after_write_does_not_join_earlier_read():
+    started, release = threading.Event(), threading.Event()
+    reads = []
+
+    def request(method, endpoint, params=None, **kwargs):
+        if method == "get":
+            reads.append(endpoint)
+            if len(reads) == 1:
+                started.set()
+                release.wait(5)
+                return "before write"
+            return "after write"
+        return "written"
+
+    wrapped = _scheduler().wrap(request)
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault("first", wrapped("get", URL + "/values/A1")))
+    first.start()
+    started.wait(5)
+
+    wrapped("post", URL + "/values:batchUpdate")
+    second = threading.Thread(target=lambda: results.setdefault("second", wrapped("get", URL + "/values/A1")))
+    second.start()
+    second.join(5)
+    release.set()
+    first.join(5)
+
+    assert results == {"first": "before write", "second": "after write"}
+    assert len(reads) == 2
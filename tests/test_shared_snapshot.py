@@ -0,0 +1,83 @@
+import time
+
+from shared_snapshot import SharedSnapshot
+
+SHEET = [["회원명", "회원번호"], ["홍길동", "1"], ["김철수", "2"]]
+
+
+def _pair(tmp_path, sheet, reloads):
+    # 같은 파일을 보는 발행 워커 / 일반 워커 (발행 워커 사본은 reload 요청 전까지 옛 내용)
+    leader_copy = [list(row) for row in sheet]
+
+    def leader_load(sheet_name, reload):
+        if reload:
+            reloads.append(sheet_name)
+            leader_copy[:] = [list(row) for row in sheet]
+        return leader_copy
+
+    def worker_load(sheet_name, reload):
+        raise AssertionError("일반 워커는 발행하지 않음")
+
+    path = str(tmp_path / "snapshot.bin")
+    common = dict(index_columns={"DB": ["회원명"]}, as_of=time.time, interval=0, check_interval=0)
+    leader = SharedSnapshot(path, ["DB"], load=leader_load, **common)
+    worker = SharedSnapshot(path, ["DB"], load=worker_load, **common)
+    return leader, worker
+
+
+def test_writer_waits_for_generation_with_its_write(tmp_path):
+    sheet = [list(row) for row in SHEET]
+    reloads = []
+    leader, worker = _pair(tmp_path, sheet, reloads)
+    leader.tick()
+    generation, view = worker.sheet("DB")
+    assert generation == 1 and len(view) == 2
+
+    sheet.insert(1, ["이영희", "3"])  # 일반 워커가 시트에 쓴 뒤 알림
+    worker.mark_written("DB")
+    assert worker.sheet("DB") is None  # 자기 쓰기가 빠진 세대는 쓰지 않음
+
+    leader.tick()
+    generation, view = worker.sheet("DB")
+    assert generation == 2
+    assert view.index("회원명").get("이영희") == [0]
+    assert reloads == ["DB"]
+
+    leader.tick()  # 새 쓰기가 없으면 다시 발행하지 않음
+    assert worker.sheet("DB")[0] == 2
+
+
+def test_leader_own_write_does_not_reload(tmp_path):
+    sheet = [list(row) for row in SHEET]
+    reloads = []
+    leader, worker = _pair(tmp_path, sheet, reloads)
+    leader.tick()
+
+    leader.mark_written("DB")  # 발행 워커 자신의 쓰기는 사본에 이미 반영됨
+    assert leader.sheet("DB") is None
+    leader.tick()
+
+    assert leader.sheet("DB")[0] == 2
+    assert reloads == []
+
+
+def test_outside_edit_is_republished_after_refresh_interval(tmp_path):
+    # 증분 동기화 없이 발행 워커가 시트를 직접 읽는 경우: 시트 UI에서 고친 내용은 refresh 주기가 지나야 반영
+    sheet = [list(row) for row in SHEET]
+    path = str(tmp_path / "snapshot.bin")
+    common = dict(index_columns={"DB": ["회원명"]}, as_of=time.time, interval=0, check_interval=0)
+    leader = SharedSnapshot(path, ["DB"], load=lambda sheet_name, reload: sheet, refresh_interval=60, **common)
+    worker = SharedSnapshot(path, ["DB"], load=None, **common)
+    leader.tick()
+
+    sheet[1][0] = "홍길순"
+    leader.tick()  # 아직 주기 전
+    generation, view = worker.sheet("DB")
+    assert generation == 1 and view[0][0] == "홍길동"
+
+    leader._published_at -= 60
+    leader.tick()
+    generation, view = worker.sheet("DB")
+    assert generation == 2 and view[0][0] == "홍길순"
+    assert view.index("회원명").get("홍길순") == [0]
+    assert leader.stats["refreshes"] == 1
@@ -0,0 +1,87 @@
+import json
+import sys
+import types
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+
+class FakeSpreadsheet:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def worksheet(self, name):
+        self.calls["worksheet"] += 1
+        return types.SimpleNamespace(title=name)
+
+
+class FakeClient:
+    def __init__(self, calls):
+        self.calls = calls
+        self.auth = types.SimpleNamespace(token="token", expiry=datetime.utcnow() + timedelta(hours=1))
+        self.session = types.SimpleNamespace(hooks={"response": []})
+
+    def request(self, *args, **kwargs):
+        self.calls["request"] += 1
+
+    def login(self):
+        self.calls["login"] += 1
+        self.auth.token, self.auth.expiry = "new", datetime.utcnow() + timedelta(hours=1)
+
+    def open(self, name):
+        self.calls["open"] += 1
+        return FakeSpreadsheet(self.calls)
+
+
+@pytest.fixture
+def connection(app, monkeypatch):
+    calls = Counter()
+    gspread = types.ModuleType("gspread")
+
+    def authorize(creds):
+        calls["authorize"] += 1
+        assert creds["private_key"] == "line1\nline2"  # 환경변수의 \n 이스케이프를 되돌림
+        return FakeClient(calls)
+
+    gspread.authorize = authorize
+    service_account = types.ModuleType("oauth2client.service_account")
+    service_account.ServiceAccountCredentials = types.SimpleNamespace(
+        from_json_keyfile_dict=lambda keyfile, scope: keyfile,
+    )
+    monkeypatch.setitem(sys.modules, "gspread", gspread)
+    monkeypatch.setitem(sys.modules, "oauth2client.service_account", service_account)
+    monkeypatch.setenv("GOOGLE_SHEET_KEY", json.dumps({"private_key": "line1\\nline2", "client_email": "a@b"}))
+    return app.SheetConnection(), calls
+
+
+def test_client_spreadsheet_and_worksheets_are_reused(connection):
+    conn, calls = connection
+    db = conn.worksheet("DB")
+    assert conn.worksheet("DB") is db
+    conn.worksheet("개인메모")
+    conn.worksheet("개인메모")
+
+    assert calls["authorize"] == 1 and calls["open"] == 1 and calls["worksheet"] == 2
+    assert calls["login"] == 0
+    assert conn.stats["worksheet_saved"] == 2 and conn.stats["auth_calls"] == 1
+
+
+def test_token_is_refreshed_before_expiry(app, connection):
+    conn, calls = connection
+    client = conn.client()
+    client.auth.expiry = datetime.utcnow() + timedelta(seconds=app.TOKEN_REFRESH_MARGIN - 10)
+
+    assert conn.client() is client
+    assert calls["login"] == 1 and calls["authorize"] == 1
+    conn.client()
+    assert calls["login"] == 1  # 갱신된 토큰은 다시 갱신하지 않음
+
+
+def test_reset_drops_handles(connection):
+    conn, calls = connection
+    conn.worksheet("DB")
+    conn.reset()
+    conn.worksheet("DB")
+
+    assert calls["authorize"] == 2 and calls["open"] == 2 and calls["worksheet"] == 2
@@ -0,0 +1,72 @@
+import threading
+
+from storage import SQLiteBackend
+
+HEADERS = ["회원명", "회원번호", "주소"]
+
+
+def _pull(backend, names):
+    backend.replace_all("DB", [HEADERS] + [[name, str(i), ""] for i, name in enumerate(names)])
+
+
+def test_row_ids_survive_pull_that_reorders_rows(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "mirror.db"))
+    _pull(backend, ["가", "나", "다"])
+    row_id, _ = backend.find("DB", "회원명", "나")[0]
+    last_id, _ = backend.find("DB", "회원명", "다")[0]
+
+    _pull(backend, ["신규", "가", "나"])  # 다른 곳에서 맨 위에 추가, 다 삭제
+
+    assert backend.find("DB", "회원명", "나")[0][0] == row_id
+    backend.update_row("DB", row_id, {"주소": "서울"})
+    assert backend.find("DB", "회원명", "나")[0][1]["주소"] == "서울"
+    assert backend.find("DB", "회원명", "가")[0][1]["주소"] == ""
+
+    backend.insert_row("DB", {"회원명": "라"})
+    assert backend.find("DB", "회원명", "라")[0][0] > last_id  # 지워진 행의 _id는 다시 쓰지 않음
+    assert backend.find("DB", "회원명", "신규")[0][0] > last_id
+
+
+def test_duplicate_keys_keep_ids_in_sheet_order(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "mirror.db"))
+    _pull(backend, ["가", "가", "나"])
+    before = [row_id for row_id, _ in backend.find("DB", "회원명", "가")]
+
+    _pull(backend, ["나", "가", "가"])
+
+    assert [row_id for row_id, _ in backend.find("DB", "회원명", "가")] == before
+
+
+class _Remote:
+    def __init__(self, values):
+        self.values = values
+
+    def read_all(self, sheet_name):
+        return [list(row) for row in self.values]
+
+
+def test_local_insert_during_pull_is_applied_once(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "mirror.db"))
+    _pull(backend, ["가", "나"])
+    remote = _Remote([HEADERS, ["가", "0", ""], ["나", "1", ""]])
+    replace = backend._replace_all_locked
+    writer = []
+
+    def replace_then_write(sheet_name, values):
+        replace(sheet_name, values)
+        # 교체 직후 요청 스레드가 새 회원 저장 → 재적용이 끝날 때까지 기다려야 함
+        thread = threading.Thread(target=backend.insert_row, args=("DB", {"회원명": "다"}))
+        thread.start()
+        thread.join(0.1)
+        writer.append(thread)
+
+    monkeypatch.setattr(backend, "_replace_all_locked", replace_then_write)
+    backend.pull(remote, "DB")
+    writer[0].join()
+
+    assert len(backend.find("DB", "회원명", "다")) == 1
+    assert backend.pending() == 1
+
+    monkeypatch.undo()
+    backend.pull(remote, "DB")  # 아직 보내지 않은 저장은 다음 받아오기에서도 한 번만 다시 적용
+    assert len(backend.find("DB", "회원명", "다")) == 1
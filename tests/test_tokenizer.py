@@ -0,0 +1,74 @@
+import sys
+import threading
+import types
+
+from tokenizer import KoreanTokenizer
+
+
+def _fake_mecab(created):
+    class Tagger:
+        def __init__(self, args):
+            created.append(args)
+
+        def parse(self, text):
+            return "비타민\tNNG,*\n상담\tNNG,*\n을\tJKO,*\nEOS"
+    return types.SimpleNamespace(Tagger=Tagger)
+
+
+def test_mecab_is_loaded_on_first_use_with_disk_cache(tmp_path, monkeypatch):
+    created = []
+    monkeypatch.setitem(sys.modules, "MeCab", _fake_mecab(created))
+
+    tokenizer = KoreanTokenizer(100, str(tmp_path / "nouns.db"))
+    assert created == [] and tokenizer.analyzer is None
+
+    assert tokenizer.nouns("비타민 상담을") == ["비타민", "상담"]
+    assert created == [""]
+    assert tokenizer.analyzer == "mecab" and tokenizer._conn is not None
+
+
+def test_regex_fallback_without_mecab_skips_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "MeCab", None)  # import MeCab → ImportError
+
+    tokenizer = KoreanTokenizer(100, str(tmp_path / "nouns.db"))
+    nouns = tokenizer.nouns("오늘 비타민 상담을 진행했습니다")
+
+    assert tokenizer.analyzer == "regex"
+    assert "비타민" in nouns
+    assert tokenizer._conn is None
+
+
+def test_threads_analyze_in_parallel_with_own_taggers(tmp_path, monkeypatch):
+    created = []
+    both_parsing = threading.Barrier(2, timeout=5)  # 분석 중 잠금을 잡고 있으면 두 번째 스레드가 못 들어와 시간 초과
+
+    class Tagger:
+        def __init__(self, args):
+            created.append(threading.get_ident())
+
+        def parse(self, text):
+            both_parsing.wait()
+            return f"{text}\tNNG,*\nEOS"
+
+    monkeypatch.setitem(sys.modules, "MeCab", types.SimpleNamespace(Tagger=Tagger))
+    tokenizer = KoreanTokenizer(100, str(tmp_path / "nouns.db"))
+    results, errors = {}, []
+
+    def work(text):
+        try:
+            results[text] = tokenizer.nouns(text)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(text,)) for text in ("비타민", "유산균")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == {"비타민": ["비타민"], "유산균": ["유산균"]}
+    assert sorted(created) == sorted(t.ident for t in threads)  # 스레드마다 Tagger 하나
+    assert tokenizer.stats["analyzed"] == 2
+    assert tokenizer.nouns("비타민") == ["비타민"]  # 저장된 결과 재사용 (새 Tagger/분석 없음)
+    assert len(created) == 2 and tokenizer.stats["analyzed"] == 2
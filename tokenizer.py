@@ -0,0 +1,150 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+
+from startup import startup
+
+
+NOUN_PATTERN = re.compile(r'[가-힣]{2,}')
+MECAB_NOUN_TAGS = ("NNG", "NNP")  # 일반명사, 고유명사
+SQLITE_BATCH = 500  # IN (...) 한 번에 넣는 해시 수
+
+
+def content_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# ✅ 한국어 명사 추출기
+# MeCab-ko가 설치돼 있으면 형태소 분석("상담을" → "상담"), 없으면 기존 [가-힣]{2,} 정규식
+# 결과는 LRU + SQLite(MeCab일 때만)에 내용 해시로 저장해서 같은 메모는 한 번만 분석
+# MeCab import/사전 로드는 처음 분석할 때 (앱 시작 시간에 넣지 않음)
+# 잠금은 캐시 읽기/쓰기에만, 분석은 잠금 밖에서 스레드마다 자기 Tagger로 (Tagger는 스레드 간 공유 불가)
+class KoreanTokenizer:
+    def __init__(self, cache_size, cache_path, mecab_dic=""):
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.mecab_dic = mecab_dic
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._ready = False
+        self._mecab = None  # Tagger를 만드는 MeCab 모듈 (초기화에 성공했을 때만)
+        self._local = threading.local()  # 스레드별 Tagger
+        self._conn = None
+        self.analyzer = None  # 처음 쓸 때 "mecab" 또는 "regex"
+        self.stats = Counter()
+
+    def _setup(self):
+        if self._ready:
+            return
+        self._ready = True
+        try:
+            MeCab = startup.lazy_import("MeCab")
+        except ImportError:  # MeCab-ko가 없는 환경(Render 등)에서는 정규식으로 대체
+            MeCab = None
+        if MeCab is not None:
+            try:
+                self._local.tagger = self._new_tagger(MeCab)
+                self._mecab = MeCab
+            except Exception as e:
+                print(f"[형태소 분석기] MeCab 초기화 실패, 정규식 사용: {e}")
+        self.analyzer = "mecab" if self._mecab else "regex"
+
+        # 정규식은 디스크에서 읽는 것보다 바로 계산하는 쪽이 빠르므로 MeCab일 때만 디스크 캐시
+        if self._mecab and self.cache_path:
+            self._conn = sqlite3.connect(self.cache_path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS noun_cache (
+                    content_hash TEXT NOT NULL,
+                    analyzer TEXT NOT NULL,
+                    nouns TEXT NOT NULL,
+                    PRIMARY KEY (content_hash, analyzer)
+                )
+            """)
+
+    def _new_tagger(self, MeCab):
+        tagger = MeCab.Tagger(f"-d {self.mecab_dic}" if self.mecab_dic else "")
+        self.stats["taggers"] += 1
+        return tagger
+
+    def prepare(self):
+        with self._lock:
+            self._setup()
+
+    def _analyze(self, text):
+        if not self._mecab:
+            return NOUN_PATTERN.findall(text)
+        tagger = getattr(self._local, "tagger", None)
+        if tagger is None:
+            tagger = self._local.tagger = self._new_tagger(self._mecab)
+        nouns = []
+        for line in tagger.parse(text).splitlines():
+            surface, _, feature = line.partition("\t")
+            if feature.startswith(MECAB_NOUN_TAGS) and len(surface) >= 2:
+                nouns.append(surface)
+        return nouns
+
+    def _remember(self, key, nouns):
+        self._lru[key] = nouns
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.cache_size:
+            self._lru.popitem(last=False)
+
+    def _load(self, keys):
+        found = {}
+        for i in range(0, len(keys), SQLITE_BATCH):
+            part = keys[i:i + SQLITE_BATCH]
+            rows = self._conn.execute(
+                f"SELECT content_hash, nouns FROM noun_cache WHERE analyzer = ? AND content_hash IN ({', '.join('?' * len(part))})",
+                [self.analyzer] + part,
+            ).fetchall()
+            found.update((key, json.loads(nouns)) for key, nouns in rows)
+        return found
+
+    def nouns_many(self, texts):
+        # 여러 메모를 한 번에: LRU → 디스크(한 번의 조회) → 남은 것만 잠금 밖에서 분석 후 한 번에 저장
+        keys = [content_key(text) for text in texts]
+        result = {}
+        with self._lock:
+            self._setup()
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    result[key] = self._lru[key]
+            self.stats["lru_hits"] += sum(1 for key in keys if key in result)
+
+            missing = list({key: None for key in keys if key not in result})
+            if missing and self._conn is not None:
+                loaded = self._load(missing)
+                self.stats["disk_hits"] += len(loaded)
+                for key, nouns in loaded.items():
+                    result[key] = nouns
+                    self._remember(key, nouns)
+
+        analyzed = {}
+        for key, text in zip(keys, texts):
+            if key not in result and key not in analyzed:
+                analyzed[key] = self._analyze(text)
+
+        if analyzed:
+            with self._lock:
+                for key, nouns in analyzed.items():
+                    self._remember(key, nouns)
+                self.stats["analyzed"] += len(analyzed)
+                if self._conn is not None:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO noun_cache VALUES (?, ?, ?)",
+                        [(key, self.analyzer, json.dumps(nouns, ensure_ascii=False)) for key, nouns in analyzed.items()],
+                    )
+            result.update(analyzed)
+
+        return [list(result[key]) for key in keys]
+
+    def nouns(self, text):
+        return self.nouns_many([text])[0]
+
+    def info(self):
+        return {**self.stats, "analyzer": self.analyzer, "lru": len(self._lru)}